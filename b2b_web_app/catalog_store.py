@@ -0,0 +1,128 @@
+"""
+Bellek içi katalog deposu.
+
+Ürün kataloğu (ve cari listesi) uygulama başlarken bir kez veritabanından okunur ve
+bellekte değişmez bir anlık görüntü (snapshot) olarak tutulur. Yeni veri geldiğinde
+önce kalıcı katmana yazılır, ardından yeni bir snapshot oluşturulup tek bir referans
+ataması ile eskisinin yerine konur; böylece okuyucular hiçbir zaman yarım yazılmış
+bir katalog görmez. Kalıcı yazma işlemi çağıran tarafından `persist` fonksiyonu
+olarak verilir, depo yalnızca bellekteki görüntüden sorumludur.
+
+Her snapshot, HTTP yanıtı olarak gönderilecek JSON baytlarını, bunların gzip ile
+sıkıştırılmış halini ve içerikten türetilen bir ETag değerini birlikte taşır.
+Böylece GET istekleri yeniden serileştirme yapmadan doğrudan bu baytlarla yanıtlanır.
+İsteğe bağlı `index_builder` verilmişse snapshot ile birlikte sorgu indeksi de bir kez oluşturulur.
+
+Snapshot'ın içerik hash'i (`digest`) masaüstü ile yapılan delta senkronizasyonunda
+katalog versiyonu olarak kullanılır; içerikten türetildiği için sunucu yeniden
+başlasa da aynı katalog için aynı değeri verir.
+"""
+import datetime
+import gzip
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+
+class CatalogVersionConflict(Exception):
+    """Delta isteğinin temel versiyonu sunucudaki güncel versiyonla eşleşmediğinde fırlatılır."""
+
+    def __init__(self, current_version: str):
+        super().__init__(f"Katalog versiyonu uyuşmuyor. Güncel versiyon: {current_version}")
+        self.current_version = current_version
+
+
+class CatalogSnapshot:
+    """Kataloğun belirli bir andaki değişmez görüntüsü."""
+
+    __slots__ = ("products", "version", "loaded_at", "body", "gzip_body", "digest", "etag", "index")
+
+    def __init__(self, products: List[Dict], version: int, index_builder: Optional[Callable[[List[Dict]], Any]] = None):
+        self.products = products
+        self.version = version
+        self.loaded_at = datetime.datetime.now()
+        # Yanıt baytları snapshot oluşturulurken bir kez hazırlanır
+        self.body = json.dumps(products, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.gzip_body = gzip.compress(self.body, compresslevel=6, mtime=0)
+        self.digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = f'"{self.digest}"'
+        self.index = index_builder(products) if index_builder else None
+
+    def __len__(self):
+        return len(self.products)
+
+
+class CatalogStore:
+    """
+    Süreç genelinde paylaşılan katalog deposu.
+    Okuyucular `snapshot` özelliğini kilitsiz okur; yazıcılar `replace` veya `apply_delta` ile
+    yeni snapshot'ı kilit altında hazırlayıp atomik olarak değiştirir.
+    Kayıtlar `sort_fields` alanlarına göre sıralı tutulur; böylece aynı içerik her zaman
+    aynı baytlara (ve aynı digest değerine) karşılık gelir.
+    """
+
+    def __init__(self, label: str, key_field: str, sort_fields: Iterable[str],
+                 index_builder: Optional[Callable[[List[Dict]], Any]] = None):
+        self.label = label
+        self.key_field = key_field
+        self.sort_fields = tuple(sort_fields)
+        self.index_builder = index_builder
+        self._lock = threading.Lock()
+        self._snapshot = CatalogSnapshot([], 0, index_builder)
+
+    @property
+    def snapshot(self) -> CatalogSnapshot:
+        # Tek bir attribute okuması atomiktir, kilit gerekmez
+        return self._snapshot
+
+    def _sorted(self, records: Iterable[Dict]) -> List[Dict]:
+        return sorted(records, key=lambda r: tuple(str(r.get(field) or "") for field in self.sort_fields))
+
+    def load(self, records: List[Dict]) -> CatalogSnapshot:
+        """Kalıcı katmandan okunmuş kayıtlarla başlangıç snapshot'ını oluşturur (tekrar yazılmaz)."""
+        snapshot = self.replace(records)
+        print(f"{self.label}: {len(snapshot)} kayıt belleğe yüklendi (versiyon {snapshot.version}).")
+        return snapshot
+
+    def replace(self, records: List[Dict], persist: Optional[Callable[[List[Dict]], None]] = None) -> CatalogSnapshot:
+        """
+        Kataloğu yeni liste ile değiştirir. `persist` verilmişse önce kalıcı katmana yazılır,
+        yazma başarılı olursa bellekteki snapshot değiştirilir.
+        """
+        # Aynı anahtar birden fazla kez gelirse sonuncusu geçerlidir (veritabanındaki tekil indeks ile uyumlu)
+        unique_records = {str(r.get(self.key_field, "")).strip(): r for r in records}
+        with self._lock:
+            new_snapshot = CatalogSnapshot(self._sorted(unique_records.values()), self._snapshot.version + 1, self.index_builder)
+            if persist:
+                persist(new_snapshot.products)
+            self._snapshot = new_snapshot
+            return new_snapshot
+
+    def apply_delta(self, base_version: str, upserts: List[Dict], deletes: List[str],
+                    persist: Optional[Callable[[List[Dict], List[str]], None]] = None) -> CatalogSnapshot:
+        """
+        Güncel kataloğa eklenen/değişen (`upserts`) ve silinen (`deletes`) kayıtları uygular.
+        `base_version` güncel snapshot'ın digest değeriyle eşleşmezse CatalogVersionConflict fırlatılır;
+        istemci bu durumda tam yükleme yapmalıdır. `persist` yalnızca değişen kayıtları alır.
+        """
+        key_field = self.key_field
+        with self._lock:
+            current = self._snapshot
+            if base_version != current.digest:
+                raise CatalogVersionConflict(current.digest)
+
+            records = {str(p.get(key_field, "")).strip(): p for p in current.products}
+            for key in deletes:
+                records.pop(str(key).strip(), None)
+            for item in upserts:
+                key = str(item.get(key_field, "")).strip()
+                if not key:
+                    raise ValueError(f"Delta kaydında {key_field} alanı eksik: {item}")
+                records[key] = item
+
+            new_snapshot = CatalogSnapshot(self._sorted(records.values()), current.version + 1, self.index_builder)
+            if persist:
+                persist(upserts, deletes)
+            self._snapshot = new_snapshot
+            return new_snapshot
@@ -0,0 +1,117 @@
+"""
+Açık sayfalara anlık değişiklik bildirimi (Server-Sent Events, `GET /api/events`).
+
+Katalog, cari bakiyeleri veya siparişler değişince ilgili konu ("products", "customers",
+"orders") için küçük bir bildirim yayınlanır: {"topic", "version", ...}. Sayfalar bildirimi
+alınca yalnızca değişen veriyi ister (katalog ve cari listesi ETag ile, siparişler sorguyla).
+
+Her konunun yalnızca son bildirimi tutulur ve her yayın süreç genelinde artan bir sıra
+numarası (seq) alır. Bağlı istemciler tek bir paylaşılan `asyncio.Event` üzerinde bekler;
+yayın istemci sayısından bağımsız olarak yalnızca bu event'i tetikleyip yenisiyle değiştirir,
+istemci başına kuyruk tutulmaz. Uyanan istemci son gördüğü seq'ten sonra değişen konuları
+okur; yavaş bir istemci ara bildirimleri kaçırsa da her konunun son hâlini alır.
+
+Bildirim id'leri "<süreç kimliği>-<seq>" biçimindedir. Tarayıcı yeniden bağlanırken
+`Last-Event-ID` ile son id'yi gönderir ve aradaki değişiklikler tekrar gönderilir. Sunucu
+yeniden başladıysa (süreç kimliği farklı) aradaki değişiklikler bilinemeyeceği için
+`resync` gönderilir; sayfalar verilerini ETag ile yeniden doğrular.
+
+Yayınlar event loop içinden (async endpoint'lerden) yapılmalıdır. Her worker süreci kendi
+istemcilerine bildirim gönderir; birden çok worker ile çalışırken bir worker'daki değişiklik
+diğer worker'lara bağlı sayfalara ulaşmaz.
+"""
+import asyncio
+import json
+import secrets
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+DEFAULT_HEARTBEAT_SECONDS = 25.0
+RECONNECT_DELAY_MS = 5000
+
+
+def format_event(event: str, data: Dict, event_id: Optional[str] = None) -> str:
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}")
+    return "\n".join(lines) + "\n\n"
+
+
+class ChangeFeed:
+    def __init__(self, heartbeat_seconds: float = DEFAULT_HEARTBEAT_SECONDS):
+        self.heartbeat_seconds = heartbeat_seconds
+        self.instance_id = secrets.token_hex(4)
+        self.seq = 0
+        self.clients = 0
+        self._latest: Dict[str, Tuple[int, Dict]] = {}  # Konu -> (seq, son bildirim)
+        self._versions: Dict[str, object] = {}
+        self._changed = asyncio.Event()
+
+    def event_id(self, seq: int) -> str:
+        return f"{self.instance_id}-{seq}"
+
+    def publish(self, topic: str, data: Optional[Dict] = None, version=None):
+        """
+        Konu için yeni bir bildirim yayınlar ve bekleyen tüm istemcileri uyandırır.
+        `version` verilmezse konunun sayacı bir artırılır (örn. siparişler).
+        """
+        if version is None:
+            version = (self._versions.get(topic) or 0) + 1
+        self._versions[topic] = version
+        self.seq += 1
+        self._latest[topic] = (self.seq, {"topic": topic, "version": version, **(data or {})})
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    def changes_since(self, seq: int) -> List[Tuple[int, Dict]]:
+        return sorted((topic_seq, data) for topic_seq, data in self._latest.values() if topic_seq > seq)
+
+    def parse_last_event_id(self, last_event_id: Optional[str]) -> Tuple[int, bool]:
+        """`Last-Event-ID` değerinden (seq, yeniden_eşitleme_gerekli) döndürür."""
+        if not last_event_id:
+            return self.seq, False
+        instance_id, _, seq_text = last_event_id.partition("-")
+        if instance_id != self.instance_id or not seq_text.isdigit() or int(seq_text) > self.seq:
+            return self.seq, True
+        return int(seq_text), False
+
+    async def wait_for_changes(self, seq: int, timeout: float) -> List[Tuple[int, Dict]]:
+        """`seq`'ten sonraki değişiklikleri döndürür; yoksa en fazla `timeout` saniye bekler."""
+        changed = self._changed
+        changes = self.changes_since(seq)
+        if changes:
+            return changes
+        try:
+            await asyncio.wait_for(changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        return self.changes_since(seq)
+
+    async def stream(self, last_event_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Bir istemcinin SSE akışı. Bağlantı açılınca konuların güncel versiyonları (`hello`)
+        gönderilir; sonra değişiklikler ve bağlantıyı açık tutan heartbeat satırları gelir.
+        İstemci bağlantıyı kapatınca Starlette akışı iptal eder.
+        """
+        seq, needs_resync = self.parse_last_event_id(last_event_id)
+        self.clients += 1
+        try:
+            yield f"retry: {RECONNECT_DELAY_MS}\n\n"
+            yield format_event("hello", {"versions": dict(self._versions)}, self.event_id(self.seq if needs_resync else seq))
+            if needs_resync:
+                yield format_event("resync", {}, self.event_id(self.seq))
+                seq = self.seq
+            while True:
+                changes = await self.wait_for_changes(seq, self.heartbeat_seconds)
+                if not changes:
+                    yield ": ping\n\n"  # Proxy'ler boşta kalan bağlantıyı kapatmasın diye
+                    continue
+                for topic_seq, data in changes:
+                    yield format_event(data["topic"], data, self.event_id(topic_seq))
+                    seq = topic_seq
+        finally:
+            self.clients -= 1
+
+    def stats(self) -> Dict:
+        return {"clients": self.clients, "seq": self.seq, "versions": dict(self._versions)}
@@ -0,0 +1,372 @@
+"""
+Ürün kataloğu ve cari bakiyeleri için veritabanı işlemleri.
+
+Senkronizasyon endpoint'leri verileri tek bir transaction içinde, partiler halinde
+INSERT ... ON CONFLICT DO UPDATE (upsert) ile yazar. Sorgular tablolardaki
+STOK_KODU / BARKOD1 / GRUP_KODU / CARI_KOD indekslerini kullanır.
+"""
+import base64
+import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import String, delete, func, literal, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import models
+from .product_ingest import PRODUCT_SCHEMA_FIELDS
+
+UPSERT_BATCH_SIZE = 1000
+DELETE_BATCH_SIZE = 500  # SQLite parametre sınırının altında kalmak için
+
+# API'deki (masaüstü JSON'u) alan adı -> tablo sütunu eşlemeleri.
+# Sıra, doğrulanmış kayıtların alan sırasıyla aynıdır; böylece veritabanından okunan katalog
+# aynı JSON baytlarına ve aynı versiyon (digest) değerine karşılık gelir.
+PRODUCT_FIELD_MAP = {field: field.lower() for field in PRODUCT_SCHEMA_FIELDS}
+CUSTOMER_FIELD_MAP = {
+    "CARI_KOD": "cari_kod",
+    "CARI_ISIM": "cari_isim",
+    "GRUP_KODU": "grup_kodu",
+    "BORC_BAKIYESI": "borc_bakiyesi",
+    "ALACAK_BAKIYESI": "alacak_bakiyesi",
+    "NET_BAKIYE": "net_bakiye",
+}
+CUSTOMER_NUMERIC_FIELDS = ("BORC_BAKIYESI", "ALACAK_BAKIYESI", "NET_BAKIYE")
+
+
+def _to_float(value):
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def normalize_customer_record(raw: Dict) -> Dict:
+    """Gelen cari kaydını tablodaki alanlara indirger; bakiyeler float'a çevrilir ("0E-8" gibi değerler dahil)."""
+    cari_kod = raw.get("CARI_KOD")
+    record = {"CARI_KOD": str(cari_kod).strip() if cari_kod is not None else ""}
+    for field in ("CARI_ISIM", "GRUP_KODU"):
+        record[field] = raw.get(field)
+    for field in CUSTOMER_NUMERIC_FIELDS:
+        record[field] = _to_float(raw.get(field))
+    return record
+
+
+def _rows_from_records(records: Iterable[Dict], field_map: Dict[str, str]) -> List[Dict]:
+    return [{column: record.get(field) for field, column in field_map.items()} for record in records]
+
+
+def _records_from_rows(rows, field_map: Dict[str, str]) -> List[Dict]:
+    return [{field: getattr(row, column) for field, column in field_map.items()} for row in rows]
+
+
+def _insert_for(db: Session, model):
+    dialect_name = db.get_bind().dialect.name
+    if dialect_name == "postgresql":
+        return postgresql.insert(model)
+    if dialect_name == "sqlite":
+        return sqlite.insert(model)
+    raise NotImplementedError(f"Upsert bu veritabanı için desteklenmiyor: {dialect_name}")
+
+
+def _upsert(db: Session, model, key_column: str, rows: List[Dict]):
+    """Satırları partiler halinde executemany ile upsert eder. Commit çağıran tarafa bırakılır."""
+    if not rows:
+        return
+    stmt = _insert_for(db, model)
+    update_columns = {column: stmt.excluded[column] for column in rows[0] if column != key_column}
+    update_columns["updated_at"] = func.now()
+    stmt = stmt.on_conflict_do_update(index_elements=[key_column], set_=update_columns)
+    for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+        db.execute(stmt, rows[start:start + UPSERT_BATCH_SIZE])
+
+
+def _delete_keys(db: Session, model, key_column: str, keys: List[str]):
+    column = getattr(model, key_column)
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        db.execute(delete(model).where(column.in_(keys[start:start + DELETE_BATCH_SIZE])))
+
+
+def _replace_all(db: Session, model, key_column: str, rows: List[Dict]):
+    """Tabloyu verilen satırlarla eşitler: upsert + listede olmayanları silme, tek transaction."""
+    incoming_keys = {row[key_column] for row in rows}
+    existing_keys = db.execute(select(getattr(model, key_column))).scalars().all()
+    stale_keys = [key for key in existing_keys if key not in incoming_keys]
+    try:
+        _delete_keys(db, model, key_column, stale_keys)
+        _upsert(db, model, key_column, rows)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+# --- Ürünler ---
+
+def load_products(db: Session) -> List[Dict]:
+    rows = db.execute(select(models.Product)).scalars().all()
+    return _records_from_rows(rows, PRODUCT_FIELD_MAP)
+
+
+def replace_products(db: Session, records: List[Dict]):
+    _replace_all(db, models.Product, "stok_kodu", _rows_from_records(records, PRODUCT_FIELD_MAP))
+
+
+def apply_product_changes(db: Session, upserts: List[Dict], deletes: List[str]):
+    try:
+        _delete_keys(db, models.Product, "stok_kodu", [str(key).strip() for key in deletes])
+        _upsert(db, models.Product, "stok_kodu", _rows_from_records(upserts, PRODUCT_FIELD_MAP))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def count_products(db: Session) -> int:
+    return db.query(models.Product).count()
+
+
+# --- Cari bakiyeleri ---
+
+def load_customer_balances(db: Session) -> List[Dict]:
+    rows = db.execute(select(models.CustomerBalance)).scalars().all()
+    return _records_from_rows(rows, CUSTOMER_FIELD_MAP)
+
+
+def replace_customer_balances(db: Session, records: List[Dict]):
+    _replace_all(db, models.CustomerBalance, "cari_kod", _rows_from_records(records, CUSTOMER_FIELD_MAP))
+
+
+def count_customer_balances(db: Session) -> int:
+    return db.query(models.CustomerBalance).count()
+
+
+# --- Siparişler ---
+# Liste/detay yanıtları ORM nesneleri ve Pydantic doğrulaması yerine doğrudan satırlardan
+# sözlük olarak oluşturulur: siparişler tek sorguda, kalemleri IN ile partiler halinde
+# (sipariş sayısından bağımsız, sınırlı sayıda sorgu) okunur. Alan sırası OrderResponse ile aynıdır.
+# Bu fonksiyonlar senkron Session kullanır; async endpoint'lerden run_in_threadpool ile
+# çağrılır ve event loop'u bloklamamak için tüm veritabanı erişimi fonksiyon içinde biter
+# (geriye lazy-load gerektiren ORM nesnesi değil, sözlük döner).
+DEFAULT_CUSTOMER_NAME = "Bilinmeyen Cari"
+
+_ORDER_COLUMNS = (
+    models.Order.id, models.Order.customer_name, models.Order.created_at,
+    models.Order.total_amount, models.Order.status,
+)
+_ORDER_ITEM_COLUMNS = (
+    models.OrderItem.id, models.OrderItem.order_id, models.OrderItem.product_code,
+    models.OrderItem.product_name, models.OrderItem.barcode, models.OrderItem.quantity,
+    models.OrderItem.unit_price,
+)
+
+
+def _order_dict(row) -> Dict:
+    customer_name = row.customer_name
+    if not customer_name or not customer_name.strip():
+        customer_name = DEFAULT_CUSTOMER_NAME
+    return {
+        "customer_name": customer_name,
+        "id": row.id,
+        "created_at": row.created_at.isoformat(),
+        "total_amount": row.total_amount,
+        "status": row.status.value,
+        "items": [],
+    }
+
+
+def _attach_order_items(db: Session, orders: List[Dict]):
+    orders_by_id = {order["id"]: order for order in orders}
+    order_ids = list(orders_by_id)
+    for start in range(0, len(order_ids), DELETE_BATCH_SIZE):
+        rows = db.execute(
+            select(*_ORDER_ITEM_COLUMNS)
+            .where(models.OrderItem.order_id.in_(order_ids[start:start + DELETE_BATCH_SIZE]))
+            .order_by(models.OrderItem.id)
+        )
+        for row in rows:
+            orders_by_id[row.order_id]["items"].append({
+                "product_code": row.product_code,
+                "product_name": row.product_name,
+                "barcode": row.barcode,
+                "quantity": row.quantity,
+                "unit_price": row.unit_price,
+                "id": row.id,
+                "order_id": row.order_id,
+            })
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_order_cursor(created_at: str, order_id: int) -> str:
+    return base64.urlsafe_b64encode(f"{created_at}|{order_id}".encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_order_cursor(cursor: str) -> Tuple[datetime.datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        created_at, order_id = raw.rsplit("|", 1)
+        return datetime.datetime.fromisoformat(created_at), int(order_id)
+    except (ValueError, UnicodeDecodeError):
+        raise InvalidCursorError("Geçersiz cursor değeri.")
+
+
+def _timestamp_param(db: Session, value: datetime.datetime):
+    # SQLite'ta created_at, server_default (CURRENT_TIMESTAMP) ile "YYYY-MM-DD HH:MM:SS" metni olarak
+    # saklanır; SQLAlchemy'nin mikro saniyeli parametre biçimi ile metin karşılaştırması aynı saniyedeki
+    # kayıtları yanlış sıralar. Parametre saklanan biçimle aynı metne çevrilir.
+    if db.get_bind().dialect.name == "sqlite":
+        return literal(value.isoformat(sep=" "), String)
+    return value
+
+
+def list_orders(db: Session, limit: int, cursor: Optional[str] = None,
+                status: Optional[models.PyOrderStatusEnum] = None, customer: Optional[str] = None,
+                date_from: Optional[datetime.date] = None, date_to: Optional[datetime.date] = None,
+                skip: int = 0) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Siparişleri en yeniden eskiye (created_at, id) sırasıyla döndürür.
+    `cursor` verilirse OFFSET yerine bir önceki sayfanın son satırından sonrası okunur (keyset);
+    böylece sayfa derinliği sorgu süresini etkilemez. İkinci değer sonraki sayfanın cursor'ıdır.
+    """
+    query = select(*_ORDER_COLUMNS)
+    if status is not None:
+        query = query.where(models.Order.status == status)
+    if customer:
+        escaped = customer.strip().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query = query.where(models.Order.customer_name.ilike(f"%{escaped}%", escape="\\"))
+    if date_from:
+        query = query.where(models.Order.created_at >= _timestamp_param(db, datetime.datetime.combine(date_from, datetime.time.min)))
+    if date_to:
+        # Bitiş günü dahildir
+        day_after = datetime.datetime.combine(date_to + datetime.timedelta(days=1), datetime.time.min)
+        query = query.where(models.Order.created_at < _timestamp_param(db, day_after))
+    if cursor:
+        cursor_created_at, cursor_id = decode_order_cursor(cursor)
+        query = query.where(tuple_(models.Order.created_at, models.Order.id) < tuple_(_timestamp_param(db, cursor_created_at), cursor_id))
+    elif skip:
+        query = query.offset(skip)
+
+    rows = db.execute(query.order_by(models.Order.created_at.desc(), models.Order.id.desc()).limit(limit))
+    orders = [_order_dict(row) for row in rows]
+    _attach_order_items(db, orders)
+    next_cursor = None
+    if len(orders) == limit:
+        last = orders[-1]
+        next_cursor = encode_order_cursor(last["created_at"], last["id"])
+    return orders, next_cursor
+
+
+def get_order(db: Session, order_id: int):
+    row = db.execute(select(*_ORDER_COLUMNS).where(models.Order.id == order_id)).first()
+    if row is None:
+        return None
+    order = _order_dict(row)
+    _attach_order_items(db, [order])
+    return order
+
+
+def get_order_id_by_idempotency_key(db: Session, idempotency_key: str) -> Optional[int]:
+    return db.execute(select(models.Order.id).where(models.Order.idempotency_key == idempotency_key)).scalar()
+
+
+def create_order(db: Session, customer_name: Optional[str], items: List[Dict],
+                 idempotency_key: Optional[str] = None) -> Tuple[Dict, bool]:
+    """
+    Siparişi ve kalemlerini tek transaction içinde kaydeder; (sipariş, yeni_kayıt_mı) döndürür.
+    `items` kalemleri product_code, product_name, barcode, quantity, unit_price alanlarıyla verilir.
+    `idempotency_key` verilirse ve bu anahtarla kaydedilmiş bir sipariş varsa yeni sipariş
+    oluşturulmaz, mevcut sipariş döner. Anahtar veritabanında tekil indekslidir; aynı anahtarla
+    eşzamanlı gelen iki istekten yalnızca biri kaydedilir, diğeri ilk kaydı alır.
+    """
+    if idempotency_key:
+        existing_id = get_order_id_by_idempotency_key(db, idempotency_key)
+        if existing_id is not None:
+            return get_order(db, existing_id), False
+
+    db_order = models.Order(
+        customer_name=customer_name,
+        status=models.PyOrderStatusEnum.PENDING,
+        total_amount=sum(item["quantity"] * item["unit_price"] for item in items),
+        idempotency_key=idempotency_key or None,
+    )
+    db_order.items.extend(models.OrderItem(**item) for item in items)
+    try:
+        db.add(db_order)
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        existing_id = get_order_id_by_idempotency_key(db, idempotency_key) if idempotency_key else None
+        if existing_id is None:
+            raise
+        return get_order(db, existing_id), False
+    except Exception:
+        db.rollback()
+        raise
+    return get_order(db, db_order.id), True
+
+
+def update_order_status(db: Session, order_id: int, new_status: models.PyOrderStatusEnum) -> Optional[Dict]:
+    """Siparişin durumunu günceller; sipariş yoksa None döner."""
+    try:
+        result = db.execute(
+            models.Order.__table__.update().where(models.Order.id == order_id).values(status=new_status)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    if result.rowcount == 0:
+        return None
+    return get_order(db, order_id)
+
+
+# --- Görüntülenme sayaçları ---
+# Artışlar "count = count + delta" ile atomik olarak uygulanır; birden fazla worker aynı
+# sayacı artırsa da hiçbir artış kaybolmaz.
+
+def add_view_counts(db: Session, deltas: Dict[str, int]):
+    """Sayaçlara verilen artışları tek transaction içinde ekler (sayaç yoksa oluşturulur)."""
+    if not deltas:
+        return
+    stmt = _insert_for(db, models.ViewCounter)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["counter_key"],
+        set_={"count": models.ViewCounter.count + stmt.excluded["count"], "updated_at": func.now()},
+    )
+    try:
+        db.execute(stmt, [{"counter_key": key, "count": delta} for key, delta in deltas.items()])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def get_view_counts(db: Session, keys: Iterable[str]) -> Dict[str, int]:
+    """Verilen sayaçların güncel değerlerini döndürür; kaydı olmayan sayaçlar 0'dır."""
+    keys = list(keys)
+    counts = dict.fromkeys(keys, 0)
+    for start in range(0, len(keys), DELETE_BATCH_SIZE):
+        rows = db.execute(
+            select(models.ViewCounter.counter_key, models.ViewCounter.count)
+            .where(models.ViewCounter.counter_key.in_(keys[start:start + DELETE_BATCH_SIZE]))
+        )
+        counts.update({row.counter_key: row.count for row in rows})
+    return counts
+
+
+def seed_view_count(db: Session, key: str, count: int) -> bool:
+    """Sayaç henüz yoksa başlangıç değeriyle oluşturur; oluşturulduysa True döner."""
+    stmt = _insert_for(db, models.ViewCounter).values(counter_key=key, count=count)
+    try:
+        result = db.execute(stmt.on_conflict_do_nothing(index_elements=["counter_key"]))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result.rowcount == 1
@@ -1,6 +1,8 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 import os
 
 # Render'daki DATABASE_URL ortam değişkenini al
@@ -15,9 +17,94 @@ if SQLALCHEMY_DATABASE_URL is None:
 
 print(f"DATABASE.PY: Kullanılacak veritabanı URL\'si: {SQLALCHEMY_DATABASE_URL}")
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+
+def _env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        print(f"UYARI: {name} ortam değişkeni geçersiz ('{value}'), varsayılan değer kullanılacak: {default}")
+        return default
+
+
+# SQLite ayarları. WAL kipinde okuyucular yazma işlemini beklemez; synchronous=NORMAL WAL ile
+# birlikte güvenlidir (çökmede yalnızca son commit'ler kaybolabilir, veritabanı bozulmaz).
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL").upper()
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL").upper()
+# cache_size her bağlantı için ayrı ayrılır: en kötü durumda toplam önbellek
+# SQLITE_CACHE_SIZE_KB x (DB_POOL_SIZE + DB_MAX_OVERFLOW) olur (varsayılanlarla 15 x 8 MB = 120 MB).
+# mmap ile eşlenen sayfalar ise işletim sisteminin sayfa önbelleğinden bağlantılar arasında paylaşılır.
+SQLITE_CACHE_SIZE_KB = _env_int("SQLITE_CACHE_SIZE_KB", 8 * 1024)
+SQLITE_MMAP_SIZE_MB = _env_int("SQLITE_MMAP_SIZE_MB", 256)
+SQLITE_BUSY_TIMEOUT_MS = _env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+
+# Bağlantı havuzu ayarları (SQLite dosyası ve PostgreSQL için)
+DB_POOL_SIZE = _env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = _env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_TIMEOUT = _env_int("DB_POOL_TIMEOUT", 30)
+
+_SQLITE_JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+_SQLITE_SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+
+
+def _sqlite_pragmas():
+    journal_mode = SQLITE_JOURNAL_MODE if SQLITE_JOURNAL_MODE in _SQLITE_JOURNAL_MODES else "WAL"
+    synchronous = SQLITE_SYNCHRONOUS if SQLITE_SYNCHRONOUS in _SQLITE_SYNCHRONOUS_MODES else "NORMAL"
+    return [
+        f"PRAGMA journal_mode={journal_mode}",
+        f"PRAGMA synchronous={synchronous}",
+        f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}",  # Negatif değer KB cinsindendir
+        f"PRAGMA mmap_size={SQLITE_MMAP_SIZE_MB * 1024 * 1024}",
+        f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def create_db_engine(database_url: str):
+    """
+    Veritabanı türüne uygun ayarlarla engine oluşturur.
+    SQLite için her yeni bağlantıda WAL ve performans pragma'ları uygulanır; dosya veritabanı
+    bağlantı havuzu (QueuePool) ile, bellek içi veritabanı tek paylaşılan bağlantı ile kullanılır.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            database_url,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_pre_ping=True,
+        )
+
+    if url.database in (None, "", ":memory:"):
+        # Bellek içi veritabanı bağlantıya özeldir; tüm oturumlar aynı bağlantıyı paylaşmalıdır
+        new_engine = create_engine(database_url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        new_engine = create_engine(
+            database_url,
+            connect_args={"check_same_thread": False},
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+
+    pragmas = _sqlite_pragmas()
+
+    @event.listens_for(new_engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    return new_engine
+
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -29,4 +116,4 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
@@ -0,0 +1,138 @@
+"""
+Async endpoint'ler için bloklamayan dosya (ve diğer senkron) işlemleri.
+
+`FileStorage` senkron işlemleri sınırlı sayıda thread'den oluşan bir havuzda çalıştırır
+(anyio CapacityLimiter); böylece büyük bir dosya yüklemesi veya yavaş bir disk, tek worker
+üzerindeki diğer istekleri bekletmez. Havuz boyutu sınırlı olduğu için çok sayıda eşzamanlı
+yükleme de diske sınırsız sayıda thread ile yüklenmez; fazlası sırada bekler.
+
+Her işlem türü için çağrı sayısı, thread içinde geçen süre ve havuzda sıra bekleme süresi
+tutulur (`stats`). Eşik değerinden uzun süren işlemler konsola yazılır. Havuz ve ölçüm
+kısmı `BoundedExecutor` sınıfındadır; dosya dışı CPU ağırlıklı işler (örn. bcrypt) için
+ayrı bir havuz olarak da kullanılabilir.
+"""
+import os
+import shutil
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import anyio
+import anyio.to_thread
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Yüklenen dosyalar 1 MB'lık parçalarla kopyalanır
+
+
+class _OperationStats:
+    __slots__ = ("count", "errors", "total_seconds", "max_seconds", "wait_seconds")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.wait_seconds = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_seconds * 1000, 1),
+            "avg_ms": round(self.total_seconds * 1000 / self.count, 2) if self.count else 0.0,
+            "max_ms": round(self.max_seconds * 1000, 1),
+            "queue_wait_ms": round(self.wait_seconds * 1000, 1),
+        }
+
+
+class BoundedExecutor:
+    """Senkron işlemleri sınırlı bir thread havuzunda çalıştırır ve süre istatistiklerini tutar."""
+
+    def __init__(self, max_threads: int = 8, slow_threshold: float = 0.5):
+        self.max_threads = max_threads
+        self.slow_threshold = slow_threshold
+        self._limiter: Optional[anyio.CapacityLimiter] = None
+        self._stats: Dict[str, _OperationStats] = {}
+        self._stats_lock = threading.Lock()
+
+    @property
+    def limiter(self) -> anyio.CapacityLimiter:
+        # CapacityLimiter event loop içinde oluşturulmalıdır; ilk kullanımda hazırlanır
+        if self._limiter is None:
+            self._limiter = anyio.CapacityLimiter(self.max_threads)
+        return self._limiter
+
+    async def run(self, operation: str, func: Callable, *args, **kwargs):
+        """`func` fonksiyonunu thread havuzunda çalıştırır ve süresini `operation` adıyla kaydeder."""
+        submitted_at = time.perf_counter()
+        timing = {}
+
+        def timed_call():
+            timing["started"] = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timing["finished"] = time.perf_counter()
+
+        failed = False
+        try:
+            return await anyio.to_thread.run_sync(timed_call, limiter=self.limiter)
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            started = timing.get("started", submitted_at)
+            self._record(operation, started - submitted_at, timing.get("finished", started) - started, failed)
+
+    def _record(self, operation: str, wait_seconds: float, run_seconds: float, failed: bool):
+        with self._stats_lock:
+            stats = self._stats.setdefault(operation, _OperationStats())
+            stats.count += 1
+            stats.errors += int(failed)
+            stats.total_seconds += run_seconds
+            stats.max_seconds = max(stats.max_seconds, run_seconds)
+            stats.wait_seconds += wait_seconds
+        if run_seconds >= self.slow_threshold:
+            print(f"UYARI: Yavaş işlem '{operation}': {run_seconds * 1000:.0f} ms (sırada bekleme {wait_seconds * 1000:.0f} ms)")
+
+    def stats(self) -> Dict[str, Any]:
+        """İşlem türüne göre süre istatistikleri ve havuzun anlık doluluğu."""
+        with self._stats_lock:
+            operations = {operation: stats.as_dict() for operation, stats in sorted(self._stats.items())}
+        limiter = self._limiter
+        return {
+            "max_threads": self.max_threads,
+            "busy_threads": limiter.borrowed_tokens if limiter else 0,
+            "waiting": limiter.statistics().tasks_waiting if limiter else 0,
+            "operations": operations,
+        }
+
+
+class FileStorage(BoundedExecutor):
+    """Async endpoint'lerde sık kullanılan dosya işlemleri."""
+
+    async def list_files(self, directory: str, extensions: Optional[Iterable[str]] = None) -> List[str]:
+        """Dizindeki dosyaların adlarını sıralı döndürür; `extensions` verilirse yalnızca bu uzantılar."""
+        suffixes = tuple(extensions) if extensions else None
+
+        def scan():
+            with os.scandir(directory) as entries:
+                return sorted(
+                    entry.name for entry in entries
+                    if entry.is_file() and (suffixes is None or entry.name.lower().endswith(suffixes))
+                )
+
+        return await self.run("list_files", scan)
+
+    async def save_stream(self, source, file_path: str):
+        """Dosya benzeri `source` nesnesini parça parça `file_path` yoluna yazar."""
+        def copy():
+            with open(file_path, "wb") as buffer:
+                shutil.copyfileobj(source, buffer, UPLOAD_CHUNK_SIZE)
+
+        await self.run("save_upload", copy)
+
+    async def is_file(self, file_path: str) -> bool:
+        return await self.run("stat", os.path.isfile, file_path)
+
+    async def remove(self, file_path: str):
+        await self.run("remove", os.remove, file_path)
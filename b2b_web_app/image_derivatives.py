@@ -0,0 +1,189 @@
+"""
+Ürün görselleri için küçük boyutlu (thumbnail) ve WebP/AVIF türevlerinin üretimi.
+
+Ürün görsellerinin (stok koduna ait dosya `image_manifest` ile bulunur) sabit genişlikli
+türevleri ilk istendiklerinde üretilir ve diskte sınırlı boyutlu bir önbellekte tutulur. Önbellek
+dolduğunda en uzun süredir kullanılmayan türevler silinir (LRU). Türev dosya adı kaynak
+dosyanın değiştirilme zamanını ve boyutunu içerdiğinden, görsel güncellendiğinde eski
+türev kullanılmaz.
+
+Pillow requirements.txt'te sabitlenmiştir (AVIF/WebP destekli sürüm). Kurulu değilse türev
+üretilmez ve orijinal dosya sunulur.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow kurulu değilse orijinal görseller sunulur
+    Image = None
+
+DEFAULT_WIDTHS = (80, 160, 320)
+
+# Çıktı formatı -> (Pillow format adı, dosya uzantısı, media type, kayıt ayarları)
+OUTPUT_FORMATS = {
+    "avif": ("AVIF", "avif", "image/avif", {"quality": 55, "speed": 8}),
+    "webp": ("WEBP", "webp", "image/webp", {"quality": 78, "method": 4}),
+    "jpeg": ("JPEG", "jpg", "image/jpeg", {"quality": 82, "optimize": True, "progressive": True}),
+    "png": ("PNG", "png", "image/png", {"optimize": True}),
+}
+SOURCE_MEDIA_TYPES = {".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".png": "image/png", ".webp": "image/webp"}
+
+
+def _supported_formats() -> Tuple[str, ...]:
+    if Image is None:
+        return ()
+    Image.init()
+    return tuple(name for name, (pil_format, _, _, _) in OUTPUT_FORMATS.items() if pil_format in Image.SAVE)
+
+
+class ProductImageDerivatives:
+    def __init__(self, cache_dir: str, widths: Iterable[int] = DEFAULT_WIDTHS, max_cache_bytes: int = 256 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.widths = tuple(sorted(set(widths)))
+        self.max_cache_bytes = max_cache_bytes
+        self.formats = _supported_formats()
+        self._lock = threading.Lock()
+        self._entries: Optional["OrderedDict[str, int]"] = None  # Dosya adı -> boyut, en eski kullanım başta
+        self._total_bytes = 0
+        self._key_locks: Dict[str, threading.Lock] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return Image is not None
+
+    def snap_width(self, width: int) -> int:
+        """İstenen genişliği desteklenen en yakın (eşit veya büyük) genişliğe yuvarlar; önbellek sınırsız büyümez."""
+        for candidate in self.widths:
+            if candidate >= width:
+                return candidate
+        return self.widths[-1]
+
+    def choose_format(self, requested: Optional[str], accept_header: str, source_ext: str) -> str:
+        """`fmt` parametresi yoksa tarayıcının Accept başlığına göre en küçük desteklenen formatı seçer."""
+        if requested in self.formats:
+            return requested
+        accept = accept_header or ""
+        for candidate in ("avif", "webp"):
+            if candidate in self.formats and f"image/{candidate}" in accept:
+                return candidate
+        return "png" if source_ext == ".png" else "jpeg"
+
+    def get_derivative(self, source_path: str, width: int, output_format: str) -> Tuple[str, str]:
+        """
+        Kaynak görselin `width` genişliğindeki türevinin yolunu ve media type'ını döndürür;
+        türev yoksa üretir. Senkron çalışır, async kodda thread havuzunda çağrılmalıdır.
+        """
+        if not self.enabled or output_format not in self.formats:
+            return source_path, SOURCE_MEDIA_TYPES.get(os.path.splitext(source_path)[1].lower(), "application/octet-stream")
+
+        pil_format, extension, media_type, save_options = OUTPUT_FORMATS[output_format]
+        source_stat = os.stat(source_path)
+        fingerprint = hashlib.sha1(
+            f"{os.path.basename(source_path)}:{source_stat.st_mtime_ns}:{source_stat.st_size}".encode("utf-8")
+        ).hexdigest()[:20]
+        file_name = f"{fingerprint}_{width}.{extension}"
+        file_path = os.path.join(self.cache_dir, file_name)
+
+        self._ensure_index()
+        if self._touch(file_name):
+            return file_path, media_type
+
+        # Aynı türev için eşzamanlı istekler görseli yalnızca bir kez üretir
+        with self._lock:
+            key_lock = self._key_locks.setdefault(file_name, threading.Lock())
+        with key_lock:
+            try:
+                if not self._touch(file_name):
+                    size = self._render(source_path, file_path, width, pil_format, save_options)
+                    self._add(file_name, size)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(file_name, None)
+        return file_path, media_type
+
+    def _render(self, source_path: str, file_path: str, width: int, pil_format: str, save_options: dict) -> int:
+        with Image.open(source_path) as image:
+            if image.format == "JPEG":
+                # JPEG'i doğrudan küçük ölçekte çözmek, tam boyutlu açıp küçültmekten çok daha hızlıdır
+                image.draft("RGB", (width, width * 4))
+            image.load()
+            has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+            if pil_format == "JPEG" or not has_alpha:
+                image = image.convert("RGB")
+            elif image.mode != "RGBA":
+                image = image.convert("RGBA")
+            if image.width > width:
+                image.thumbnail((width, image.height), Image.LANCZOS)
+
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{file_path}.{threading.get_ident()}.tmp"
+            try:
+                image.save(temp_path, pil_format, **save_options)
+                os.replace(temp_path, file_path)  # Yarım yazılmış dosya sunulmaz
+            except BaseException:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+                raise
+        return os.path.getsize(file_path)
+
+    def _ensure_index(self):
+        if self._entries is not None:
+            return
+        entries = []
+        if os.path.isdir(self.cache_dir):
+            with os.scandir(self.cache_dir) as scanned:
+                for entry in scanned:
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        stat = entry.stat()
+                        entries.append((stat.st_mtime, entry.name, stat.st_size))
+        entries.sort()
+        with self._lock:
+            if self._entries is None:
+                self._entries = OrderedDict((name, size) for _, name, size in entries)
+                self._total_bytes = sum(size for _, _, size in entries)
+        self._evict()
+
+    def _touch(self, file_name: str) -> bool:
+        with self._lock:
+            if file_name not in self._entries:
+                return False
+            self._entries.move_to_end(file_name)
+            return True
+
+    def _add(self, file_name: str, size: int):
+        with self._lock:
+            self._total_bytes += size - self._entries.pop(file_name, 0)
+            self._entries[file_name] = size
+        self._evict()
+
+    def _evict(self):
+        while True:
+            with self._lock:
+                # Son eklenen türev, sınırı aşsa bile silinmez
+                if self._total_bytes <= self.max_cache_bytes or len(self._entries) <= 1:
+                    return
+                file_name, size = self._entries.popitem(last=False)
+                self._total_bytes -= size
+            try:
+                os.remove(os.path.join(self.cache_dir, file_name))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                print(f"UYARI: Görsel önbelleğinden dosya silinemedi ({file_name}): {e}")
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            entry_count = len(self._entries) if self._entries is not None else 0
+            total_bytes = self._total_bytes
+        return {
+            "enabled": self.enabled,
+            "formats": list(self.formats),
+            "widths": list(self.widths),
+            "cached_files": entry_count,
+            "cached_bytes": total_bytes,
+            "max_cache_bytes": self.max_cache_bytes,
+        }
@@ -0,0 +1,137 @@
+"""
+Ürün görseli dosyalarının bellek içi dizini (manifest).
+
+Masaüstü uygulaması her ürün için `images/product_<STOK_KODU>.png` yolunu gönderir; ancak
+diskteki görsellerin çoğu `.jpg`/`.jpeg` uzantılıdır veya `-01` gibi ekler taşır. Tarayıcının
+uzantıları tek tek deneyip 404 alması yerine sunucu, görsel dizinini başlangıçta bir kez tarar
+ve her stok kodunu gerçekten var olan dosyaya eşler. Dizin değiştiğinde (watchfiles kuruluysa
+dosya sistemi olaylarıyla, değilse belirli aralıklarla yeniden tarayarak) manifest yenilenir.
+
+Eşleme kuralları:
+- `product_<kod>.<uzantı>` tam eşleşmedir; birden fazla uzantı varsa `SOURCE_EXTENSIONS` sırası geçerlidir.
+- Tam eşleşme yoksa `product_<kod>-<numara>.<uzantı>` dosyalarından numarası en küçük olanı kullanılır.
+- Stok kodundaki `/` karakteri dosya adında `_` olarak yazılır (data_extractor ile aynı kural).
+"""
+import hashlib
+import os
+import re
+import threading
+from typing import Dict, Optional, Tuple
+
+try:
+    import watchfiles
+except ImportError:  # watchfiles isteğe bağlıdır, kurulu değilse dizin belirli aralıklarla taranır
+    watchfiles = None
+
+SOURCE_EXTENSIONS = (".jpg", ".png", ".jpeg", ".webp")
+FILE_PREFIX = "product_"
+_SUFFIX_PATTERN = re.compile(r"^(.+)-(\d{1,3})$")
+
+
+def image_key(stok_kodu: str) -> str:
+    """Stok kodunun görsel dosya adında kullanılan biçimi."""
+    return str(stok_kodu).strip().replace("/", "_")
+
+
+def scan_product_images(directory: str) -> Dict[str, Tuple[str, int, int]]:
+    """Dizindeki ürün görsellerini tarar; anahtar -> (dosya adı, mtime_ns, boyut) döndürür."""
+    exact: Dict[str, Tuple[int, Tuple[str, int, int]]] = {}
+    suffixed: Dict[str, Tuple[Tuple[int, int], Tuple[str, int, int]]] = {}
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.startswith(FILE_PREFIX):
+                    continue
+                stem, extension = os.path.splitext(name)
+                extension = extension.lower()
+                if extension not in SOURCE_EXTENSIONS or not entry.is_file():
+                    continue
+                stat = entry.stat()
+                record = (name, stat.st_mtime_ns, stat.st_size)
+                key = stem[len(FILE_PREFIX):]
+                priority = SOURCE_EXTENSIONS.index(extension)
+                if key not in exact or priority < exact[key][0]:
+                    exact[key] = (priority, record)
+                match = _SUFFIX_PATTERN.match(key)
+                if match:
+                    base_key, number = match.group(1), int(match.group(2))
+                    rank = (number, priority)
+                    if base_key not in suffixed or rank < suffixed[base_key][0]:
+                        suffixed[base_key] = (rank, record)
+    except FileNotFoundError:
+        return {}
+
+    manifest = {key: record for key, (_, record) in suffixed.items()}
+    manifest.update({key: record for key, (_, record) in exact.items()})  # Tam eşleşme her zaman önceliklidir
+    return manifest
+
+
+class ProductImageManifest:
+    def __init__(self, directory: str, poll_interval: float = 10.0):
+        self.directory = directory
+        self.poll_interval = poll_interval
+        self._entries: Dict[str, Tuple[str, int, int]] = {}
+        self.version = ""
+        self._refresh_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def refresh(self) -> bool:
+        """Dizini yeniden tarar; manifest değiştiyse True döndürür."""
+        with self._refresh_lock:
+            entries = scan_product_images(self.directory)
+            version = hashlib.sha1(repr(sorted(entries.items())).encode("utf-8")).hexdigest()[:16]
+            if version == self.version:
+                return False
+            # Okuyucular kilitsiz okur; sözlük ve versiyon tek atamayla değiştirilir
+            self._entries = entries
+            self.version = version
+        print(f"Ürün görseli manifesti güncellendi: {len(entries)} görsel (versiyon {version}).")
+        return True
+
+    def resolve(self, stok_kodu: str) -> Optional[Tuple[str, int, int]]:
+        """Stok koduna ait görselin (dosya adı, mtime_ns, boyut) bilgisini döndürür; görsel yoksa None."""
+        return self._entries.get(image_key(stok_kodu))
+
+    def path_for(self, stok_kodu: str) -> Optional[str]:
+        entry = self.resolve(stok_kodu)
+        return os.path.join(self.directory, entry[0]) if entry else None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def start(self):
+        """İlk taramayı yapar ve dizini izleyen arka plan thread'ini başlatır."""
+        self.refresh()
+        if self._thread is not None:
+            return
+        self._stop_event.clear()
+        target = self._watch if watchfiles is not None else self._poll
+        self._thread = threading.Thread(target=target, name="product-image-manifest", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join(timeout=5)
+
+    def _watch(self):
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            for _ in watchfiles.watch(self.directory, stop_event=self._stop_event, recursive=False, rust_timeout=1000):
+                self._safe_refresh()
+        except Exception as e:
+            print(f"UYARI: Görsel dizini izlenemiyor, periyodik taramaya geçiliyor: {e}")
+            self._poll()
+
+    def _poll(self):
+        while not self._stop_event.wait(self.poll_interval):
+            self._safe_refresh()
+
+    def _safe_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"HATA: Ürün görseli manifesti güncellenemedi: {e}")
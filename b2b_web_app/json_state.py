@@ -0,0 +1,61 @@
+"""
+Sunucu tarafındaki JSON durum dosyaları için çökmeye dayanıklı yazma yardımcıları.
+
+Dosyalar hiçbir zaman yerinde ("w" kipinde) yazılmaz: içerik aynı dizindeki geçici bir
+dosyaya yazılır, fsync ile diske indirilir ve os.replace ile tek adımda asıl dosyanın
+yerine konur. Böylece eşzamanlı bir okuyucu ya da yazma sırasında oluşan bir çökme
+yarım kalmış bir dosya görmez; ya eski ya da yeni içerik okunur.
+"""
+import json
+import os
+import tempfile
+from typing import Any
+
+
+def atomic_write_json(file_path: str, data: Any, **dump_kwargs):
+    """`data` nesnesini JSON olarak `file_path` dosyasına atomik şekilde yazar."""
+    directory = os.path.dirname(os.path.abspath(file_path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(prefix=f".{os.path.basename(file_path)}.", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_kwargs)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _fsync_directory(directory)
+
+
+def _fsync_directory(directory: str):
+    # Yeniden adlandırmanın kalıcı olması için dizin girdisi de diske indirilir (Windows'ta desteklenmez)
+    if os.name != "posix":
+        return
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+def read_json(file_path: str, default: Any = None) -> Any:
+    """JSON dosyasını okur; dosya yoksa veya bozuksa `default` döner."""
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"UYARI: '{file_path}' okunamadı veya bozuk: {e}")
+        return default
+
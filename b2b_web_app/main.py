@@ -1,15 +1,18 @@
-from fastapi import FastAPI, HTTPException, Request, Depends, status, Form, Header, UploadFile, File
-from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
+from fastapi import FastAPI, HTTPException, Request, Depends, status, Form, Header, UploadFile, File, Query
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, Response, StreamingResponse
 from fastapi.templating import Jinja2Templates
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.sessions import SessionMiddleware
-from typing import List, Dict, Optional, Any
+from starlette.concurrency import run_in_threadpool
+from typing import List, Dict, Optional, Any, Tuple
 import json
 import os
+import re
+from urllib.parse import quote
 import datetime # datetime importu eklendi
 import secrets # Güçlü anahtar üretimi için eklendi
-import shutil # Dosya işlemleri için eklendi
+import threading
 from passlib.context import CryptContext
+from sqlalchemy import inspect as sqlalchemy_inspect, text
 from sqlalchemy.orm import Session # SQLAlchemy Session importu eklendi
 from pydantic import BaseModel, field_validator # Pydantic BaseModel importu eklendi, field_validator eklendi
 from dotenv import load_dotenv # EKLENDİ
@@ -19,11 +22,40 @@ load_dotenv() # EKLENDİ
 
 # Veritabanı ve model importları
 from . import models # models.py dosyamızı import ediyoruz
+from . import crud
 from .database import engine, SessionLocal, get_db # database.py'den engine, SessionLocal ve get_db'yi import ediyoruz
+from .catalog_store import CatalogStore, CatalogSnapshot, CatalogVersionConflict
+from .request_compression import RequestDecompressionMiddleware, DEFAULT_MAX_DECOMPRESSED_BYTES
+from .product_ingest import iter_json_array, validate_product_record, ProductIngestError
+from .json_state import read_json
+from . import product_query
+from .product_search import ProductSearchIndex
+from .file_storage import BoundedExecutor, FileStorage
+from .view_counter import ViewCounter
+from .image_derivatives import ProductImageDerivatives
+from .image_manifest import ProductImageManifest, image_key
+from .static_assets import StaticAssets, precompress_directory, asset_fingerprint, IMMUTABLE_MAX_AGE
+from .change_feed import ChangeFeed
 
 # Uygulama başlangıcında veritabanı tablolarını oluştur (eğer yoksa)
 print("Veritabanı tabloları kontrol ediliyor ve gerekirse oluşturuluyor...")
 models.Base.metadata.create_all(bind=engine)
+# create_all mevcut tablolara sonradan eklenen sütunları ve indeksleri oluşturmaz; boş olabilen yeni sütunlar eklenir
+existing_order_columns = {column["name"] for column in sqlalchemy_inspect(engine).get_columns(models.Order.__tablename__)}
+for order_column in models.Order.__table__.columns:
+    if order_column.name in existing_order_columns or not order_column.nullable:
+        continue
+    try:
+        with engine.begin() as connection:
+            connection.execute(text(
+                f"ALTER TABLE {models.Order.__tablename__} ADD COLUMN {order_column.name} "
+                f"{order_column.type.compile(dialect=engine.dialect)}"
+            ))
+        print(f"'{models.Order.__tablename__}' tablosuna '{order_column.name}' sütunu eklendi.")
+    except Exception as e:  # Aynı anda açılan başka bir worker eklemiş olabilir
+        print(f"UYARI: '{order_column.name}' sütunu eklenemedi: {e}")
+for table_index in models.Order.__table__.indexes:
+    table_index.create(bind=engine, checkfirst=True)
 print("Veritabanı tabloları hazır!")
 
 # --- Pydantic Şemaları (Schemas) Başlangıcı ---
@@ -81,6 +113,11 @@ class OrderResponse(OrderBase):
 
 class OrderStatusUpdate(BaseModel):
     status: models.PyOrderStatusEnum # models.OrderStatusEnum yerine models.PyOrderStatusEnum
+
+class ProductDeltaRequest(BaseModel):
+    base_version: str # Masaüstünün son onaylanan katalog versiyonu
+    upserts: List[Dict] = [] # Eklenen veya değişen ürünler (tam kayıt)
+    deletes: List[str] = [] # Silinen ürünlerin STOK_KODU değerleri
 # --- Pydantic Şemaları (Schemas) Sonu ---
 
 # Templates ve Static dizinlerinin yollarını belirle
@@ -102,11 +139,47 @@ if not CUSTOMER_BALANCES_JSON_PATH:
     CUSTOMER_BALANCES_JSON_PATH = os.path.join(LOCAL_APP_DATA_DIR, DEFAULT_CUSTOMER_BALANCES_FILENAME)
     # Yerel dizinin var olduğundan emin olma işlemi, dosyaya yazılmadan hemen önce yapılacaktır.
 print(f"Cari bakiye JSON dosyası için kullanılacak yol: {CUSTOMER_BALANCES_JSON_PATH}")
+# Cari listesi veritabanında (customer_balances tablosu) saklanır; bu dosya yalnızca ilk açılışta bir kez içe aktarılır.
+# Okumalar için ürün kataloğu gibi bellekte snapshot olarak tutulur
+customer_balances_store = CatalogStore("Cari bakiyeleri", key_field="CARI_KOD", sort_fields=("CARI_ISIM", "CARI_KOD"))
 
 # Galeri sayfası görüntülenme sayacı için dosya yolu
 if 'LOCAL_APP_DATA_DIR' not in locals():
     LOCAL_APP_DATA_DIR = os.path.join(BASE_DIR, "app_data")
-VIEW_COUNTER_FILE = os.path.join(LOCAL_APP_DATA_DIR, "view_counter.json")
+VIEW_COUNTER_FILE = os.path.join(LOCAL_APP_DATA_DIR, "view_counter.json") # Yalnızca eski değerin içe aktarılması için
+GALLERY_VIEW_COUNTER_KEY = "discount_gallery"
+# Sayaç veritabanında tutulur; artışlar bellekte biriktirilip belirli aralıklarla atomik olarak eklenir
+view_counter = ViewCounter(SessionLocal, flush_interval=float(os.getenv("VIEW_COUNTER_FLUSH_SECONDS", "2")))
+
+# Async endpoint'lerdeki disk (ve toplu veritabanı) işlemleri sınırlı bir thread havuzunda çalışır
+file_storage = FileStorage(max_threads=int(os.getenv("FILE_IO_MAX_THREADS", "8")))
+
+# Katalog, cari ve sipariş değişikliklerinin açık sayfalara bildirildiği SSE kanalı (GET /api/events)
+change_feed = ChangeFeed(heartbeat_seconds=float(os.getenv("EVENT_STREAM_HEARTBEAT_SECONDS", "25")))
+EVENT_STREAM_MAX_CLIENTS = int(os.getenv("EVENT_STREAM_MAX_CLIENTS", "1000"))
+
+# Stok kodu -> gerçek görsel dosyası eşlemesi; katalog yanıtlarındaki görsel yolları buradan çözülür
+PRODUCT_IMAGES_DIR = os.path.join(STATIC_DIR, "images")
+PRODUCT_IMAGE_PLACEHOLDER = "images/urun_yok.png"
+product_image_manifest = ProductImageManifest(PRODUCT_IMAGES_DIR, poll_interval=float(os.getenv("PRODUCT_IMAGE_POLL_SECONDS", "10")))
+
+# Ürün görsellerinin küçük boyutlu/WebP/AVIF türevleri ilk istekte üretilip sınırlı boyutlu bir disk önbelleğinde tutulur
+PRODUCT_IMAGE_CACHE_DIR = os.getenv("PRODUCT_IMAGE_CACHE_DIR", os.path.join(LOCAL_APP_DATA_DIR, "image_cache"))
+PRODUCT_IMAGE_MAX_AGE = int(os.getenv("PRODUCT_IMAGE_MAX_AGE", "86400"))
+product_images = ProductImageDerivatives(
+    PRODUCT_IMAGE_CACHE_DIR,
+    max_cache_bytes=int(os.getenv("PRODUCT_IMAGE_CACHE_MB", "256")) * 1024 * 1024
+)
+# Görsel küçültme CPU ağırlıklıdır; dosya işlemlerini bekletmemesi için ayrı ve küçük bir havuzda çalışır
+image_executor = BoundedExecutor(max_threads=int(os.getenv("IMAGE_RESIZE_MAX_THREADS", "2")), slow_threshold=1.0)
+if not product_images.enabled:
+    print("UYARI: Pillow kurulu değil (requirements.txt); ürün görsellerinin küçük boyutlu türevleri üretilmeyecek, orijinaller sunulacak.")
+else:
+    missing_image_formats = [fmt for fmt in ("avif", "webp") if fmt not in product_images.formats]
+    if missing_image_formats:
+        print(f"UYARI: Kurulu Pillow şu formatları kaydedemiyor: {', '.join(missing_image_formats).upper()}. "
+              f"Bu tarayıcılara daha büyük türevler sunulacak; AVIF/WebP destekli Pillow sürümü (requirements.txt) kurun.")
+    print(f"Ürün görseli türev formatları: {', '.join(product_images.formats)}")
 
 # --- API Anahtarı Ayarı (Ortam Değişkeninden Oku) ---
 PRODUCTS_API_KEY_VALUE = os.environ.get("PRODUCTS_API_KEY")
@@ -164,20 +237,93 @@ if not SECRET_KEY:
 
 app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
 
-# Static dosyaları sunmak için app.mount kullanılır
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+# Senkronizasyon endpoint'leri gzip/zstd ile sıkıştırılmış gövde kabul eder
+MAX_DECOMPRESSED_BODY_BYTES = int(os.getenv("MAX_DECOMPRESSED_BODY_BYTES", DEFAULT_MAX_DECOMPRESSED_BYTES))
+app.add_middleware(
+    RequestDecompressionMiddleware,
+    paths=["/api/products", "/api/products/delta", "/api/update-customer-balances"],
+    max_decompressed_bytes=MAX_DECOMPRESSED_BODY_BYTES
+)
+
+# Static dosyaları sunmak için app.mount kullanılır; `?v=<içerik hash'i>` ile istenen dosyalar
+# tarayıcıda süresiz (immutable) önbelleğe alınır, adresler şablonlarda static_url() ile üretilir
+static_assets = StaticAssets(directory=STATIC_DIR)
+app.mount("/static", static_assets, name="static")
 
 # Jinja2Templates örneğini oluştur
 templates = Jinja2Templates(directory=TEMPLATES_DIR)
 # Filtreyi Jinja2 ortamına ekle
 templates.env.filters['currency_tr'] = format_currency_tr
-
-# Gelen ürün verilerini saklamak için dosya yolunu ortam değişkeninden al, yoksa varsayılanı kullan
+templates.env.globals['static_url'] = static_assets.url
+
+# Service worker (/sw.js) kurulurken önbelleğe alınan uygulama kabuğu: sayfalar, kendi statik dosyalarımız ve
+# sayfaların CDN'den yüklediği kütüphaneler. Liste veya dosyalar değişince sw.js'in içeriği (önbellek sürümü)
+# değişir ve tarayıcı yeni service worker'ı kurar.
+SERVICE_WORKER_PAGES = ("/products", "/cart", "/orders", "/view-discount-images")
+SERVICE_WORKER_STATIC_FILES = (
+    "js/offline_cache.js", "js/catalog_worker.js", "js/sw_register.js", "js/change_events.js",
+    "images/Logo.png", "images/urun_yok.png",
+)
+SERVICE_WORKER_VENDOR_ASSETS = (
+    "https://bootswatch.com/5/yeti/bootstrap.min.css",
+    "https://cdn.jsdelivr.net/npm/bootstrap@5.3.0-alpha1/dist/js/bootstrap.bundle.min.js",
+    "https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js",
+    "https://cdnjs.cloudflare.com/ajax/libs/lightgallery/2.7.1/css/lightgallery.min.css",
+    "https://cdnjs.cloudflare.com/ajax/libs/lightgallery/2.7.1/css/lg-zoom.min.css",
+    "https://cdnjs.cloudflare.com/ajax/libs/lightgallery/2.7.1/css/lg-thumbnail.min.css",
+    "https://cdnjs.cloudflare.com/ajax/libs/lightgallery/2.7.1/lightgallery.min.js",
+    "https://cdnjs.cloudflare.com/ajax/libs/lightgallery/2.7.1/plugins/zoom/lg-zoom.min.js",
+    "https://cdnjs.cloudflare.com/ajax/libs/lightgallery/2.7.1/plugins/thumbnail/lg-thumbnail.min.js",
+    "https://cdnjs.cloudflare.com/ajax/libs/jquery/3.6.0/jquery.min.js",
+    "https://cdnjs.cloudflare.com/ajax/libs/select2/4.0.13/css/select2.min.css",
+    "https://cdnjs.cloudflare.com/ajax/libs/select2/4.0.13/js/select2.full.min.js",
+    "https://cdnjs.cloudflare.com/ajax/libs/select2-bootstrap-5-theme/1.3.0/select2-bootstrap-5-theme.min.css",
+    "https://cdnjs.cloudflare.com/ajax/libs/xlsx/0.18.5/xlsx.full.min.js",
+    "https://cdnjs.cloudflare.com/ajax/libs/jspdf/2.5.1/jspdf.umd.min.js",
+    "https://cdnjs.cloudflare.com/ajax/libs/jspdf-autotable/3.5.23/jspdf.plugin.autotable.min.js",
+    "https://cdnjs.cloudflare.com/ajax/libs/jspdf-autotable/3.5.28/jspdf.plugin.autotable.min.js",
+    "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.10.5/font/bootstrap-icons.css",
+)
+PRODUCT_THUMBNAIL_CACHE_ENTRIES = int(os.getenv("SW_THUMBNAIL_CACHE_ENTRIES", "600"))
+
+# Eski sürümlerin ürünleri sakladığı JSON dosyası; ürünler tablosu boşsa ilk açılışta bir kez içe aktarılır
 PRODUCTS_FILE = os.getenv("PRODUCTS_FILE_PATH", "received_products.json")
+# Ürün kataloğu veritabanında (products tablosu) saklanır, başlangıçta bir kez okunup bellekten sunulur
+product_catalog = CatalogStore(
+    "Ürün kataloğu", key_field="STOK_KODU", sort_fields=("STOK_KODU",),
+    index_builder=product_query.build_product_index
+)
+# Tam metin arama indeksi; katalog her değiştiğinde yalnızca değişen ürünlerle güncellenir
+product_search_index = ProductSearchIndex()
+
+# Üst üste gelen yüklemelerin eşitlemeleri farklı thread'lerde ve katalogdaki sırasından farklı bir
+# sırada bitebilir. Eşitleme bu kilitle sıraya alınır ve her seferinde o anki güncel snapshot'a göre
+# yapılır; böylece indeks eski bir snapshot'ta kalmaz. Son eşitlenen snapshot'ın özeti tutulur.
+_search_index_lock = threading.Lock()
+_search_index_digest: Optional[str] = None
+
+def refresh_product_search_index():
+    global _search_index_digest
+    with _search_index_lock:
+        snapshot = product_catalog.snapshot
+        if snapshot.digest == _search_index_digest:
+            return
+        try:
+            changed_count = product_search_index.sync(snapshot.products)
+            _search_index_digest = snapshot.digest
+            if changed_count:
+                print(f"Ürün arama indeksi güncellendi: {changed_count} kayıt.")
+        except Exception as e:
+            # Arama indeksi yardımcı bir yapıdır; hatası katalog güncellemesini geri almaz
+            print(f"HATA: Ürün arama indeksi güncellenemedi: {e}")
 
 # --- Admin Auth Başlangıcı ---
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
+# bcrypt bilerek yavaştır (~250 ms CPU); event loop'u bekletmemesi için ayrı ve küçük bir thread
+# havuzunda çalışır. Havuz küçük tutulur ki art arda gelen giriş denemeleri tüm CPU'yu tüketmesin.
+password_executor = BoundedExecutor(max_threads=int(os.getenv("PASSWORD_HASH_MAX_THREADS", "2")), slow_threshold=1.0)
+
 def verify_password(plain_password, hashed_password):
     # Bcrypt versiyon hatası almamak için try-except bloğu eklenebilir,
     # ama create_admin.py'de çalıştıysa burada da çalışması beklenir.
@@ -187,33 +333,60 @@ def verify_password(plain_password, hashed_password):
         print(f"Şifre doğrulanırken hata (verify_password): {e}") # Üretimde loglanmalı
         return False
 
+async def verify_password_async(plain_password, hashed_password) -> bool:
+    """verify_password'ü password_executor havuzunda çalıştırır (async endpoint'ler için)."""
+    return await password_executor.run("bcrypt_verify", verify_password, plain_password, hashed_password)
+
+# admin_config.json yalnızca değiştiğinde (mtime/boyut) yeniden okunur: (imza, veri)
+_admin_credentials_cache = (None, None)
+
 def get_admin_credentials() -> Optional[dict]:
     """
     Admin kimlik bilgilerini admin_config.json dosyasından okur.
     Başarılı olursa bir sözlük, hata durumunda None döndürür.
+    Dosya değişmediği sürece önbellekteki değer döner (istek başına yalnızca bir stat çağrısı).
     """
-    if not os.path.exists(ADMIN_CONFIG_FILE):
+    global _admin_credentials_cache
+    try:
+        file_stat = os.stat(ADMIN_CONFIG_FILE)
+    except FileNotFoundError:
         # Eğer ADMIN_CONFIG_FILE ortam değişkeninden geliyorsa ve dosya yoksa, 
         # bu, create_admin.py'nin henüz çalıştırılmadığı anlamına gelebilir.
         # Veya yol yanlışsa. Yolun doğruluğu create_admin.py ve ortam değişkeni ayarıyla sağlanmalı.
         print(f"UYARI: Admin yapılandırma dosyası ({ADMIN_CONFIG_FILE}) bulunamadı. Admin girişi çalışmayacak.")
         print("Lütfen `create_admin.py` script'ini çalıştırarak bir admin kullanıcısı oluşturun.")
+        _admin_credentials_cache = (None, None)
         return None
+    except OSError as e:
+        print(f"Admin config dosyası okunurken genel hata: {e}")
+        return None
+
+    signature = (file_stat.st_mtime_ns, file_stat.st_size, file_stat.st_ino)
+    cached_signature, cached_data = _admin_credentials_cache
+    if cached_signature == signature:
+        return cached_data
+
+    data = None
     try:
         with open(ADMIN_CONFIG_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
+            loaded = json.load(f)
             # Beklenen anahtarların varlığını kontrol edebiliriz
-            if "admin_username" in data and "admin_hashed_password" in data: # Anahtar isimlerini admin_config.json'daki ile eşleştir
-                return data
+            if isinstance(loaded, dict) and "admin_username" in loaded and "admin_hashed_password" in loaded: # Anahtar isimlerini admin_config.json'daki ile eşleştir
+                data = loaded
             else:
                 print(f"HATA: Admin yapılandırma dosyasında beklenen anahtarlar ('admin_username', 'admin_hashed_password') eksik: {ADMIN_CONFIG_FILE}")
-                return None
     except json.JSONDecodeError:
         print(f"HATA: Admin yapılandırma dosyası bozuk (JSON Decode Hatası): {ADMIN_CONFIG_FILE}")
-        return None
     except Exception as e:
         print(f"Admin config dosyası okunurken genel hata: {e}")
         return None
+    # Bozuk içerik de önbelleğe alınır; dosya düzeltilince imza değişir ve yeniden okunur
+    _admin_credentials_cache = (signature, data)
+    return data
+
+async def get_admin_credentials_async() -> Optional[dict]:
+    """get_admin_credentials'ı file_storage havuzunda çalıştırır (async endpoint'ler için; dosya değişince okunur)."""
+    return await file_storage.run("admin_credentials", get_admin_credentials)
 
 async def get_current_admin_user_with_redirect(request: Request):
     """
@@ -266,51 +439,267 @@ async def verify_customer_sync_api_key(x_api_key: str = Header(None)):
 
 # --- Admin Auth Sonu ---
 
+def snapshot_response(request: Request, snapshot: CatalogSnapshot) -> Response:
+    """
+    Önceden serileştirilmiş snapshot baytlarıyla yanıt üretir.
+    İstemcinin elindeki ETag güncelse gövdesiz 304 döner, gzip destekleniyorsa sıkıştırılmış baytlar gönderilir.
+    """
+    headers = {
+        "ETag": snapshot.etag,
+        "Cache-Control": "private, no-cache", # Tarayıcı saklasın ama her seferinde ETag ile doğrulasın
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        client_etags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        if snapshot.etag in client_etags or "*" in client_etags:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snapshot.gzip_body, media_type="application/json", headers=headers)
+    return Response(content=snapshot.body, media_type="application/json", headers=headers)
+
+def with_image_urls(product: Dict) -> Dict:
+    """
+    Ürün kaydına diskteki gerçek görseli ekler: `IMAGE_PATH_WEB` var olan dosyanın (yoksa
+    placeholder'ın) yolu, `IMAGE_URL` küçük boyutlu türevlerin sunulduğu adres (görsel yoksa None).
+    """
+    entry = product_image_manifest.resolve(product.get("STOK_KODU") or "")
+    if entry is None:
+        return {**product, "IMAGE_PATH_WEB": PRODUCT_IMAGE_PLACEHOLDER, "IMAGE_URL": None}
+    return {
+        **product,
+        "IMAGE_PATH_WEB": f"images/{entry[0]}",
+        # Dosya değişince adres de değişir; tarayıcı görseli süresiz önbellekte tutabilir
+        "IMAGE_URL": f"/images/product/{quote(image_key(product['STOK_KODU']), safe='')}?v={asset_fingerprint(*entry)}",
+    }
+
+# Tam katalog yanıtı görsel yollarıyla birlikte bir kez serileştirilir; katalog veya görsel manifesti değişince yenilenir
+_catalog_image_view = (None, None)
+_catalog_image_view_lock = threading.Lock()
+
+def cached_catalog_image_view(snapshot: CatalogSnapshot) -> Optional[CatalogSnapshot]:
+    cached_key, cached_view = _catalog_image_view
+    return cached_view if cached_key == (snapshot.digest, product_image_manifest.version) else None
+
+def build_catalog_image_view(snapshot: CatalogSnapshot) -> CatalogSnapshot:
+    global _catalog_image_view
+    key = (snapshot.digest, product_image_manifest.version)
+    with _catalog_image_view_lock:
+        cached_key, cached_view = _catalog_image_view
+        if cached_key != key:
+            cached_view = CatalogSnapshot([with_image_urls(product) for product in snapshot.products], snapshot.version)
+            _catalog_image_view = (key, cached_view)
+        return cached_view
+
+def json_rows_response(data, status_code: int = status.HTTP_200_OK) -> Response:
+    """
+    Veritabanından okunmuş, zaten doğru biçimdeki veriyi Pydantic doğrulaması olmadan JSON olarak döndürür.
+    Endpoint'teki response_model yalnızca OpenAPI şeması için kullanılır.
+    """
+    body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    return Response(content=body, status_code=status_code, media_type="application/json")
+
 @app.post("/api/products", dependencies=[Depends(verify_api_key)])
-async def receive_products_api(products: List[Dict]):
+async def receive_products_api(request: Request, db: Session = Depends(get_db)):
     """
-    Yeni ürün verilerini alır ve sunucu tarafında bir JSON dosyasına kaydeder.
+    Yeni ürün verilerini alır, products tablosunu tek transaction içinde toplu upsert ile
+    eşitler ve bellekteki katalog snapshot'ını atomik olarak değiştirir.
     Masaüstü uygulamasından gelen ürün listesini kabul eder.
+    Gövde parça parça ayrıştırılır; her kayıt tamamlandığı anda kompakt şemaya göre doğrulanır.
     """
-    products_file_path = os.getenv("PRODUCTS_FILE_PATH", "received_products.json") # Tekrar alıyoruz çünkü global PRODUCTS_FILE değişmeyebilir
+    products = []
+    try:
+        async for record in iter_json_array(request.stream()):
+            products.append(validate_product_record(record, len(products)))
+    except ProductIngestError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
     if not products:
         raise HTTPException(status_code=400, detail="Ürün listesi boş olamaz.")
+    def replace_catalog():
+        # Önce veritabanına yazılır, başarılı olursa bellekteki katalog değiştirilir
+        new_snapshot = product_catalog.replace(products, persist=lambda records: crud.replace_products(db, records))
+        refresh_product_search_index()
+        return new_snapshot
+
     try:
-        # Gelen veriyi doğrudan JSON dosyasına yazalım (var olanın üzerine yazar)
-        with open(products_file_path, "w", encoding="utf-8") as f: # products_file_path kullan
-            json.dump(products, f, ensure_ascii=False, indent=4)
-        print(f"{len(products)} adet ürün verisi alındı ve {products_file_path} dosyasına kaydedildi.") # products_file_path kullan
-        return {"message": f"{len(products)} adet ürün başarıyla alındı ve kaydedildi."}
+        snapshot = await file_storage.run("catalog_replace", replace_catalog)
+        print(f"{len(snapshot)} adet ürün verisi alındı ve veritabanına kaydedildi (versiyon {snapshot.version}).")
+        change_feed.publish("products", {"count": len(snapshot)}, version=snapshot.digest)
+        return {"message": f"{len(snapshot)} adet ürün başarıyla alındı ve kaydedildi.", "version": snapshot.digest}
     except Exception as e:
         print(f"Veri kaydedilirken hata oluştu: {e}")
         raise HTTPException(status_code=500, detail=f"Ürünler kaydedilemedi: {str(e)}")
 
+@app.post("/api/products/delta", dependencies=[Depends(verify_api_key)])
+async def receive_products_delta_api(delta: ProductDeltaRequest, db: Session = Depends(get_db)):
+    """
+    Masaüstünden gelen ürün değişikliklerini (upsert/delete) güncel kataloğa uygular.
+    `base_version` sunucudaki versiyonla eşleşmezse 409 döner; istemci tam yükleme yapmalıdır.
+    """
+    try:
+        upserts = [validate_product_record(record, index) for index, record in enumerate(delta.upserts)]
+        snapshot = await file_storage.run(
+            "catalog_delta", product_catalog.apply_delta,
+            delta.base_version, upserts, delta.deletes,
+            persist=lambda changed, deleted: crud.apply_product_changes(db, changed, deleted)
+        )
+    except CatalogVersionConflict as e:
+        print(f"Delta reddedildi: temel versiyon {delta.base_version}, güncel versiyon {e.current_version}.")
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Katalog versiyonu uyuşmuyor, tam yükleme gerekli.", "current_version": e.current_version}
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        print(f"Delta uygulanırken hata oluştu: {e}")
+        raise HTTPException(status_code=500, detail=f"Ürün değişiklikleri kaydedilemedi: {str(e)}")
+
+    print(f"Ürün deltası uygulandı: {len(delta.upserts)} güncelleme, {len(delta.deletes)} silme. Toplam {len(snapshot)} ürün (versiyon {snapshot.version}).")
+    await file_storage.run("search_index_sync", refresh_product_search_index)
+    change_feed.publish("products", {"count": len(snapshot)}, version=snapshot.digest)
+    return {
+        "message": f"{len(delta.upserts)} ürün güncellendi, {len(delta.deletes)} ürün silindi.",
+        "version": snapshot.digest
+    }
+
 @app.get("/api/products")
-async def get_products_api(current_user: str = Depends(get_current_admin_user_for_api)):
-    if not os.path.exists(PRODUCTS_FILE):
-        return []
+async def get_products_api(
+    request: Request,
+    q: Optional[str] = None,
+    main_category: Optional[str] = None,
+    grup_kodu: Optional[str] = None,
+    sort: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=product_query.MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: str = Depends(get_current_admin_user_for_api)
+):
+    """
+    Parametresiz çağrıda tüm kataloğu döndürür. `q`, `main_category`, `grup_kodu`, `sort`,
+    `limit` veya `cursor` verilirse sorgu sunucuda snapshot indeksine uygulanır ve
+    `{"items", "total", "next_cursor", "version"}` biçiminde tek bir sayfa döner.
+    """
+    snapshot = product_catalog.snapshot
+    if q is None and main_category is None and grup_kodu is None and sort is None and limit is None and cursor is None:
+        # Disk erişimi ve serileştirme yok: görsel yolları eklenmiş snapshot'ın hazır baytları döndürülür
+        view = cached_catalog_image_view(snapshot)
+        if view is None:
+            view = await file_storage.run("catalog_image_view", build_catalog_image_view, snapshot)
+        return snapshot_response(request, view)
     try:
-        with open(PRODUCTS_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data
-    except (json.JSONDecodeError, IOError) as e:
-        print(f"Error reading products file ({PRODUCTS_FILE}): {e}")
-        return []
+        page = product_query.query_products(snapshot, q, main_category, grup_kodu, sort, limit, cursor)
+        page["items"] = [with_image_urls(product) for product in page["items"]]
+        return page
+    except product_query.StaleCursorError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except product_query.ProductQueryError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@app.get("/api/products/categories")
+async def get_product_categories_api(current_user: str = Depends(get_current_admin_user_for_api)):
+    """Katalogda ürünü bulunan ana kategorileri ve grup kodlarını döndürür (navbar için)."""
+    return product_query.active_categories(product_catalog.snapshot.index)
+
+@app.get("/api/products/search")
+async def search_products_api(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=product_query.MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    current_user: str = Depends(get_current_admin_user_for_api)
+):
+    """
+    Ürün adı, stok kodu, barkod ve grup kodunda tam metin arama yapar; sonuçlar ilgililiğe göre sıralanır.
+    Türkçe karakterler (İ/ı, Ş/ş, Ğ/ğ, Ü/ü, Ö/ö, Ç/ç) ve bozuk kodlanmış karşılıkları eşdeğer kabul edilir.
+    """
+    snapshot = product_catalog.snapshot
+    if not product_search_index.available:
+        items, total = snapshot.index.query(q, None, "ad", offset, limit)
+        return {"items": [with_image_urls(product) for product in items], "total": total}
+    codes, total = product_search_index.search(q, limit, offset)
+    by_code = snapshot.index.by_code
+    return {"items": [with_image_urls(by_code[code]) for code in codes if code in by_code], "total": total}
+
+@app.get("/api/products/{stok_kodu:path}")
+async def get_product_api(stok_kodu: str, current_user: str = Depends(get_current_admin_user_for_api)):
+    """Tek bir ürünü stok koduna, bulunamazsa barkoda göre döndürür (barkod okutarak hızlı ekleme için)."""
+    product = product_catalog.snapshot.index.find(stok_kodu, barcode=stok_kodu)
+    if product is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Stok kodu bulunamadı: {stok_kodu}")
+    return with_image_urls(product)
 
 @app.get("/api/customers")
-async def get_customers_api(current_user: str = Depends(get_current_admin_user_for_api)):
+async def get_customers_api(request: Request, current_user: str = Depends(get_current_admin_user_for_api)):
     """Müşteri/Cari verilerini JSON olarak döndüren API endpoint'i."""
-    if not os.path.exists(CUSTOMER_BALANCES_JSON_PATH):
-        # Dosya yoksa boş liste döndürerek istemcinin hata almasını önle
-        return []
-    try:
-        with open(CUSTOMER_BALANCES_JSON_PATH, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        return data
-    except (json.JSONDecodeError, IOError) as e:
-        # Hata durumunda log bas ve boş liste döndür
-        print(f"Error reading customer balances file ({CUSTOMER_BALANCES_JSON_PATH}): {e}")
-        return []
+    # Henüz cari verisi gelmediyse snapshot boş listedir, istemci hata almaz
+    return snapshot_response(request, customer_balances_store.snapshot)
+
+@app.get("/api/io-stats")
+async def get_io_stats_api(current_user: str = Depends(get_current_admin_user_for_api)):
+    """Thread havuzlarında çalışan dosya/veritabanı ve şifre doğrulama işlemlerinin süre ve sırada bekleme istatistikleri."""
+    stats = file_storage.stats()
+    stats["password_hashing"] = password_executor.stats()
+    stats["image_resizing"] = image_executor.stats()
+    stats["image_resizing"]["cache"] = product_images.stats()
+    stats["image_resizing"]["manifest"] = {"images": len(product_image_manifest), "version": product_image_manifest.version}
+    stats["events"] = change_feed.stats()
+    return stats
+
+@app.get("/api/events", tags=["Events"])
+async def change_events_api(
+    last_event_id: Optional[str] = Header(None, max_length=64),
+    current_user: str = Depends(get_current_admin_user_for_api)
+):
+    """
+    Server-Sent Events akışı: katalog ("products"), cari bakiyeleri ("customers") veya siparişler
+    ("orders") değişince küçük bir bildirim gönderir; veri gövdesi gönderilmez. Tarayıcı yeniden
+    bağlanırken gönderdiği `Last-Event-ID` ile aradaki değişiklikler tekrar iletilir.
+    """
+    if change_feed.clients >= EVENT_STREAM_MAX_CLIENTS:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Bildirim kanalı dolu, daha sonra yeniden bağlanın.")
+    return StreamingResponse(
+        change_feed.stream(last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"} # nginx gibi proxy'ler akışı tamponlamasın
+    )
+
+@app.get("/images/product/{stok_kodu}", tags=["Products"])
+async def get_product_image(
+    request: Request,
+    stok_kodu: str,
+    w: Optional[int] = Query(None, ge=1, le=4096, description="İstenen genişlik (px); verilmezse orijinal görsel döner"),
+    fmt: Optional[str] = Query(None, description="avif, webp, jpeg veya png; verilmezse Accept başlığına göre seçilir"),
+    v: Optional[str] = Query(None, description="Görsel sürümü (IMAGE_URL içinde gelir); verilirse yanıt süresiz önbelleğe alınabilir")
+):
+    """
+    Ürün görselini döndürür. `w` verilirse en yakın desteklenen genişlikteki türev (gerekirse üretilerek)
+    sunulur. Dosya görsel manifestinden bulunur; tarayıcının uzantı tahmin etmesi gerekmez.
+    """
+    source_path = product_image_manifest.path_for(stok_kodu)
+    if source_path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Ürün görseli bulunamadı")
+
+    if v:
+        headers = {"Cache-Control": f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"}
+    else:
+        headers = {"Cache-Control": f"public, max-age={PRODUCT_IMAGE_MAX_AGE}"}
+    if w is None:
+        image_path, media_type = source_path, None
+    else:
+        output_format = product_images.choose_format(fmt, request.headers.get("accept", ""), os.path.splitext(source_path)[1].lower())
+        if fmt is None:
+            headers["Vary"] = "Accept"
+        image_path, media_type = await image_executor.run(
+            "image_derivative", product_images.get_derivative, source_path, product_images.snap_width(w), output_format
+        )
+
+    stat_result = await file_storage.run("stat", os.stat, image_path)
+    response = FileResponse(image_path, media_type=media_type, headers=headers, stat_result=stat_result)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and response.headers["etag"] in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={**headers, "ETag": response.headers["etag"]})
+    return response
 
 @app.get("/", response_class=HTMLResponse)
 async def read_root(request: Request):
@@ -360,13 +749,13 @@ async def login_form(request: Request):
 
 @app.post("/login", tags=["Admin"])
 async def login_submit(request: Request, username: str = Form(...), password: str = Form(...)):
-    admin_creds_dict = get_admin_credentials()
+    admin_creds_dict = await get_admin_credentials_async()
     error_message = "Kullanıcı adı veya şifre hatalı."
 
     if admin_creds_dict:
         stored_username = admin_creds_dict.get("admin_username")
         hashed_password = admin_creds_dict.get("admin_hashed_password")
-        if stored_username == username and hashed_password and verify_password(password, hashed_password):
+        if stored_username == username and hashed_password and await verify_password_async(password, hashed_password):
             request.session["admin_user"] = username
             # Başarılı giriş sonrası / (ana sayfaya) yönlendir
             # next_url = request.query_params.get("next", "/") # Eğer next parametresi varsa oraya yönlendir
@@ -388,6 +777,42 @@ async def read_admin_me_protected(request: Request, current_user: str = Depends(
     """
     return templates.TemplateResponse("admin_me.html", {"request": request, "username": current_user})
 
+def service_worker_assets() -> Tuple[str, List[str]]:
+    """sw.js şablonunun kaynağı ve önbelleğe alınacak statik dosya adresleri (dosya okur, thread havuzunda çağrılır)."""
+    template_source = templates.env.loader.get_source(templates.env, "sw.js")[0]
+    return template_source, [static_assets.url(path) for path in SERVICE_WORKER_STATIC_FILES]
+
+# Şablonlarda sabit adla çağrılan static_url('...') adresleri (açılışta hash'leri hazırlanır)
+_STATIC_URL_CALL = re.compile(r"""static_url\(\s*['"]([^'"]+)['"]\s*\)""")
+
+def warm_templates() -> List[str]:
+    """
+    Tüm şablonları derleyip Jinja önbelleğine alır; ilk istekte şablon dosyası okunup derlenmez.
+    Şablonlarda static_url() ile kullanılan dosya yollarını döndürür.
+    """
+    static_paths = list(SERVICE_WORKER_STATIC_FILES)
+    for name in templates.env.list_templates():
+        templates.env.get_template(name)
+        static_paths.extend(_STATIC_URL_CALL.findall(templates.env.loader.get_source(templates.env, name)[0]))
+    return static_paths
+
+@app.get("/sw.js", include_in_schema=False)
+async def service_worker_script(request: Request):
+    """
+    Service worker betiği. Kapsamı tüm site olabilsin diye kök dizinden sunulur; önbelleğe alınacak
+    statik dosya adresleri içerik hash'leriyle şablona yazılır. Tarayıcı güncellemeyi kaçırmasın diye
+    her seferinde doğrulanır (no-cache).
+    """
+    template_source, static_urls = await file_storage.run("service_worker_assets", service_worker_assets)
+    return templates.TemplateResponse("sw.js", {
+        "request": request,
+        "cache_version": asset_fingerprint(template_source, *static_urls, *SERVICE_WORKER_VENDOR_ASSETS),
+        "pages": list(SERVICE_WORKER_PAGES),
+        "static_urls": static_urls,
+        "vendor_urls": list(SERVICE_WORKER_VENDOR_ASSETS),
+        "thumbnail_cache_entries": PRODUCT_THUMBNAIL_CACHE_ENTRIES,
+    }, media_type="application/javascript", headers={"Cache-Control": "no-cache"})
+
 @app.on_event("startup")
 async def startup_event():
     if not os.path.exists(ADMIN_CONFIG_FILE):
@@ -400,35 +825,73 @@ async def startup_event():
         else:
             print(f"UYARI: '{ADMIN_CONFIG_FILE}' bulundu ancak okunamadı veya formatı bozuk.")
 
-    # Masaüstü uygulamasından gelen verilerin saklandığı dosya için kontrol
-    if not os.path.exists(PRODUCTS_FILE):
-        print(f"Bilgi: Web arayüzü için başlangıç ürün verisi ('{PRODUCTS_FILE}') bulunamadı.")
-        print(f"Masaüstü uygulaması veri gönderdiğinde ('/api/products' POST) bu dosya oluşturulacaktır.")
-    else:
-        print(f"Mevcut ürün veri dosyası: '{PRODUCTS_FILE}' bulundu.")
-
-def get_view_count() -> int:
-    """Görüntülenme sayısını sayaç dosyasından okur."""
+    # Kataloğu ve cari listesini veritabanından bir kez belleğe al; sonraki okumalar veritabanına gitmez
+    db = SessionLocal()
     try:
-        if os.path.exists(VIEW_COUNTER_FILE):
-            with open(VIEW_COUNTER_FILE, "r") as f:
-                data = json.load(f)
-                return data.get("views", 0)
-        return 0
-    except (IOError, json.JSONDecodeError):
-        print(f"UYARI: Görüntülenme sayısı dosyası ({VIEW_COUNTER_FILE}) okunamadı veya bozuk.")
-        return 0
-
-def increment_view_count():
-    """Görüntülenme sayısını bir artırır ve dosyaya yazar."""
-    count = get_view_count() + 1
+        import_legacy_json_files(db)
+        product_catalog.load(crud.load_products(db))
+        refresh_product_search_index()
+        customer_balances_store.load(crud.load_customer_balances(db))
+    finally:
+        db.close()
+    view_counter.load([GALLERY_VIEW_COUNTER_KEY])
+    # Görsel dizini taranır ve değişiklikler için izlenmeye başlanır
+    product_image_manifest.start()
+    # Metin tabanlı static dosyaların .gz/.br kopyaları eksikse veya eskiyse üretilir
+    precompressed_count = await file_storage.run("precompress_static", precompress_directory, STATIC_DIR)
+    if precompressed_count:
+        print(f"{precompressed_count} sıkıştırılmış static dosya kopyası oluşturuldu.")
+    # Şablonlar ve static_url() hash'leri önceden hazırlanır; ilk sayfa isteği dosya okumaz
+    template_static_paths = await file_storage.run("warm_templates", warm_templates)
+    hashed_count = await file_storage.run("static_hashes", static_assets.warm_hashes, template_static_paths)
+    print(f"Şablonlar derlendi, {hashed_count} static dosyanın içerik hash'i hesaplandı.")
+    if not product_catalog.snapshot.products:
+        print("Bilgi: Veritabanında ürün bulunamadı. Masaüstü uygulaması veri gönderdiğinde ('/api/products' POST) katalog doldurulacaktır.")
+
+def _read_legacy_json_list(file_path: str) -> List[Dict]:
     try:
-        os.makedirs(os.path.dirname(VIEW_COUNTER_FILE), exist_ok=True)
-        with open(VIEW_COUNTER_FILE, "w") as f:
-            json.dump({"views": count}, f)
-    except IOError as e:
-        print(f"HATA: Görüntülenme sayısı kaydedilemedi: {e}")
-    return count
+        with open(file_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return data if isinstance(data, list) else []
+    except (json.JSONDecodeError, OSError) as e:
+        print(f"UYARI: '{file_path}' okunamadı, içe aktarılmayacak: {e}")
+        return []
+
+def import_legacy_json_files(db: Session):
+    """
+    Eski sürümlerde JSON dosyalarında tutulan ürün ve cari verilerini, ilgili tablo boşsa
+    bir kez veritabanına aktarır. Geçersiz kayıtlar atlanır.
+    """
+    if crud.count_products(db) == 0 and os.path.exists(PRODUCTS_FILE):
+        products = []
+        for index, raw in enumerate(_read_legacy_json_list(PRODUCTS_FILE)):
+            try:
+                products.append(validate_product_record(raw, index))
+            except ProductIngestError as e:
+                print(f"UYARI: Eski ürün kaydı atlandı: {e}")
+        if products:
+            crud.replace_products(db, products)
+            print(f"'{PRODUCTS_FILE}' dosyasındaki {len(products)} ürün veritabanına aktarıldı.")
+
+    if crud.count_customer_balances(db) == 0 and os.path.exists(CUSTOMER_BALANCES_JSON_PATH):
+        records = [crud.normalize_customer_record(raw) for raw in _read_legacy_json_list(CUSTOMER_BALANCES_JSON_PATH) if isinstance(raw, dict)]
+        records = [record for record in records if record["CARI_KOD"]]
+        if records:
+            crud.replace_customer_balances(db, records)
+            print(f"'{CUSTOMER_BALANCES_JSON_PATH}' dosyasındaki {len(records)} cari kaydı veritabanına aktarıldı.")
+
+    # Sayaç zaten varsa (başka bir worker oluşturduysa) eski değer tekrar eklenmez
+    if os.path.exists(VIEW_COUNTER_FILE):
+        data = read_json(VIEW_COUNTER_FILE, default={})
+        views = data.get("views", 0) if isinstance(data, dict) else 0
+        if isinstance(views, int) and views > 0 and crud.seed_view_count(db, GALLERY_VIEW_COUNTER_KEY, views):
+            print(f"'{VIEW_COUNTER_FILE}' dosyasındaki görüntülenme sayısı ({views}) veritabanına aktarıldı.")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    # Bekleyen sayaç artışları kapanmadan önce veritabanına yazılır
+    view_counter.flush()
+    product_image_manifest.stop()
 
 # --- Sipariş API Uç Noktaları Başlangıcı ---
 
@@ -436,11 +899,15 @@ def increment_view_count():
 async def create_order(
     order_data: OrderCreate, 
     db: Session = Depends(get_db),
-    current_user: str = Depends(get_current_admin_user_for_api)
+    current_user: str = Depends(get_current_admin_user_for_api),
+    idempotency_key: Optional[str] = Header(None, max_length=100)
 ):
     """
     Yeni bir sipariş oluşturur.
 
+    `Idempotency-Key` başlığı verilirse aynı anahtarla tekrar gönderilen sipariş yeniden kaydedilmez,
+    ilk kaydedilen sipariş döner (çevrimdışı kuyruktan yapılan yeniden gönderimler için).
+
     - **customer_name**: Siparişi veren cari/firma adı (opsiyonel).
     - **items**: Sipariş kalemlerinin listesi.
         - **product_code**: Ürün stok kodu.
@@ -451,26 +918,19 @@ async def create_order(
     if not order_data.items:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Sipariş kalemleri boş olamaz.")
 
-    db_order = models.Order(
-        customer_name=order_data.customer_name,
-        status=models.PyOrderStatusEnum.PENDING # Yeni sipariş için durum
-        # total_amount daha sonra hesaplanacak
-    )
-    
-    calculated_total_amount = 0.0
+    order, created = await _create_order_from_request(order_data, db, idempotency_key)
+    if not created:
+        # Aynı Idempotency-Key ile daha önce kaydedilmiş sipariş (örn. çevrimdışı kuyruktan yeniden gönderim)
+        return json_rows_response(order, status_code=status.HTTP_200_OK)
+    change_feed.publish("orders", {"action": "created", "order_id": order["id"]})
+    return json_rows_response(order, status_code=status.HTTP_201_CREATED)
+
+async def _create_order_from_request(order_data: OrderCreate, db: Session, idempotency_key: Optional[str] = None) -> Tuple[Dict, bool]:
     order_items_to_create = []
 
-    # Ürünlerin barkodlarını almak için product_file_path'ı kullan
-    # Bu, her sipariş oluşturmada dosyayı okuyacaktır, büyük veri setlerinde optimize edilebilir (örn. başlangıçta yükle)
-    products_data_for_barcode = []
-    products_file_path = os.getenv("PRODUCTS_FILE_PATH", "received_products.json")
-    if os.path.exists(products_file_path):
-        try:
-            with open(products_file_path, "r", encoding="utf-8") as f_products:
-                products_data_for_barcode = json.load(f_products)
-        except Exception as e_read_products:
-            print(f"Barkodları almak için ürünler dosyası ({products_file_path}) okunurken hata: {e_read_products}")
-            # Hata durumunda barkodlar boş kalır ama sipariş oluşturmaya devam eder
+    # Ürünlerin barkodları bellekteki katalog snapshot'ının stok kodu/barkod indeksinden alınır (O(1) arama)
+    # Sipariş boyunca aynı snapshot kullanılır, arada gelen bir güncelleme sonucu etkilemez
+    catalog_index = product_catalog.snapshot.index
 
     for item_data in order_data.items:
         if item_data.quantity <= 0 or item_data.unit_price < 0:
@@ -478,55 +938,61 @@ async def create_order(
                 status_code=status.HTTP_400_BAD_REQUEST, 
                 detail=f"Geçersiz miktar veya fiyat: {item_data.product_code}"
             )
-        
-        item_total = item_data.quantity * item_data.unit_price
-        calculated_total_amount += item_total
-        
-        # Ürünün barkodunu bul
-        found_barcode = None
-        if products_data_for_barcode:
-            product_in_file = next((p for p in products_data_for_barcode if p.get("STOK_KODU") == item_data.product_code), None)
-            if product_in_file:
-                found_barcode = product_in_file.get("BARKOD1") # received_products.json'daki barkod alanı adı
-
-        db_order_item = models.OrderItem(
-            product_code=item_data.product_code,
-            product_name=item_data.product_name,
-            barcode=found_barcode, # Bulunan barkodu ata
-            quantity=item_data.quantity,
-            unit_price=item_data.unit_price
-            # order_id ataması, db_order veritabanına eklendikten sonra
-            # veya db_order.items.append() ile otomatik olarak yapılır.
-        )
-        order_items_to_create.append(db_order_item)
 
-    db_order.total_amount = calculated_total_amount
-    db_order.items.extend(order_items_to_create) # İlişkiyi kurar ve order_id'leri ayarlar
+        # Ürünün barkodunu bul; katalogda yoksa istemcinin gönderdiği barkod korunur
+        found_barcode = item_data.barcode
+        product_in_catalog = catalog_index.by_code.get(item_data.product_code)
+        if product_in_catalog and product_in_catalog.get("BARKOD1"):
+            found_barcode = product_in_catalog.get("BARKOD1") # Katalogdaki barkod alanı adı
+
+        order_items_to_create.append({
+            "product_code": item_data.product_code,
+            "product_name": item_data.product_name,
+            "barcode": found_barcode, # Bulunan barkodu ata
+            "quantity": item_data.quantity,
+            "unit_price": item_data.unit_price,
+        })
 
     try:
-        db.add(db_order)
-        db.commit()
-        db.refresh(db_order) # db_order'ı ve ilişkili items'ları ID'ler ve diğer DB tarafından üretilen değerlerle günceller
-        return db_order
+        # Veritabanı işlemleri thread havuzunda çalışır, event loop diğer istekleri beklemez
+        result = await run_in_threadpool(
+            crud.create_order, db, order_data.customer_name, order_items_to_create, idempotency_key
+        )
     except Exception as e:
-        db.rollback()
         # Gerçek bir uygulamada burada daha detaylı loglama ve hata yönetimi yapılmalı
         print(f"Sipariş oluşturulurken veritabanı hatası: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Sipariş oluşturulamadı.")
+    return result
 
 @app.get("/api/orders", response_model=List[OrderResponse], tags=["Orders"])
 async def list_orders(
-    skip: int = 0, # Sayfalama için başlangıç noktası
-    limit: int = 100, # Sayfalama için kayıt sayısı
+    limit: int = Query(100, ge=1, le=500), # Sayfa başına kayıt sayısı
+    cursor: Optional[str] = None, # Bir önceki yanıtın X-Next-Cursor başlığındaki değer
+    status_filter: Optional[models.PyOrderStatusEnum] = Query(None, alias="status"),
+    customer: Optional[str] = None, # Cari adında geçen metin
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    skip: int = Query(0, ge=0), # Eski istemciler için; cursor varsa yok sayılır
     db: Session = Depends(get_db),
     current_user: str = Depends(get_current_admin_user_for_api) # Admin koruması
 ):
     """
-    Sistemdeki tüm siparişleri listeler (sayfalamalı).
+    Sistemdeki siparişleri en yeniden eskiye listeler (keyset sayfalamalı).
+    Sonraki sayfa varsa cursor değeri `X-Next-Cursor` yanıt başlığında döner.
     Admin yetkisi gerektirir.
     """
-    orders = db.query(models.Order).order_by(models.Order.created_at.desc()).offset(skip).limit(limit).all()
-    return orders
+    try:
+        orders, next_cursor = await run_in_threadpool(
+            crud.list_orders, db, limit, cursor=cursor, status=status_filter, customer=customer,
+            date_from=date_from, date_to=date_to, skip=skip
+        )
+    except crud.InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Kalemler sipariş başına ayrı sorgu yerine toplu okunur, yanıt doğrudan serileştirilir
+    response = json_rows_response(orders)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response
 
 @app.get("/api/orders/{order_id}", response_model=OrderResponse, tags=["Orders"])
 async def get_order_details(
@@ -538,10 +1004,10 @@ async def get_order_details(
     Belirli bir siparişin detaylarını getirir.
     Admin yetkisi gerektirir.
     """
-    db_order = db.query(models.Order).filter(models.Order.id == order_id).first()
-    if db_order is None:
+    order = await run_in_threadpool(crud.get_order, db, order_id)
+    if order is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sipariş bulunamadı.")
-    return db_order
+    return json_rows_response(order)
 
 @app.put("/api/orders/{order_id}/status", response_model=OrderResponse, tags=["Orders"])
 async def update_order_status(
@@ -554,61 +1020,46 @@ async def update_order_status(
     Belirli bir siparişin durumunu günceller (örn: 'Yeni Sipariş' -> 'Hazırlanıyor').
     Admin yetkisi gerektirir.
     """
-    db_order = db.query(models.Order).filter(models.Order.id == order_id).first()
-    if db_order is None:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sipariş bulunamadı.")
-    
     # Gelen string değeri OrderStatusEnum üyesine çevirmeye gerek yok, Pydantic zaten yapıyor.
-    # Ancak, eğer Pydantic modeli kullanmasaydık, gelen string'i enum'a çevirmemiz gerekirdi:
-    # try:
-    #     new_status_enum = models.PyOrderStatusEnum(status_update.status) # PyOrderStatusEnum olarak güncellendi
-    # except ValueError:
-    #     raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Geçersiz sipariş durumu: {status_update.status}")
-
-    db_order.status = status_update.status # Pydantic modeli sayesinde bu zaten enum tipinde olmalı
-    
     try:
-        db.commit()
-        db.refresh(db_order)
-        return db_order
+        order = await run_in_threadpool(crud.update_order_status, db, order_id, status_update.status)
     except Exception as e:
-        db.rollback()
         print(f"Sipariş durumu güncellenirken veritabanı hatası (ID: {order_id}): {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Sipariş durumu güncellenemedi.")
+    if order is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sipariş bulunamadı.")
+    change_feed.publish("orders", {"action": "status", "order_id": order["id"], "status": order["status"]})
+    return json_rows_response(order)
 
 # --- Sipariş API Uç Noktaları Sonu ---
 
 # --- Yeni API Endpoint'i: Cari Bakiyelerini Güncelleme ---
 @app.post("/api/update-customer-balances", dependencies=[Depends(verify_customer_sync_api_key)])
-async def update_customer_balances_api(customer_balances: List[Dict]):
+async def update_customer_balances_api(customer_balances: List[Dict], db: Session = Depends(get_db)):
     """
-    Yeni cari bakiye verilerini alır ve sunucu tarafında filtrelenen_cariler.json dosyasına kaydeder.
+    Yeni cari bakiye verilerini alır, customer_balances tablosunu toplu upsert ile eşitler
+    ve bellekteki cari snapshot'ını değiştirir.
     Yerel `background_scheduler_cariler.pyw` script'inden gelen cari listesini kabul eder.
     """
-    # STATIC_DIR global olarak tanımlı, dosya yolunu bununla oluşturacağız
-    # b2b_web_app/static/json_data/filtrelenen_cariler.json
-    # target_file_name = "filtrelenen_cariler.json" # ESKİ
-    # target_dir = os.path.join(STATIC_DIR, "json_data") # ESKİ
-    # customer_balances_file_path = os.path.join(target_dir, target_file_name) # ESKİ
-
-    customer_balances_file_path = CUSTOMER_BALANCES_JSON_PATH # YENİ GÜVENLİ YOL
-    target_dir = os.path.dirname(customer_balances_file_path) # Tam yoldan dizini al
+    if not customer_balances: # Gelen liste boş olabilir, bu bir hata değil, tablo boşaltılır.
+        print("Bilgi: Boş cari bakiye listesi alındı. Mevcut cari kayıtları silinecek.")
 
-    if not customer_balances: # Gelen liste boş olabilir, bu bir hata değil, boş dosya oluştururuz.
-        print("Bilgi: Boş cari bakiye listesi alındı. Mevcut dosya (varsa) silinip boş dosya oluşturulacak.")
-        # pass # Ya da bir şey yapmayabiliriz, isteğe bağlı
+    records = [crud.normalize_customer_record(raw) for raw in customer_balances]
+    missing_code_count = sum(1 for record in records if not record["CARI_KOD"])
+    if missing_code_count:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"{missing_code_count} cari kaydında CARI_KOD eksik."
+        )
 
     try:
-        # Hedef dizinin var olduğundan emin ol (Render'da ilk dağıtımda olmayabilir)
-        if not os.path.exists(target_dir):
-            os.makedirs(target_dir)
-            print(f"Hedef dizin ({target_dir}) oluşturuldu.")
-
-        # Gelen veriyi doğrudan JSON dosyasına yazalım (var olanın üzerine yazar)
-        with open(customer_balances_file_path, "w", encoding="utf-8") as f:
-            json.dump(customer_balances, f, ensure_ascii=False, indent=4)
-        print(f"{len(customer_balances)} adet cari bakiye verisi alındı ve {customer_balances_file_path} dosyasına kaydedildi.")
-        return {"message": f"{len(customer_balances)} adet cari bakiye başarıyla alındı ve kaydedildi."}
+        snapshot = await file_storage.run(
+            "customer_balances_replace", customer_balances_store.replace,
+            records, persist=lambda items: crud.replace_customer_balances(db, items)
+        )
+        print(f"{len(records)} adet cari bakiye verisi alındı ve veritabanına kaydedildi.")
+        change_feed.publish("customers", {"count": len(snapshot)}, version=snapshot.digest)
+        return {"message": f"{len(records)} adet cari bakiye başarıyla alındı ve kaydedildi."}
     except Exception as e:
         print(f"Cari bakiye verileri kaydedilirken hata oluştu: {e}")
         # Yerel script'e daha detaylı hata bilgisi vermek için hata mesajını döndürebiliriz.
@@ -620,6 +1071,10 @@ def ensure_discount_materials_dir():
         os.makedirs(DISCOUNT_MATERIALS_DIR)
         print(f"Dizin oluşturuldu: {DISCOUNT_MATERIALS_DIR}")
 
+def discount_material_entries(filenames: List[str]) -> List[Dict]:
+    """Materyal adlarını içerik hash'li static adresleriyle döndürür (dosyaları okuyabilir, thread havuzunda çağrılır)."""
+    return [{"name": filename, "url": static_assets.url(f"discount_materials/{filename}")} for filename in filenames]
+
 @app.get("/discounts", response_class=HTMLResponse, tags=["Discounts"])
 async def view_discounts(
     request: Request, 
@@ -628,15 +1083,11 @@ async def view_discounts(
     upload_message_type: Optional[str] = None # Query parametresi olarak mesaj tipini al
 ):
     print(f"DEBUG: /discounts erişimi. Session admin_user: {request.session.get('admin_user')}, Current User (from dep): {current_user}") # DEBUG LOG
-    ensure_discount_materials_dir()
+    await file_storage.run("ensure_dir", ensure_discount_materials_dir)
     materials = []
     try:
-        for filename in os.listdir(DISCOUNT_MATERIALS_DIR):
-            if os.path.isfile(os.path.join(DISCOUNT_MATERIALS_DIR, filename)):
-                materials.append({
-                    "name": filename,
-                    "url": f"/static/discount_materials/{filename}"
-                })
+        filenames = await file_storage.list_files(DISCOUNT_MATERIALS_DIR)
+        materials = await file_storage.run("static_urls", discount_material_entries, filenames)
     except Exception as e:
         print(f"İndirim materyalleri listelenirken hata: {e}")
         # Hata durumunda boş liste ile devam et
@@ -665,11 +1116,11 @@ async def upload_discount_material(
     admin_password: str = Form(...), # Admin şifresini formdan al
     current_user: str = Depends(get_current_admin_user_for_api) # API olduğu için _for_api kullandık
 ):
-    ensure_discount_materials_dir()
+    await file_storage.run("ensure_dir", ensure_discount_materials_dir)
 
     # Admin şifresini doğrula
-    admin_creds_dict = get_admin_credentials()
-    if not admin_creds_dict or not verify_password(admin_password, admin_creds_dict.get("admin_hashed_password", "")):
+    admin_creds_dict = await get_admin_credentials_async()
+    if not admin_creds_dict or not await verify_password_async(admin_password, admin_creds_dict.get("admin_hashed_password", "")):
         # Şifre yanlışsa, hata mesajıyla /discounts'a yönlendir
         error_message = "Admin şifresi yanlış. Dosya yüklenemedi."
         return RedirectResponse(url=f"/discounts?upload_message={error_message}&upload_message_type=danger", status_code=status.HTTP_303_SEE_OTHER)
@@ -690,8 +1141,8 @@ async def upload_discount_material(
             filename = file.filename.replace(" ", "_")
             file_path = os.path.join(DISCOUNT_MATERIALS_DIR, filename)
             
-            with open(file_path, "wb") as buffer:
-                shutil.copyfileobj(file.file, buffer)
+            # Kopyalama thread havuzunda yapılır; büyük dosyalar diğer istekleri bekletmez
+            await file_storage.save_stream(file.file, file_path)
             print(f"Dosya başarıyla yüklendi: {file_path}")
             uploaded_files_count += 1
 
@@ -699,8 +1150,7 @@ async def upload_discount_material(
             print(f"Dosya kaydedilirken hata oluştu ({file.filename}): {e}")
             error_files_count += 1
         finally:
-            if file and not file.file.closed:
-                 file.file.close()
+            await file.close()
 
     # Yönlendirme için özet mesaj oluştur
     messages = []
@@ -735,11 +1185,11 @@ async def view_pdf_page(
         raise HTTPException(status_code=400, detail="Geçersiz PDF adı.")
 
     pdf_path = os.path.join(DISCOUNT_MATERIALS_DIR, pdf_name)
-    if not os.path.isfile(pdf_path):
+    if not await file_storage.is_file(pdf_path):
         raise HTTPException(status_code=404, detail="PDF dosyası bulunamadı.")
 
     # PDF dosyasının public URL'ini oluştur (static mount üzerinden) ve genişliğe sığdırma parametresini dene
-    pdf_url = f"/static/discount_materials/{pdf_name}#view=FitH"
+    pdf_url = await file_storage.run("static_url", static_assets.url, f"discount_materials/{pdf_name}") + "#view=FitH"
     
     return templates.TemplateResponse("view_pdf.html", {
         "request": request,
@@ -764,9 +1214,9 @@ async def delete_discount_material_file(
 
     file_path = os.path.join(DISCOUNT_MATERIALS_DIR, material_name)
     
-    if os.path.isfile(file_path):
+    if await file_storage.is_file(file_path):
         try:
-            os.remove(file_path)
+            await file_storage.remove(file_path)
             print(f"Dosya başarıyla silindi: {file_path}")
             # Başarı mesajı için flash mesaj eklenebilir
         except Exception as e:
@@ -782,17 +1232,13 @@ async def delete_discount_material_file(
 async def view_discount_images_page(
     request: Request
 ):
-    view_count = increment_view_count()
-    ensure_discount_materials_dir()
+    view_count = view_counter.increment(GALLERY_VIEW_COUNTER_KEY) # Yalnızca bellekte artırılır, istek başına I/O yok
+    await file_storage.run("ensure_dir", ensure_discount_materials_dir)
     image_materials = []
     allowed_image_extensions = (".jpg", ".jpeg", ".png", ".gif")
     try:
-        for filename in os.listdir(DISCOUNT_MATERIALS_DIR):
-            if os.path.isfile(os.path.join(DISCOUNT_MATERIALS_DIR, filename)) and filename.lower().endswith(allowed_image_extensions):
-                image_materials.append({
-                    "name": filename,
-                    "url": f"/static/discount_materials/{filename}"
-                })
+        filenames = await file_storage.list_files(DISCOUNT_MATERIALS_DIR, allowed_image_extensions)
+        image_materials = await file_storage.run("static_urls", discount_material_entries, filenames)
     except Exception as e:
         print(f"İndirim görselleri listelenirken hata: {e}")
     
@@ -812,25 +1258,28 @@ async def delete_all_discount_materials(
     admin_password: str = Form(...),
     current_user: str = Depends(get_current_admin_user_for_api)
 ):
-    ensure_discount_materials_dir()
-    admin_creds_dict = get_admin_credentials()
-    if not admin_creds_dict or not verify_password(admin_password, admin_creds_dict.get("admin_hashed_password", "")):
+    await file_storage.run("ensure_dir", ensure_discount_materials_dir)
+    admin_creds_dict = await get_admin_credentials_async()
+    if not admin_creds_dict or not await verify_password_async(admin_password, admin_creds_dict.get("admin_hashed_password", "")):
         error_message = "Admin şifresi yanlış. Materyaller silinemedi."
         return RedirectResponse(url=f"/discounts?upload_message={error_message}&upload_message_type=danger", status_code=status.HTTP_303_SEE_OTHER)
 
-    deleted_count = 0
-    error_count = 0
-    
-    for filename in os.listdir(DISCOUNT_MATERIALS_DIR):
-        file_path = os.path.join(DISCOUNT_MATERIALS_DIR, filename)
-        try:
-            if os.path.isfile(file_path) or os.path.islink(file_path):
-                os.remove(file_path)
-                deleted_count += 1
-        except Exception as e:
-            print(f"Dosya silinirken hata oluştu ({file_path}): {e}")
-            error_count += 1
-            
+    def delete_all_files():
+        deleted_count = 0
+        error_count = 0
+        for filename in os.listdir(DISCOUNT_MATERIALS_DIR):
+            file_path = os.path.join(DISCOUNT_MATERIALS_DIR, filename)
+            try:
+                if os.path.isfile(file_path) or os.path.islink(file_path):
+                    os.remove(file_path)
+                    deleted_count += 1
+            except Exception as e:
+                print(f"Dosya silinirken hata oluştu ({file_path}): {e}")
+                error_count += 1
+        return deleted_count, error_count
+
+    deleted_count, error_count = await file_storage.run("remove_all", delete_all_files)
+
     if error_count > 0:
         message = f"{deleted_count} materyal başarıyla silindi, ancak {error_count} materyal silinirken hata oluştu."
         message_type = "warning"
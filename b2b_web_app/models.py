@@ -1,6 +1,6 @@
 import datetime
 import enum # Standart Python enum importu eklendi
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Enum as SQLEnum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func # func.now() için eklendi
 # from sqlalchemy.ext.declarative import declarative_base # Bu satır artık gereksiz
@@ -27,9 +27,19 @@ class Order(Base):
     total_amount = Column(Float, nullable=False)
     # SQLAlchemy sütununda PyOrderStatusEnum'u kullan
     status = Column(SQLEnum(PyOrderStatusEnum, name="order_status_enum", create_constraint=True, validate_strings=True), nullable=False, index=True, default=PyOrderStatusEnum.PENDING)
+    # İstemcinin gönderdiği Idempotency-Key; aynı anahtarla tekrar gönderilen sipariş yeniden kaydedilmez
+    idempotency_key = Column(String(100), nullable=True)
 
     items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
 
+    # Sipariş listesinin (created_at, id) üzerinden keyset sayfalaması ve durum filtresi için
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+        # Boş (NULL) anahtarlar birbirini engellemez; dolu anahtarlar tekildir
+        Index("ix_orders_idempotency_key", "idempotency_key", unique=True),
+    )
+
     def __repr__(self):
         return f"<Order(id={self.id}, customer_name='{self.customer_name}', status='{self.status.value if self.status else None}')>"
 
@@ -47,4 +57,49 @@ class OrderItem(Base):
     order = relationship("Order", back_populates="items")
 
     def __repr__(self):
-        return f"<OrderItem(id={self.id}, product_code='{self.product_code}', quantity={self.quantity})>" 
\ No newline at end of file
+        return f"<OrderItem(id={self.id}, product_code='{self.product_code}', quantity={self.quantity})>" 
+
+class Product(Base):
+    """Masaüstünden senkronize edilen ürün kataloğu (eskiden received_products.json)."""
+    __tablename__ = "products"
+
+    id = Column(Integer, primary_key=True, index=True)
+    stok_kodu = Column(String(100), nullable=False, unique=True, index=True)
+    stok_adi = Column(String(255), nullable=True)
+    bakiye = Column(Float, nullable=True)
+    satis_fiat1 = Column(Float, nullable=True)
+    grup_kodu = Column(String(100), nullable=True, index=True)
+    barkod1 = Column(String(255), nullable=True, index=True)
+    image_path_web = Column(String(255), nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<Product(stok_kodu='{self.stok_kodu}', grup_kodu='{self.grup_kodu}')>"
+
+class CustomerBalance(Base):
+    """Masaüstünden senkronize edilen cari bakiyeleri (eskiden filtrelenen_cariler.json)."""
+    __tablename__ = "customer_balances"
+
+    id = Column(Integer, primary_key=True, index=True)
+    cari_kod = Column(String(100), nullable=False, unique=True, index=True)
+    cari_isim = Column(String(255), nullable=True, index=True)
+    borc_bakiyesi = Column(Float, nullable=True)
+    alacak_bakiyesi = Column(Float, nullable=True)
+    net_bakiye = Column(Float, nullable=True)
+    grup_kodu = Column(String(100), nullable=True)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<CustomerBalance(cari_kod='{self.cari_kod}', net_bakiye={self.net_bakiye})>"
+
+class ViewCounter(Base):
+    """Görüntülenme sayaçları (eskiden view_counter.json). Anahtar örn. "discount_gallery" veya "image:<dosya adı>"."""
+    __tablename__ = "view_counters"
+
+    id = Column(Integer, primary_key=True, index=True)
+    counter_key = Column(String(255), nullable=False, unique=True, index=True)
+    count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now(), nullable=False)
+
+    def __repr__(self):
+        return f"<ViewCounter(counter_key='{self.counter_key}', count={self.count})>"
@@ -0,0 +1,117 @@
+"""
+Ürün yüklemeleri için akış (streaming) tabanlı ayrıştırma ve doğrulama.
+
+POST /api/products gövdesi tek parça halinde belleğe alınıp Pydantic ile doğrulanmak
+yerine parça parça okunur; JSON dizisindeki her ürün nesnesi tamamlandığı anda
+ayrıştırılır, kompakt şemaya göre doğrulanır ve yalnızca şemadaki alanlar saklanır.
+Böylece ham gövde, ara Python nesneleri ve doğrulanmış kopya aynı anda bellekte tutulmaz.
+"""
+import codecs
+import json
+import math
+from typing import AsyncIterator, Dict
+
+# Masaüstünden gelen ürün kaydının alanları; bunların dışındaki alanlar saklanmaz
+PRODUCT_TEXT_FIELDS = ("STOK_ADI", "GRUP_KODU", "BARKOD1", "IMAGE_PATH_WEB")
+PRODUCT_NUMERIC_FIELDS = ("BAKIYE", "SATIS_FIAT1")
+PRODUCT_SCHEMA_FIELDS = ("STOK_KODU",) + PRODUCT_TEXT_FIELDS + PRODUCT_NUMERIC_FIELDS
+
+# Tek bir ürün nesnesi için tampon sınırı; bozuk bir gövdenin tamamının tampona alınmasını engeller
+MAX_RECORD_CHARS = 256 * 1024
+
+
+class ProductIngestError(ValueError):
+    """Gövde geçerli bir ürün dizisi değilse veya bir kayıt şemaya uymuyorsa fırlatılır."""
+
+
+def validate_product_record(raw, index: int) -> Dict:
+    """Tek bir ürün kaydını doğrular ve yalnızca şema alanlarını içeren yeni bir sözlük döndürür."""
+    if not isinstance(raw, dict):
+        raise ProductIngestError(f"{index}. kayıt bir JSON nesnesi değil.")
+
+    stok_kodu = raw.get("STOK_KODU")
+    if isinstance(stok_kodu, (int, float)) and not isinstance(stok_kodu, bool):
+        stok_kodu = str(stok_kodu)
+    if not isinstance(stok_kodu, str) or not stok_kodu.strip():
+        raise ProductIngestError(f"{index}. kayıtta STOK_KODU eksik veya geçersiz.")
+
+    record = {"STOK_KODU": stok_kodu.strip()}
+    for field in PRODUCT_TEXT_FIELDS:
+        value = raw.get(field)
+        if value is not None and not isinstance(value, str):
+            value = str(value)
+        record[field] = value
+    for field in PRODUCT_NUMERIC_FIELDS:
+        value = raw.get(field)
+        if value is not None:
+            # Masaüstü Decimal değerleri string olarak gönderir; veritabanındaki Float sütunla aynı olması için float'a çevrilir
+            if isinstance(value, bool):
+                raise ProductIngestError(f"{index}. kayıtta {field} sayısal değil: {value!r}")
+            try:
+                value = float(value)
+            except (TypeError, ValueError):
+                raise ProductIngestError(f"{index}. kayıtta {field} sayısal değil: {value!r}")
+            if not math.isfinite(value):
+                raise ProductIngestError(f"{index}. kayıtta {field} sonlu bir sayı değil.")
+        record[field] = value
+    return record
+
+
+async def iter_json_array(chunks: AsyncIterator[bytes], max_record_chars: int = MAX_RECORD_CHARS) -> AsyncIterator:
+    """
+    Bayt parçaları halinde gelen bir JSON dizisini okur ve her nesne elemanını tamamlandığı anda döndürür.
+    Yalnızca nesnelerden oluşan diziler desteklenir (ürün yüklemesi için yeterli).
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    state = "start"  # start -> value_or_end -> comma_or_end <-> value -> done
+
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        buffer += text_decoder.decode(chunk)
+        pos = 0
+        length = len(buffer)
+        while True:
+            while pos < length and buffer[pos] in " \t\r\n":
+                pos += 1
+            if pos >= length:
+                break
+            char = buffer[pos]
+            if state == "start":
+                if char != "[":
+                    raise ProductIngestError("Gövde bir JSON dizisi olmalıdır.")
+                pos += 1
+                state = "value_or_end"
+            elif state in ("value_or_end", "value"):
+                if char == "]" and state == "value_or_end":
+                    pos += 1
+                    state = "done"
+                    continue
+                if char != "{":
+                    raise ProductIngestError("Dizi elemanları JSON nesnesi olmalıdır.")
+                try:
+                    obj, end = decoder.raw_decode(buffer, pos)
+                except json.JSONDecodeError:
+                    break  # Nesne henüz tamamlanmadı, sonraki parçayı bekle
+                pos = end
+                state = "comma_or_end"
+                yield obj
+            elif state == "comma_or_end":
+                if char == ",":
+                    state = "value"
+                elif char == "]":
+                    state = "done"
+                else:
+                    raise ProductIngestError(f"Beklenmeyen karakter: {char!r}")
+                pos += 1
+            else:  # done
+                raise ProductIngestError("Dizi kapandıktan sonra beklenmeyen veri.")
+        buffer = buffer[pos:]
+        if len(buffer) > max_record_chars:
+            raise ProductIngestError("Tek bir ürün kaydı çok büyük veya gövde bozuk.")
+
+    buffer += text_decoder.decode(b"", final=True)
+    if state != "done" or buffer.strip():
+        raise ProductIngestError("Gövde eksik veya bozuk bir JSON dizisi.")
@@ -0,0 +1,205 @@
+"""
+Ürün kataloğu üzerinde sunucu tarafı filtreleme, sıralama ve sayfalama.
+
+Her katalog snapshot'ı için bir kez `ProductIndex` oluşturulur: grup koduna göre
+kova indeksi, arama için Türkçe küçük harfe indirgenmiş metinler ve sıralama
+seçenekleri için önceden hesaplanmış sıralar. Böylece `GET /api/products`
+sorguları her istekte tüm kataloğu sıralamak zorunda kalmaz.
+"""
+from typing import Dict, List, Optional
+
+# Web arayüzündeki ana kategori -> grup kodu yapısı (daha önce products.html içindeydi)
+MAIN_CATEGORIES = [
+    {
+        "id": "gida",
+        "ad": "GIDA ÜRÜNLERİ",
+        "grup_kodlari": ["BAKLIYAT", "MAKARNA", "UN", "CORBA", "BASAK", "KAHVALTI", "COKOKREM", "ETI", "GOFRET", "JELIBON", "LOKUM", "HELVA", "BAYRAM", "KENT", "KONSERVE", "BALIK", "KENTON", "DRO"],
+    },
+    {"id": "icecekler", "ad": "İÇECEKLER", "grup_kodlari": ["CAY", "KAHVE", "ICECEK"]},
+    {"id": "temizlik", "ad": "TEMİZLİK & K. BAKIM", "grup_kodlari": ["DETERJAN", "KOZMETIK", "PED", "BEZ", "MENDIL", "ISLAK"]},
+    {"id": "evyasam", "ad": "EV YAŞAM & GEREÇLERİ", "grup_kodlari": ["BARDAK", "KAGIT"]},
+    {"id": "diger", "ad": "DİĞER ÜRÜNLER", "grup_kodlari": ["01", "DIGER"]},
+]
+MAIN_CATEGORY_GROUPS = {category["id"]: category["grup_kodlari"] for category in MAIN_CATEGORIES}
+
+SEARCH_FIELDS = ("STOK_ADI", "STOK_KODU", "GRUP_KODU", "BARKOD1")
+DEFAULT_SORT = "grup"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+_TR_UPPER_TO_LOWER = str.maketrans({"I": "ı", "İ": "i"})
+# Arama için Türkçe harfler ASCII karşılıklarına indirgenir; böylece mobilde Türkçe karakter
+# kullanmadan yazılan "sut" araması "SÜT" ile eşleşir. Ý/ý, Þ/þ, Ð/ð masaüstündeki
+# CHAR_CORRECTION_MAP'in düzelttiği bozuk (mojibake) karakterlerdir.
+_SEARCH_FOLDING = str.maketrans({
+    "ç": "c", "ğ": "g", "ı": "i", "ö": "o", "ş": "s", "ü": "u", "â": "a", "î": "i", "û": "u",
+    "ý": "i", "þ": "s", "ð": "g",
+})
+# Türk alfabesi sırası (localeCompare('tr') ile aynı harf sırası); diğer karakterler kendi kod noktalarıyla sıralanır
+_TR_ALPHABET = "abcçdefgğhıijklmnoöpqrsştuüvwxyz"
+_TR_COLLATION = str.maketrans({char: chr(0x2000 + position) for position, char in enumerate(_TR_ALPHABET)})
+
+
+class ProductQueryError(ValueError):
+    """Geçersiz sorgu parametresi."""
+
+
+class StaleCursorError(ProductQueryError):
+    """İmleç (cursor) artık güncel olmayan bir katalog versiyonuna ait."""
+
+
+def fold_turkish(text) -> str:
+    """Metni Türkçe kurallarına göre küçük harfe çevirir (I -> ı, İ -> i)."""
+    return str(text).translate(_TR_UPPER_TO_LOWER).lower()
+
+
+def fold_for_search(text) -> str:
+    """Arama metni ve sorgusu için ortak indirgeme: Türkçe küçük harf + ASCII karşılıklar."""
+    # Aramada I ve ı zaten i'ye indirgendiği için yalnızca İ'nin özel ele alınması yeterlidir
+    text = str(text).replace("İ", "i").lower()
+    return text if text.isascii() else text.translate(_SEARCH_FOLDING)
+
+
+def turkish_sort_key(text) -> str:
+    return fold_turkish(text or "").translate(_TR_COLLATION)
+
+
+def _price(product: Dict) -> float:
+    return product.get("SATIS_FIAT1") or 0.0
+
+
+SORT_KEYS = {
+    # Varsayılan: önce grup kodu, grup içinde ürün adı (sayfanın önceki istemci tarafı sıralaması)
+    "grup": lambda p: (p.get("GRUP_KODU") or "", turkish_sort_key(p.get("STOK_ADI"))),
+    "ad": lambda p: turkish_sort_key(p.get("STOK_ADI")),
+    "kod": lambda p: p.get("STOK_KODU") or "",
+    "fiyat_artan": lambda p: (_price(p), turkish_sort_key(p.get("STOK_ADI"))),
+    "fiyat_azalan": lambda p: (-_price(p), turkish_sort_key(p.get("STOK_ADI"))),
+    "bakiye_azalan": lambda p: (-(p.get("BAKIYE") or 0.0), turkish_sort_key(p.get("STOK_ADI"))),
+}
+
+
+class ProductIndex:
+    """Bir snapshot'taki ürünler için sorgu indeksleri. Snapshot gibi değişmezdir."""
+
+    def __init__(self, products: List[Dict]):
+        self.products = products
+        self.by_code = {product["STOK_KODU"]: product for product in products}
+        self.by_barcode: Dict[str, Dict] = {}
+        for product in products:
+            barcode = (product.get("BARKOD1") or "").strip()
+            if barcode:
+                # Aynı barkod birden fazla üründe varsa ilk ürün (stok koduna göre) geçerlidir
+                self.by_barcode.setdefault(barcode, product)
+        self.by_group: Dict[str, List[int]] = {}
+        for position, product in enumerate(products):
+            self.by_group.setdefault(product.get("GRUP_KODU") or "", []).append(position)
+        # Alanlar satır sonu ile ayrılır; böylece bir arama terimi iki alanın birleşimine denk gelmez
+        self.search_text = [
+            "\n".join(fold_for_search(product.get(field) or "") for field in SEARCH_FIELDS)
+            for product in products
+        ]
+        self._orders: Dict[str, List[int]] = {}
+        self._ranks: Dict[str, List[int]] = {}
+        self._order(DEFAULT_SORT)
+
+    def _order(self, sort: str) -> List[int]:
+        order = self._orders.get(sort)
+        if order is None:
+            # Diğer sıralamalar ilk kullanıldıklarında hesaplanır; eşzamanlı hesaplama aynı sonucu üretir
+            key = SORT_KEYS[sort]
+            products = self.products
+            order = sorted(range(len(products)), key=lambda position: key(products[position]))
+            rank = [0] * len(order)
+            for ordinal, position in enumerate(order):
+                rank[position] = ordinal
+            self._ranks[sort] = rank
+            self._orders[sort] = order
+        return order
+
+    def find(self, stok_kodu: Optional[str] = None, barcode: Optional[str] = None) -> Optional[Dict]:
+        """Ürünü önce stok koduyla, bulunamazsa barkodla O(1) olarak arar."""
+        product = self.by_code.get((stok_kodu or "").strip())
+        if product is None and barcode:
+            product = self.by_barcode.get(barcode.strip())
+        return product
+
+    def active_group_codes(self) -> set:
+        return {group for group in self.by_group if group}
+
+    def query(self, q: Optional[str], groups: Optional[List[str]], sort: str, offset: int, limit: int):
+        """Filtrelenmiş ve sıralanmış sonucun [offset, offset+limit) aralığını ve toplam eşleşme sayısını döndürür."""
+        order = self._order(sort)
+        if groups is None:
+            candidates = order
+        else:
+            rank = self._ranks[sort]
+            candidates = sorted(
+                (position for group in set(groups) for position in self.by_group.get(group, ())),
+                key=rank.__getitem__,
+            )
+        terms = fold_for_search(q).split() if q else []
+        if terms:
+            texts = self.search_text
+            candidates = [position for position in candidates if all(term in texts[position] for term in terms)]
+        products = self.products
+        return [products[position] for position in candidates[offset:offset + limit]], len(candidates)
+
+
+def build_product_index(products: List[Dict]) -> ProductIndex:
+    return ProductIndex(products)
+
+
+def active_categories(index: ProductIndex) -> List[Dict]:
+    """Katalogda en az bir ürünü bulunan ana kategorileri ve bu kategorilerdeki dolu grup kodlarını döndürür."""
+    present = index.active_group_codes()
+    categories = []
+    for category in MAIN_CATEGORIES:
+        groups = [group for group in category["grup_kodlari"] if group in present]
+        if groups:
+            categories.append({"id": category["id"], "ad": category["ad"], "grup_kodlari": groups})
+    return categories
+
+
+def _encode_cursor(digest: str, offset: int) -> str:
+    return f"{digest[:12]}.{offset}"
+
+
+def _decode_cursor(cursor: str, digest: str) -> int:
+    version, _, offset = cursor.partition(".")
+    if not offset.isdigit():
+        raise ProductQueryError("Geçersiz cursor değeri.")
+    if version != digest[:12]:
+        raise StaleCursorError("Katalog güncellendi, listeyi baştan yükleyin.")
+    return int(offset)
+
+
+def query_products(snapshot, q: Optional[str] = None, main_category: Optional[str] = None,
+                   grup_kodu: Optional[str] = None, sort: Optional[str] = None,
+                   limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict:
+    """
+    `GET /api/products` sorgu parametrelerini snapshot indeksine uygular ve bir sayfa döndürür.
+    `next_cursor` bir sonraki sayfa için kullanılır; son sayfada None'dır.
+    """
+    sort = sort or DEFAULT_SORT
+    if sort not in SORT_KEYS:
+        raise ProductQueryError(f"Geçersiz sıralama: {sort}. Geçerli değerler: {', '.join(SORT_KEYS)}")
+    limit = min(limit or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+
+    groups = None
+    if main_category:
+        if main_category not in MAIN_CATEGORY_GROUPS:
+            raise ProductQueryError(f"Geçersiz ana kategori: {main_category}")
+        groups = MAIN_CATEGORY_GROUPS[main_category]
+    if grup_kodu:
+        groups = [grup_kodu] if groups is None or grup_kodu in groups else []
+
+    offset = _decode_cursor(cursor, snapshot.digest) if cursor else 0
+    items, total = snapshot.index.query(q, groups, sort, offset, limit)
+    next_offset = offset + len(items)
+    return {
+        "items": items,
+        "total": total,
+        "next_cursor": _encode_cursor(snapshot.digest, next_offset) if next_offset < total else None,
+        "version": snapshot.digest,
+    }
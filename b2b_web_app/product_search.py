@@ -0,0 +1,110 @@
+"""
+Ürünler için SQLite FTS5 tam metin arama indeksi.
+
+İndeks uygulama sürecine ait ayrı bir bellek içi SQLite veritabanında tutulur; ana
+veritabanı (PostgreSQL de olabilir) bundan etkilenmez. STOK_ADI, STOK_KODU, BARKOD1
+ve GRUP_KODU alanları `product_query.fold_for_search` ile indirgenerek indekslenir,
+sorgu da aynı şekilde indirgenir. Sonuçlar bm25 ile ilgililiğe göre sıralanır.
+
+`sync` her katalog değişikliğinde çağrılır ve yalnızca eklenen, değişen veya silinen
+ürünleri indekse yazar. SQLite FTS5 desteği olmadan derlenmişse `available` False olur
+ve çağıran taraf basit eşleşmeye geri döner.
+"""
+import re
+import sqlite3
+import threading
+from typing import Dict, List, Tuple
+
+from .product_query import fold_for_search
+
+# İndekslenen alanlar ve bm25 ağırlıkları (ürün adındaki eşleşme en değerlisidir)
+INDEXED_FIELDS = ("STOK_ADI", "STOK_KODU", "BARKOD1", "GRUP_KODU")
+FIELD_WEIGHTS = (20.0, 5.0, 5.0, 1.0)
+MAX_QUERY_TERMS = 8
+
+_TERM_PATTERN = re.compile(r"\w+")
+
+
+class ProductSearchIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexed: Dict[str, Tuple[str, ...]] = {}  # STOK_KODU -> indekslenmiş alanların ham değerleri
+        self._rowids: Dict[str, int] = {}
+        self._rowid_to_code: Dict[int, str] = {}
+        self._next_rowid = 1
+        self._conn = None
+        try:
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+            conn.execute(
+                "CREATE VIRTUAL TABLE products_fts USING fts5("
+                "stok_adi, stok_kodu, barkod1, grup_kodu, tokenize='unicode61', prefix='1 2 3')"
+            )
+            self._conn = conn
+        except sqlite3.OperationalError as e:
+            print(f"UYARI: SQLite FTS5 kullanılamıyor, ürün araması basit eşleşme ile yapılacak: {e}")
+
+    @property
+    def available(self) -> bool:
+        return self._conn is not None
+
+    def sync(self, products: List[Dict]) -> int:
+        """İndeksi verilen ürün listesine eşitler ve yazılan (eklenen/değişen/silinen) kayıt sayısını döndürür."""
+        if not self.available:
+            return 0
+        # Değişiklik ham değerler üzerinden bulunur; indirgeme yalnızca yazılacak kayıtlar için yapılır
+        rows = {
+            product["STOK_KODU"]: tuple(product.get(field) or "" for field in INDEXED_FIELDS)
+            for product in products
+        }
+        with self._lock:
+            removed = [code for code in self._indexed if code not in rows]
+            changed = [(code, row) for code, row in rows.items() if self._indexed.get(code) != row]
+            if not removed and not changed:
+                return 0
+
+            stale_rowids = []
+            for code in removed:
+                rowid = self._rowids.pop(code)
+                del self._rowid_to_code[rowid]
+                del self._indexed[code]
+                stale_rowids.append((rowid,))
+            inserts = []
+            for code, row in changed:
+                rowid = self._rowids.get(code)
+                if rowid is None:
+                    rowid = self._next_rowid
+                    self._next_rowid += 1
+                    self._rowids[code] = rowid
+                    self._rowid_to_code[rowid] = code
+                else:
+                    stale_rowids.append((rowid,))
+                self._indexed[code] = row
+                inserts.append((rowid,) + tuple(fold_for_search(value) for value in row))
+
+            with self._conn:  # Tek transaction
+                self._conn.executemany("DELETE FROM products_fts WHERE rowid = ?", stale_rowids)
+                self._conn.executemany(
+                    "INSERT INTO products_fts (rowid, stok_adi, stok_kodu, barkod1, grup_kodu) VALUES (?, ?, ?, ?, ?)",
+                    inserts,
+                )
+            return len(removed) + len(changed)
+
+    def search(self, q: str, limit: int, offset: int = 0) -> Tuple[List[str], int]:
+        """Sorguya uyan stok kodlarını ilgililik sırasıyla ve toplam eşleşme sayısını döndürür."""
+        terms = _TERM_PATTERN.findall(fold_for_search(q))[:MAX_QUERY_TERMS]
+        if not terms or not self.available:
+            return [], 0
+        # Her terim önek olarak aranır ve tüm terimler eşleşmelidir ("sut 1" -> "sut"* AND "1"*)
+        match = " ".join(f'"{term}"*' for term in terms)
+        weights = ", ".join(str(weight) for weight in FIELD_WEIGHTS)
+        with self._lock:
+            total = self._conn.execute(
+                "SELECT count(*) FROM products_fts WHERE products_fts MATCH ?", (match,)
+            ).fetchone()[0]
+            rowids = self._conn.execute(
+                f"SELECT rowid FROM products_fts WHERE products_fts MATCH ? "
+                f"ORDER BY bm25(products_fts, {weights}) LIMIT ? OFFSET ?",
+                (match, limit, offset),
+            ).fetchall()
+            codes = [self._rowid_to_code[rowid] for (rowid,) in rowids]
+        return codes, total
@@ -0,0 +1,119 @@
+"""
+Sıkıştırılmış istek gövdeleri için ASGI middleware.
+
+Masaüstü senkronizasyon betikleri büyük ve tekrarlı JSON gövdelerini
+`Content-Encoding: gzip` (veya zstandard paketi kuruluysa `zstd`) ile gönderir.
+Middleware gövdeyi endpoint'e ulaşmadan önce açar; açılmış boyut sınırı aşılırsa
+413 döner, böylece küçük bir "zip bombası" sunucu belleğini tüketemez.
+"""
+import json
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # zstd isteğe bağlıdır, kurulu değilse yalnızca gzip desteklenir
+    zstandard = None
+
+DEFAULT_MAX_DECOMPRESSED_BYTES = 64 * 1024 * 1024  # 64 MB
+
+
+class RequestTooLarge(Exception):
+    pass
+
+
+class RequestDecompressionMiddleware:
+    def __init__(self, app, paths=None, max_decompressed_bytes: int = DEFAULT_MAX_DECOMPRESSED_BYTES):
+        self.app = app
+        # None ise tüm yollar için uygulanır
+        self.paths = set(paths) if paths else None
+        self.max_decompressed_bytes = max_decompressed_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or (self.paths is not None and scope["path"] not in self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        encoding = headers.get(b"content-encoding", b"").decode("latin-1").strip().lower()
+        if not encoding or encoding == "identity":
+            await self.app(scope, receive, send)
+            return
+
+        if encoding not in ("gzip", "zstd") or (encoding == "zstd" and zstandard is None):
+            await self._send_error(send, 415, f"Desteklenmeyen Content-Encoding: {encoding}")
+            return
+
+        # Sıkıştırılmış gövde de aynı sınırla okunur
+        compressed = bytearray()
+        more_body = True
+        while more_body:
+            message = await receive()
+            compressed.extend(message.get("body", b""))
+            more_body = message.get("more_body", False)
+            if len(compressed) > self.max_decompressed_bytes:
+                await self._send_error(send, 413, "İstek gövdesi çok büyük.")
+                return
+
+        try:
+            body = self._decompress(encoding, bytes(compressed))
+        except RequestTooLarge:
+            await self._send_error(send, 413, "Açılmış istek gövdesi izin verilen boyutu aşıyor.")
+            return
+        except Exception as e:
+            print(f"Sıkıştırılmış istek gövdesi açılamadı ({encoding}): {e}")
+            await self._send_error(send, 400, "Sıkıştırılmış istek gövdesi açılamadı.")
+            return
+
+        # Endpoint'e açılmış gövde ve düzeltilmiş başlıklar ile devam et
+        new_headers = [(k, v) for k, v in scope["headers"] if k not in (b"content-encoding", b"content-length")]
+        new_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        scope = dict(scope, headers=new_headers)
+
+        body_sent = False
+
+        async def replay_receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, replay_receive, send)
+
+    def _decompress(self, encoding: str, data: bytes) -> bytes:
+        limit = self.max_decompressed_bytes
+        if encoding == "gzip":
+            # Gövde art arda eklenmiş birden çok gzip üyesinden oluşabilir (RFC 1952); hepsi açılır.
+            # Bir üyeden sonra kalan baytlar geçerli bir gzip üyesi değilse gövde reddedilir.
+            body = bytearray()
+            remaining = data
+            while True:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+                body.extend(decompressor.decompress(remaining, limit + 1 - len(body)))
+                if len(body) > limit or decompressor.unconsumed_tail:
+                    raise RequestTooLarge()
+                if not decompressor.eof:
+                    raise ValueError("gzip akışı eksik")
+                remaining = decompressor.unused_data
+                if not remaining:
+                    return bytes(body)
+        # zstd; birden çok frame varsa hepsi okunur
+        chunks = bytearray()
+        with zstandard.ZstdDecompressor().stream_reader(data, read_across_frames=True) as reader:
+            while True:
+                chunk = reader.read(1024 * 1024)
+                if not chunk:
+                    break
+                chunks.extend(chunk)
+                if len(chunks) > limit:
+                    raise RequestTooLarge()
+        return bytes(chunks)
+
+    async def _send_error(self, send, status_code: int, detail: str):
+        payload = json.dumps({"detail": detail}, ensure_ascii=False).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(payload)).encode("latin-1"))],
+        })
+        await send({"type": "http.response.body", "body": payload})
@@ -0,0 +1,194 @@
+/*
+ * Ürün kataloğu için arka plan (Web Worker) filtreleme.
+ *
+ * products.html tam kataloğu bir kez bu worker'a yükletir. Worker, sunucudaki
+ * product_query.ProductIndex ile aynı indeksleri kurar: grup kodu -> ürün sırası kovaları,
+ * Türkçe karakterleri ASCII'ye indirgenmiş arama metinleri ve varsayılan ("grup") sıralama.
+ * Arama/kategori sorguları ana thread'i bloklamadan burada cevaplanır; sonuç sırası ve
+ * eşleşme kuralları sunucudaki GET /api/products sorgusuyla aynıdır.
+ *
+ * Katalog, `cacheScript` (offline_cache.js) verilmişse IndexedDB'de ETag ile birlikte saklanır:
+ * sayfa açılışında önce saklanan kopya ile hazır olunur, ardından sunucuya yalnızca daha yeni
+ * bir versiyon olup olmadığı sorulur (değişmediyse 304, gövde indirilmez).
+ *
+ * Mesajlar:
+ *   {type: 'load', url, cacheKey, cacheScript}        -> {type: 'cache-miss'} (saklanan kopya yoksa)
+ *                                                        {type: 'ready', version, count, fromCache, savedAt} (her yeni versiyonda)
+ *                                                        {type: 'synced', status, savedAt} (sunucu kontrolü bitince)
+ *                                                        | {type: 'error', message}
+ *   {type: 'revalidate', url, cacheKey}               -> {type: 'ready', ...} (katalog değiştiyse)
+ *                                                        {type: 'synced', status, savedAt}
+ *   {type: 'query', id, q, groups, offset, limit}     -> {type: 'result', id, items, total}
+ *   {type: 'find', id, code}                          -> {type: 'found', id, product}
+ */
+
+// Sunucudaki product_query._SEARCH_FOLDING ile aynı eşleme (Ý/ý, Þ/þ, Ð/ð bozuk kodlanmış karakterlerdir)
+const SEARCH_FOLDING = {
+    'ç': 'c', 'ğ': 'g', 'ı': 'i', 'ö': 'o', 'ş': 's', 'ü': 'u', 'â': 'a', 'î': 'i', 'û': 'u',
+    'ý': 'i', 'þ': 's', 'ð': 'g'
+};
+const SEARCH_FOLDING_PATTERN = /[çğıöşüâîûýþð]/g;
+const SEARCH_FIELDS = ['STOK_ADI', 'STOK_KODU', 'GRUP_KODU', 'BARKOD1'];
+const TR_ALPHABET = 'abcçdefgğhıijklmnoöpqrsştuüvwxyz';
+const TR_COLLATION = {};
+for (let position = 0; position < TR_ALPHABET.length; position++) {
+    TR_COLLATION[TR_ALPHABET[position]] = String.fromCharCode(0x2000 + position);
+}
+const TR_COLLATION_PATTERN = new RegExp(`[${TR_ALPHABET}]`, 'g');
+
+let catalog = null;
+
+function foldForSearch(text) {
+    // product_query.fold_for_search: İ -> i, küçük harf, Türkçe harfler -> ASCII
+    const lowered = String(text).replace(/İ/g, 'i').toLowerCase();
+    return lowered.replace(SEARCH_FOLDING_PATTERN, char => SEARCH_FOLDING[char]);
+}
+
+function turkishSortKey(text) {
+    // product_query.turkish_sort_key: I -> ı, İ -> i, küçük harf; harfler Türk alfabesi sırasına göre kodlanır
+    const folded = String(text || '').replace(/I/g, 'ı').replace(/İ/g, 'i').toLowerCase();
+    return folded.replace(TR_COLLATION_PATTERN, char => TR_COLLATION[char]);
+}
+
+function compareKeys(a, b) {
+    return a < b ? -1 : (a > b ? 1 : 0);
+}
+
+function buildCatalog(products, version) {
+    const count = products.length;
+    const groupKeys = new Array(count);
+    const nameKeys = new Array(count);
+    const searchText = new Array(count);
+    const byCode = new Map();
+    const byBarcode = new Map();
+    for (let position = 0; position < count; position++) {
+        const product = products[position];
+        groupKeys[position] = product.GRUP_KODU || '';
+        nameKeys[position] = turkishSortKey(product.STOK_ADI);
+        // Alanlar satır sonu ile ayrılır; bir arama terimi iki alanın birleşimine denk gelmez
+        searchText[position] = SEARCH_FIELDS.map(field => foldForSearch(product[field] || '')).join('\n');
+        byCode.set(product.STOK_KODU, product);
+        const barcode = String(product.BARKOD1 || '').trim();
+        if (barcode && !byBarcode.has(barcode)) byBarcode.set(barcode, product);
+    }
+
+    // Varsayılan sıralama: grup kodu, grup içinde ürün adı (sunucudaki "grup" sıralaması)
+    const order = Array.from({ length: count }, (_, position) => position);
+    order.sort((a, b) => compareKeys(groupKeys[a], groupKeys[b]) || compareKeys(nameKeys[a], nameKeys[b]) || a - b);
+
+    // Kovalar sıralı ürün listesinden doldurulduğu için her kova kendi içinde zaten sıralıdır
+    const rank = new Int32Array(count);
+    const byGroup = new Map();
+    order.forEach((position, ordinal) => {
+        rank[position] = ordinal;
+        const group = groupKeys[position];
+        if (!byGroup.has(group)) byGroup.set(group, []);
+        byGroup.get(group).push(position);
+    });
+
+    return { products, version, order, rank, byGroup, searchText, byCode, byBarcode };
+}
+
+function queryCatalog(q, groups, offset, limit) {
+    let candidates;
+    if (!groups) {
+        candidates = catalog.order;
+    } else {
+        candidates = [];
+        new Set(groups).forEach(group => {
+            const bucket = catalog.byGroup.get(group);
+            if (bucket) candidates.push(...bucket);
+        });
+        if (groups.length > 1) candidates.sort((a, b) => catalog.rank[a] - catalog.rank[b]);
+    }
+
+    const terms = q ? foldForSearch(q).split(/\s+/).filter(Boolean) : [];
+    if (terms.length > 0) {
+        const texts = catalog.searchText;
+        candidates = candidates.filter(position => terms.every(term => texts[position].includes(term)));
+    }
+    const items = candidates.slice(offset, offset + limit).map(position => catalog.products[position]);
+    return { items, total: candidates.length };
+}
+
+function useCatalog(products, info) {
+    catalog = buildCatalog(products, info.etag || '');
+    catalog.savedAt = info.savedAt;
+    self.postMessage({
+        type: 'ready', version: catalog.version, count: products.length,
+        fromCache: info.fromCache, savedAt: info.savedAt
+    });
+}
+
+async function loadCatalog(message) {
+    if (message.cacheScript && !self.OfflineCache) {
+        try {
+            importScripts(message.cacheScript);
+        } catch (e) {
+            console.warn('Çevrimdışı önbellek betiği yüklenemedi, katalog yalnızca ağdan okunacak:', e);
+        }
+    }
+    if (self.OfflineCache && message.cacheKey) {
+        const result = await self.OfflineCache.loadJson(message.url, message.cacheKey, useCatalog,
+            () => self.postMessage({ type: 'cache-miss' }));
+        self.postMessage({ type: 'synced', status: result.status, savedAt: result.savedAt });
+        return;
+    }
+
+    self.postMessage({ type: 'cache-miss' });
+    const response = await fetch(message.url, { credentials: 'same-origin' });
+    if (!response.ok) throw new Error(`Katalog alınamadı: ${response.status} ${response.statusText}`);
+    useCatalog(await response.json(), { fromCache: false, etag: response.headers.get('ETag'), savedAt: Date.now() });
+    self.postMessage({ type: 'synced', status: 'updated', savedAt: Date.now() });
+}
+
+// Sunucu katalog değişikliği bildirince elimizdeki versiyon (ETag) ile sorulur; değişmediyse 304 döner
+async function revalidateCatalog(message) {
+    if (!catalog) return; // İlk yükleme sürüyor, sunucudaki güncel katalog zaten alınacak
+    let result;
+    try {
+        if (self.OfflineCache && message.cacheKey) {
+            result = await self.OfflineCache.refresh(message.url, message.cacheKey, catalog.version);
+        } else {
+            const headers = catalog.version ? { 'If-None-Match': catalog.version } : {};
+            const response = await fetch(message.url, { credentials: 'same-origin', headers });
+            if (response.status === 304) {
+                result = { status: 'not-modified' };
+            } else if (!response.ok) {
+                throw new Error(`Katalog alınamadı: ${response.status} ${response.statusText}`);
+            } else {
+                result = { status: 'updated', data: await response.json(), etag: response.headers.get('ETag'), savedAt: Date.now() };
+            }
+        }
+    } catch (e) {
+        // Eldeki katalogla devam edilir; bir sonraki bildirimde yeniden denenir
+        console.warn('Katalog doğrulanamadı:', e);
+        self.postMessage({ type: 'synced', status: 'offline', savedAt: catalog.savedAt });
+        return;
+    }
+    if (result.status === 'updated') {
+        useCatalog(result.data, { fromCache: false, etag: result.etag, savedAt: result.savedAt });
+    }
+    self.postMessage({ type: 'synced', status: result.status, savedAt: catalog.savedAt });
+}
+
+self.onmessage = async function(event) {
+    const message = event.data || {};
+    try {
+        if (message.type === 'load') {
+            await loadCatalog(message);
+        } else if (message.type === 'revalidate') {
+            await revalidateCatalog(message);
+        } else if (message.type === 'query') {
+            if (!catalog) throw new Error('Katalog henüz yüklenmedi.');
+            const { items, total } = queryCatalog(message.q, message.groups, message.offset || 0, message.limit);
+            self.postMessage({ type: 'result', id: message.id, items, total });
+        } else if (message.type === 'find') {
+            const code = String(message.code || '').trim();
+            const product = catalog ? (catalog.byCode.get(code) || catalog.byBarcode.get(code) || null) : null;
+            self.postMessage({ type: 'found', id: message.id, product });
+        }
+    } catch (e) {
+        self.postMessage({ type: 'error', id: message.id, message: e.message || String(e) });
+    }
+};
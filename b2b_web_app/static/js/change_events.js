@@ -0,0 +1,111 @@
+/*
+ * Sunucudaki değişiklik bildirimlerini (GET /api/events, Server-Sent Events) dinler.
+ *
+ * Sayfalar ilgilendikleri konuya abone olur: ChangeEvents.subscribe('products', handler).
+ * handler(data, previousVersion) çağrılır; data sunucunun gönderdiği küçük bildirimdir
+ * ({topic, version, ...}), gövde içermez. Sayfa yalnızca değişen veriyi ister.
+ * previousVersion sayfanın bildiği son versiyondur; aradaki bildirimler kaçırıldıysa (örn.
+ * sekme gizliyken birden çok değişiklik olduysa) data.resync = true gelir ve sayfa verisini
+ * baştan doğrulamalıdır.
+ *
+ * Sekme gizliyken gelen bildirimler bekletilir ve sekme görünür olunca konu başına bir kez
+ * işlenir; arka plandaki sekmeler her değişiklikte veri indirmez.
+ * Bağlantı koparsa tarayıcı (EventSource) kendisi yeniden bağlanır ve son bildirim id'sini
+ * gönderir; aradaki değişiklikler sunucudan tekrar gelir.
+ */
+(function(scope) {
+    const EVENTS_URL = '/api/events';
+    const RETRY_AFTER_CLOSE_MS = 30000; // Yetki/kapasite hatasında EventSource kendisi yeniden denemez
+
+    const handlers = {};
+    const versions = {};
+    const pending = {};
+    let source = null;
+    let resyncOnConnect = false;
+    let serverVersions = {};
+
+    function runHandlers(topic, data, previousVersion) {
+        (handlers[topic] || []).forEach(handler => {
+            try {
+                handler(data, previousVersion);
+            } catch (e) {
+                console.error(`Değişiklik bildirimi işlenemedi (${topic}):`, e);
+            }
+        });
+    }
+
+    function deliver(topic, data) {
+        const previousVersion = versions[topic];
+        if (data.version !== undefined) versions[topic] = data.version;
+        if (!scope.document || !scope.document.hidden) {
+            runHandlers(topic, data, previousVersion);
+            return;
+        }
+        // Gizli sekmede konu başına yalnızca bir bildirim bekletilir; birden çoksa ara değişiklikler birleşir
+        pending[topic] = pending[topic]
+            ? { data: { ...data, resync: true }, previousVersion: pending[topic].previousVersion }
+            : { data, previousVersion };
+    }
+
+    function listen(topic) {
+        source.addEventListener(topic, event => deliver(topic, JSON.parse(event.data)));
+    }
+
+    function resyncAll() {
+        Object.keys(handlers).forEach(topic => deliver(topic, { topic, resync: true }));
+    }
+
+    function connect() {
+        if (source || !scope.EventSource) return;
+        const eventSource = new EventSource(EVENTS_URL, { withCredentials: true });
+        source = eventSource;
+        eventSource.addEventListener('hello', event => {
+            // İlk bağlantıda güncel versiyonlar öğrenilir; yeniden bağlanırken aradaki bildirimler ayrıca gelir
+            serverVersions = JSON.parse(event.data).versions || {};
+            Object.keys(serverVersions).forEach(topic => {
+                if (!(topic in versions)) versions[topic] = serverVersions[topic];
+            });
+            if (resyncOnConnect) {
+                // Bağlantı tamamen kapanmıştı; yeni bağlantı son id'yi bilmediği için her şey doğrulanır
+                resyncOnConnect = false;
+                resyncAll();
+            }
+        });
+        eventSource.addEventListener('resync', () => {
+            // Sunucu yeniden başladı: versiyonlar yeni süreçten alınır, aradaki değişiklikler bilinmediği
+            // için tüm konular yeniden doğrulanır
+            Object.keys(versions).forEach(topic => delete versions[topic]);
+            Object.assign(versions, serverVersions);
+            resyncAll();
+        });
+        Object.keys(handlers).forEach(listen);
+        eventSource.onerror = () => {
+            if (eventSource.readyState !== EventSource.CLOSED) return; // Tarayıcı yeniden bağlanıyor
+            source = null;
+            resyncOnConnect = true;
+            setTimeout(connect, RETRY_AFTER_CLOSE_MS);
+        };
+    }
+
+    function subscribe(topic, handler) {
+        if (!handlers[topic]) {
+            handlers[topic] = [];
+            if (source) listen(topic);
+        }
+        handlers[topic].push(handler);
+        connect();
+    }
+
+    if (scope.document) {
+        scope.document.addEventListener('visibilitychange', () => {
+            if (scope.document.hidden) return;
+            Object.keys(pending).forEach(topic => {
+                const { data, previousVersion } = pending[topic];
+                delete pending[topic];
+                runHandlers(topic, data, previousVersion);
+            });
+        });
+    }
+
+    scope.ChangeEvents = { subscribe, versions };
+})(window);
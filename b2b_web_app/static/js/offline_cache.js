@@ -0,0 +1,138 @@
+/*
+ * Sayfalar arası kalıcı JSON önbelleği (IndexedDB).
+ *
+ * Ürün kataloğu ve cari listesi gibi büyük, seyrek değişen API yanıtları ETag değerleriyle
+ * birlikte IndexedDB'de saklanır. `OfflineCache.loadJson` önce saklanan kopyayı hemen
+ * verir, ardından sunucuya `If-None-Match` ile sorar: veri değişmediyse sunucu gövdesiz
+ * 304 döner ve hiçbir şey yeniden indirilmez/ayrıştırılmaz; değiştiyse yeni kopya saklanır
+ * ve tekrar verilir. Bağlantı yoksa saklanan kopya ile devam edilir.
+ *
+ * Hem sayfalarda (<script>) hem de Web Worker'larda (importScripts) kullanılabilir.
+ * IndexedDB kullanılamıyorsa (örn. gizli pencere kısıtlamaları) yalnızca ağdan okunur.
+ */
+(function(scope) {
+    const DB_NAME = 'firat-b2b';
+    const DB_VERSION = 1;
+    const STORE_NAME = 'json_snapshots';
+
+    let dbPromise = null;
+
+    function openDatabase() {
+        if (!dbPromise) {
+            dbPromise = new Promise((resolve, reject) => {
+                if (!scope.indexedDB) {
+                    reject(new Error('IndexedDB desteklenmiyor'));
+                    return;
+                }
+                const request = scope.indexedDB.open(DB_NAME, DB_VERSION);
+                request.onupgradeneeded = () => {
+                    request.result.createObjectStore(STORE_NAME, { keyPath: 'key' });
+                };
+                request.onsuccess = () => resolve(request.result);
+                request.onerror = () => reject(request.error);
+                request.onblocked = () => reject(new Error('IndexedDB başka bir sekme tarafından kilitli'));
+            });
+            dbPromise.catch(() => { dbPromise = null; }); // Sonraki çağrı yeniden denesin
+        }
+        return dbPromise;
+    }
+
+    function runRequest(mode, makeRequest) {
+        return openDatabase().then(db => new Promise((resolve, reject) => {
+            const transaction = db.transaction(STORE_NAME, mode);
+            const request = makeRequest(transaction.objectStore(STORE_NAME));
+            transaction.oncomplete = () => resolve(request.result);
+            transaction.onerror = () => reject(transaction.error);
+            transaction.onabort = () => reject(transaction.error || new Error('IndexedDB işlemi iptal edildi'));
+        }));
+    }
+
+    // Kayıt: {key, etag, data, savedAt}; bulunamazsa veya IndexedDB kullanılamıyorsa null
+    async function get(key) {
+        try {
+            return (await runRequest('readonly', store => store.get(key))) || null;
+        } catch (e) {
+            console.warn(`Çevrimdışı önbellek okunamadı (${key}):`, e);
+            return null;
+        }
+    }
+
+    async function put(key, etag, data) {
+        try {
+            await runRequest('readwrite', store => store.put({ key, etag, data, savedAt: Date.now() }));
+            return true;
+        } catch (e) {
+            // Kota dolu olabilir; önbelleğe yazılamaması sayfanın çalışmasını engellemez
+            console.warn(`Çevrimdışı önbelleğe yazılamadı (${key}):`, e);
+            return false;
+        }
+    }
+
+    async function remove(key) {
+        try {
+            await runRequest('readwrite', store => store.delete(key));
+        } catch (e) {
+            console.warn(`Çevrimdışı önbellekten silinemedi (${key}):`, e);
+        }
+    }
+
+    /*
+     * Yalnızca ağ adımı: sunucuya elimizdeki `etag` ile sorar. Veri değişmediyse (304 veya aynı
+     * ETag) {status: 'not-modified'} döner; değiştiyse yeni kopya saklanır ve
+     * {status: 'updated', data, etag, savedAt} döner. Ağ veya HTTP hatasında reddedilir.
+     * ETag'i olmayan istekler (örn. kategoriler) tarayıcı/service worker önbelleğini atlar.
+     */
+    async function refresh(url, key, etag) {
+        const options = etag
+            ? { credentials: 'same-origin', headers: { 'If-None-Match': etag } }
+            : { credentials: 'same-origin', cache: 'no-cache' };
+        const response = await fetch(url, options);
+        if (response.status === 304) {
+            return { status: 'not-modified' };
+        }
+        if (!response.ok) {
+            const error = new Error(`${url} alınamadı: ${response.status} ${response.statusText}`);
+            error.status = response.status;
+            throw error;
+        }
+        const data = await response.json();
+        const newEtag = response.headers.get('ETag');
+        if (etag && newEtag && newEtag === etag) {
+            return { status: 'not-modified' };
+        }
+        await put(key, newEtag, data);
+        return { status: 'updated', data, etag: newEtag, savedAt: Date.now() };
+    }
+
+    /*
+     * `url` adresindeki JSON'u önbellek öncelikli yükler. `onData(data, info)` önce saklanan
+     * kopya ile (varsa, info.fromCache = true), sonra sunucudaki veri farklıysa yeni kopya ile
+     * çağrılır. info: {fromCache, etag, savedAt}. Saklanan kopya yoksa ağ isteğinden önce
+     * (varsa) `onCacheMiss()` çağrılır; böylece çağıran taraf ağı beklemeden başka yola geçebilir.
+     * Dönen Promise ağ adımı bitince {status: 'not-modified' | 'updated' | 'offline'} ile çözülür;
+     * ne önbellekte ne de ağda veri yoksa hata ile reddedilir.
+     */
+    async function loadJson(url, key, onData, onCacheMiss) {
+        const cached = await get(key);
+        if (cached) {
+            await onData(cached.data, { fromCache: true, etag: cached.etag, savedAt: cached.savedAt });
+        } else if (onCacheMiss) {
+            onCacheMiss();
+        }
+
+        let result;
+        try {
+            result = await refresh(url, key, cached ? cached.etag : null);
+        } catch (e) {
+            if (cached) return { status: 'offline', savedAt: cached.savedAt, httpStatus: e.status };
+            throw e;
+        }
+        if (result.status === 'not-modified') {
+            return { status: 'not-modified', savedAt: cached.savedAt };
+        }
+        await onData(result.data, { fromCache: false, etag: result.etag, savedAt: result.savedAt });
+        return { status: 'updated', savedAt: result.savedAt };
+    }
+
+    scope.OfflineCache = { get, put, remove, refresh, loadJson };
+})(self);
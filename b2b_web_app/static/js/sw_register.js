@@ -0,0 +1,41 @@
+/*
+ * Service worker kaydı ve çevrimdışı sipariş kuyruğu bildirimleri.
+ *
+ * Sayfa yüklenince /sw.js kaydedilir. Service worker'ın kuyruğa aldığı siparişler, Background Sync
+ * desteklenmeyen tarayıcılarda da gönderilsin diye sayfa açılışında ve bağlantı geri gelince
+ * kuyruğun gönderilmesi istenir. Gönderim sonucu service worker'dan mesaj olarak gelir.
+ */
+(function() {
+    if (!('serviceWorker' in navigator)) return;
+
+    function requestOrderQueueFlush() {
+        navigator.serviceWorker.ready
+            .then(registration => {
+                if (registration.active) registration.active.postMessage({ type: 'flush-order-queue' });
+            })
+            .catch(() => {});
+    }
+
+    navigator.serviceWorker.addEventListener('message', event => {
+        const message = event.data || {};
+        if (message.type !== 'order-queue') return;
+        if (message.sent) {
+            console.log(`Çevrimdışı kuyruktaki ${message.sent} sipariş gönderildi.`);
+        }
+        if (message.failed && message.failed.length) {
+            const reasons = message.failed.map(item => `- ${item.detail}`).join('\n');
+            alert(`Çevrimdışıyken kuyruğa alınan ${message.failed.length} sipariş sunucu tarafından reddedildi:\n${reasons}`);
+        }
+        // Sipariş listesi açıksa yeni gönderilen siparişler görünsün
+        if (message.sent && typeof window.onQueuedOrdersSent === 'function') {
+            window.onQueuedOrdersSent(message);
+        }
+    });
+
+    window.addEventListener('load', () => {
+        navigator.serviceWorker.register('/sw.js')
+            .then(() => requestOrderQueueFlush())
+            .catch(error => console.warn('Service worker kaydedilemedi:', error));
+    });
+    window.addEventListener('online', requestOrderQueueFlush);
+})();
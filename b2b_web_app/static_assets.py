@@ -0,0 +1,183 @@
+"""
+Uzun süreli tarayıcı önbelleği ile statik dosya sunumu.
+
+`StaticAssets`, Starlette `StaticFiles` sınıfını şu şekilde genişletir:
+- `url(path)` dosyanın içerik hash'ini `?v=` parametresi olarak ekleyen bir adres üretir
+  (şablonlarda `static_url(...)`). İçerik değişince adres de değişir.
+- `?v=` ile istenen dosyalar `Cache-Control: public, max-age=<1 yıl>, immutable` ile sunulur;
+  tarayıcı bu adresleri bir daha sunucuya sormaz. Parametresiz istekler her seferinde
+  ETag/Last-Modified ile doğrulanır (değişmemişse 304).
+- Metin tabanlı dosyaların yanında `.br`/`.gz` sıkıştırılmış kopyası varsa ve tarayıcı
+  destekliyorsa sıkıştırılmış kopya gönderilir. Kopyalar `precompress_directory` ile üretilir.
+"""
+import gzip
+import hashlib
+import os
+import shutil
+import stat
+import tempfile
+import threading
+from mimetypes import guess_type
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import quote
+
+import anyio
+import anyio.to_thread
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # brotli isteğe bağlıdır, kurulu değilse yalnızca .gz kopyalar üretilir
+    brotli = None
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+# Görseller ve PDF'ler zaten sıkıştırılmıştır; yalnızca metin tabanlı dosyalar için kopya üretilir
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".mjs", ".json", ".svg", ".html", ".txt", ".xml", ".map", ".webmanifest")
+PRECOMPRESSED_VARIANTS = (("br", ".br"), ("gzip", ".gz"))
+MIN_COMPRESS_BYTES = 1024
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def asset_fingerprint(*parts) -> str:
+    """Verilen değerlerden kısa bir sürüm değeri üretir (örn. dosya adı, mtime ve boyut)."""
+    return hashlib.sha1(":".join(str(part) for part in parts).encode("utf-8")).hexdigest()[:12]
+
+
+class StaticAssets(StaticFiles):
+    def __init__(self, *args, mount_path: str = "/static", **kwargs):
+        super().__init__(*args, **kwargs)
+        self.mount_path = mount_path.rstrip("/")
+        self._hashes: Dict[str, Tuple[int, int, str]] = {}  # Yol -> (mtime_ns, boyut, içerik hash'i)
+        self._hashes_lock = threading.Lock()
+
+    def content_hash(self, path: str) -> Optional[str]:
+        """Dosyanın içerik hash'i; dosya değişmediği sürece yeniden okunmaz. Dosya yoksa None."""
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None:
+            return None
+        with self._hashes_lock:
+            cached = self._hashes.get(full_path)
+        if cached and cached[0] == stat_result.st_mtime_ns and cached[1] == stat_result.st_size:
+            return cached[2]
+
+        digest = hashlib.sha256()
+        with open(full_path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+        content_hash = digest.hexdigest()[:12]
+        with self._hashes_lock:
+            self._hashes[full_path] = (stat_result.st_mtime_ns, stat_result.st_size, content_hash)
+        return content_hash
+
+    def warm_hashes(self, paths: Iterable[str]) -> int:
+        """
+        Verilen dosyaların içerik hash'lerini önceden hesaplar (açılışta, thread havuzunda çağrılır);
+        böylece şablonlardaki `static_url(...)` ilk çizimde dosya okumaz. Hash'lenen dosya sayısını döndürür.
+        """
+        return sum(1 for path in set(paths) if self.content_hash(path.lstrip("/")))
+
+    def url(self, path: str) -> str:
+        """
+        `path` için içerik hash'li adres döndürür (örn. `/static/images/Logo.png?v=3f2a...`).
+        Dosya bulunamazsa hash'siz adres döner. Dosyayı ilk kez (veya değiştikten sonra) okur;
+        async kodda çok sayıda dosya için thread havuzunda çağrılmalıdır.
+        """
+        path = path.lstrip("/")
+        base_url = f"{self.mount_path}/{quote(path)}"
+        content_hash = self.content_hash(path)
+        return f"{base_url}?v={content_hash}" if content_hash else base_url
+
+    async def get_response(self, path: str, scope: Scope) -> Response:
+        response = None
+        if scope["method"] in ("GET", "HEAD") and path.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+            if any(encoding in accept_encoding for encoding, _ in PRECOMPRESSED_VARIANTS):
+                variant = await anyio.to_thread.run_sync(self.lookup_variant, path, accept_encoding)
+                if variant is not None:
+                    response = self.variant_response(path, scope, *variant)
+        if response is None:
+            response = await super().get_response(path, scope)
+
+        if response.status_code in (200, 304) and "cache-control" not in response.headers:
+            if "v" in QueryParams(scope["query_string"]):
+                response.headers["Cache-Control"] = f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+            else:
+                response.headers["Cache-Control"] = "public, no-cache"  # Saklanır ama her kullanımda doğrulanır
+        return response
+
+    def lookup_variant(self, path: str, accept_encoding: str) -> Optional[Tuple[str, str, os.stat_result]]:
+        """Tarayıcının desteklediği, kaynak dosyadan eski olmayan sıkıştırılmış kopyayı bulur."""
+        full_path, stat_result = self.lookup_path(path)
+        if stat_result is None or not stat.S_ISREG(stat_result.st_mode):
+            return None
+        for encoding, suffix in PRECOMPRESSED_VARIANTS:
+            if encoding not in accept_encoding:
+                continue
+            try:
+                variant_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            if variant_stat.st_mtime_ns >= stat_result.st_mtime_ns:
+                return encoding, full_path + suffix, variant_stat
+        return None
+
+    def variant_response(self, path: str, scope: Scope, encoding: str, variant_path: str,
+                         variant_stat: os.stat_result) -> Response:
+        headers = {"Content-Encoding": encoding, "Vary": "Accept-Encoding"}
+        response = FileResponse(variant_path, headers=headers, media_type=guess_type(path)[0] or "text/plain",
+                                stat_result=variant_stat)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        if str(full_path).lower().endswith(COMPRESSIBLE_EXTENSIONS):
+            # Aynı adresin sıkıştırılmış kopyası da sunulabildiği için ara önbellekler ayırt etmelidir
+            response.headers["Vary"] = "Accept-Encoding"
+        return response
+
+
+def precompress_directory(directory: str) -> int:
+    """
+    Dizindeki metin tabanlı dosyaların `.gz` (ve brotli kuruluysa `.br`) kopyalarını üretir.
+    Kopyası güncel olan dosyalar atlanır. Üretilen kopya sayısını döndürür.
+    """
+    created = 0
+    for root, _, files in os.walk(directory):
+        for name in files:
+            if not name.lower().endswith(COMPRESSIBLE_EXTENSIONS):
+                continue
+            source_path = os.path.join(root, name)
+            source_stat = os.stat(source_path)
+            if source_stat.st_size < MIN_COMPRESS_BYTES:
+                continue
+            for encoding, suffix in PRECOMPRESSED_VARIANTS:
+                if encoding == "br" and brotli is None:
+                    continue
+                variant_path = source_path + suffix
+                if os.path.exists(variant_path) and os.stat(variant_path).st_mtime_ns >= source_stat.st_mtime_ns:
+                    continue
+                # Birden çok worker aynı anda açılabilir; her biri kendi geçici dosyasına yazar
+                fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(variant_path)}.", suffix=".tmp", dir=root)
+                try:
+                    with os.fdopen(fd, "wb") as target, open(source_path, "rb") as source:
+                        if encoding == "br":
+                            target.write(brotli.compress(source.read(), quality=11))
+                        else:
+                            with gzip.GzipFile(filename="", mode="wb", compresslevel=9, fileobj=target, mtime=0) as gzip_target:
+                                shutil.copyfileobj(source, gzip_target, HASH_CHUNK_SIZE)
+                    # mkstemp dosyayı yalnızca sahibinin okuyabileceği izinlerle açar; kaynak dosyanın izinleri verilir
+                    os.chmod(temp_path, stat.S_IMODE(source_stat.st_mode))
+                    os.replace(temp_path, variant_path)
+                except BaseException:
+                    try:
+                        os.remove(temp_path)
+                    except OSError:
+                        pass
+                    raise
+                created += 1
+    return created
@@ -0,0 +1,361 @@
+/*
+ * B2B Portalı service worker'ı (main.py'deki /sw.js endpoint'i bu şablonu doldurur).
+ *
+ * - Uygulama kabuğu (sayfalar, kendi statik dosyalarımız, CDN kütüphaneleri) kurulumda önbelleğe alınır.
+ * - Sayfalar stale-while-revalidate ile açılır: kayıtlı kopya hemen gösterilir, arka planda yenilenir.
+ * - Ürün küçük görselleri (/images/product/...&w=) önbellekten sunulur; en uzun süredir kullanılmayanlar
+ *   giriş sayısı sınırı aşılınca silinir (LRU).
+ * - Tam katalog, kategori ve cari listesi JSON'ları stale-while-revalidate ile sunulur; tek ürün sorguları
+ *   (/api/products/{stok_kodu}, fiyat güncel olmalı) ve arama/sayfa sorguları önce ağdan, bağlantı yoksa kayıtlı kopyadan.
+ *   ETag ile sorulan istekler (If-None-Match, offline_cache.js) olduğu gibi sunucuya gider;
+ *   onların önbelleği IndexedDB'dedir.
+ * - Bağlantı yokken gönderilen siparişler IndexedDB'de kuyruğa alınır ve bağlantı gelince
+ *   (Background Sync veya sayfadan gelen mesajla) aynı Idempotency-Key ile yeniden gönderilir.
+ */
+const CACHE_VERSION = '{{ cache_version }}';
+const SHELL_CACHE = `firat-b2b-shell-${CACHE_VERSION}`;
+const STATIC_CACHE = 'firat-b2b-static';
+const VENDOR_CACHE = 'firat-b2b-vendor';
+const THUMBNAIL_CACHE = 'firat-b2b-thumbnails';
+const API_CACHE = 'firat-b2b-api';
+const KNOWN_CACHES = [SHELL_CACHE, STATIC_CACHE, VENDOR_CACHE, THUMBNAIL_CACHE, API_CACHE];
+
+const SHELL_PAGES = {{ pages|tojson }};
+const SHELL_STATIC_URLS = {{ static_urls|tojson }};
+const VENDOR_URLS = {{ vendor_urls|tojson }};
+const VENDOR_HOSTS = new Set(VENDOR_URLS.map(url => new URL(url).host));
+const VERSIONED_PATH = /[@/]\d+\.\d+/;
+const THUMBNAIL_CACHE_ENTRIES = {{ thumbnail_cache_entries }};
+const STATIC_CACHE_ENTRIES = 200;
+const API_CACHE_ENTRIES = 100;
+// Yalnızca bu liste endpoint'leri (parametresiz) stale-while-revalidate ile sunulur
+const SWR_API_PATHS = new Set(['/api/products', '/api/products/categories', '/api/customers']);
+const TRIM_EVERY_PUTS = 20; // Önbellek sınırı her yazmada değil, belirli aralıklarla kontrol edilir
+
+const QUEUE_DB_NAME = 'firat-b2b-sw';
+const QUEUE_STORE = 'order_queue';
+const ORDER_SYNC_TAG = 'order-queue';
+const OFFLINE_DATA_DB_NAME = 'firat-b2b'; // offline_cache.js'in veritabanı; çıkışta silinir
+
+// --- Kurulum ve etkinleştirme ---
+
+self.addEventListener('install', event => {
+    event.waitUntil((async () => {
+        const cache = await caches.open(SHELL_CACHE);
+        await cache.addAll(SHELL_STATIC_URLS);
+        // CDN ve sayfa önbelleklemesi en iyi çabadır; biri alınamazsa kurulum başarısız olmaz
+        await Promise.allSettled([
+            ...VENDOR_URLS.map(url => cacheVendorAsset(url)),
+            ...SHELL_PAGES.map(url => cachePage(cache, url)),
+        ]);
+        await self.skipWaiting();
+    })());
+});
+
+self.addEventListener('activate', event => {
+    event.waitUntil((async () => {
+        const names = await caches.keys();
+        await Promise.all(names
+            .filter(name => name.startsWith('firat-b2b-') && !KNOWN_CACHES.includes(name))
+            .map(name => caches.delete(name)));
+        await self.clients.claim();
+    })());
+});
+
+async function cacheVendorAsset(url) {
+    const cache = await caches.open(VENDOR_CACHE);
+    if (await cache.match(url, { ignoreVary: true })) return; // Sürüm numaralı adresler değişmez
+    let response;
+    try {
+        response = await fetch(url, { mode: 'cors', credentials: 'omit' });
+    } catch (e) {
+        // CORS başlığı göndermeyen CDN'ler için opak yanıt saklanır
+        response = await fetch(url, { mode: 'no-cors', credentials: 'omit' });
+    }
+    if (response.ok || response.type === 'opaque') await cache.put(url, response);
+}
+
+function isCacheablePage(response) {
+    // Oturum yoksa sayfalar /login'e yönlendirir; yönlendirilmiş yanıt sayfa olarak saklanmaz
+    return response.ok && !response.redirected && response.type === 'basic';
+}
+
+async function cachePage(cache, url) {
+    const response = await fetch(url, { credentials: 'same-origin' });
+    if (isCacheablePage(response)) await cache.put(url, response);
+}
+
+// --- İstek yönlendirme ---
+
+self.addEventListener('fetch', event => {
+    const request = event.request;
+    const url = new URL(request.url);
+
+    if (url.origin === self.location.origin) {
+        if (request.method === 'POST' && url.pathname === '/api/orders') {
+            event.respondWith(submitOrder(request));
+            return;
+        }
+        if (request.method !== 'GET') return;
+        if (request.mode === 'navigate') {
+            if (url.pathname === '/logout') {
+                event.waitUntil(clearUserData());
+                return;
+            }
+            if (SHELL_PAGES.includes(url.pathname) && !url.search) {
+                event.respondWith(staleWhileRevalidatePage(event, url.pathname));
+            }
+            return;
+        }
+        if (url.pathname.startsWith('/images/product/') && url.searchParams.has('w') && url.searchParams.has('v')) {
+            event.respondWith(cacheFirst(event, request, THUMBNAIL_CACHE, THUMBNAIL_CACHE_ENTRIES));
+            return;
+        }
+        if (url.pathname.startsWith('/static/') && url.searchParams.has('v')) {
+            event.respondWith(cacheFirst(event, request, STATIC_CACHE, STATIC_CACHE_ENTRIES, SHELL_CACHE));
+            return;
+        }
+        if ((url.pathname.startsWith('/api/products') || url.pathname === '/api/customers')
+                && !request.headers.has('If-None-Match')) {
+            // Parametresiz katalog/kategori/cari listesi önce kayıtlı kopyadan; tek ürün sorguları (hızlı ekleme
+            // fiyatı), arama/sayfa sorguları ve güncel verinin istendiği (cache: 'no-cache', örn. değişiklik
+            // bildiriminden sonra) istekler önce ağdan
+            const useCachedList = SWR_API_PATHS.has(url.pathname) && !url.search && request.cache !== 'no-cache';
+            event.respondWith(useCachedList ? staleWhileRevalidateJson(event, request) : networkFirstJson(request));
+        }
+        return;
+    }
+
+    // Kurulumda listelenen ve sürüm numaralı CDN adresleri önbellekten sunulur; bootstrap-icons
+    // yazı tipleri gibi listede olmayan dosyalar ilk kullanımda önbelleğe alınır
+    if (request.method === 'GET' && VENDOR_HOSTS.has(url.host)
+            && (VENDOR_URLS.includes(request.url) || VERSIONED_PATH.test(url.pathname))) {
+        event.respondWith(cacheFirst(event, request, VENDOR_CACHE, 0));
+    }
+});
+
+async function staleWhileRevalidatePage(event, path) {
+    const cache = await caches.open(SHELL_CACHE);
+    const cached = await cache.match(path);
+    const refresh = fetch(event.request).then(async response => {
+        if (isCacheablePage(response)) {
+            await cache.put(path, response.clone());
+        } else if (response.redirected) {
+            await cache.delete(path); // Oturum kapanmış; sonraki açılışta giriş sayfası gösterilir
+        }
+        return response;
+    });
+    if (cached) {
+        event.waitUntil(refresh.catch(() => null));
+        return cached;
+    }
+    try {
+        return await refresh;
+    } catch (e) {
+        return offlinePageResponse();
+    }
+}
+
+function offlinePageResponse() {
+    const body = '<!DOCTYPE html><html lang="tr"><head><meta charset="UTF-8">'
+        + '<meta name="viewport" content="width=device-width, initial-scale=1.0"><title>Çevrimdışı</title></head>'
+        + '<body style="font-family: sans-serif; text-align: center; padding-top: 3rem;">'
+        + '<h3>Bağlantı yok</h3><p>Bu sayfa henüz cihazda kayıtlı değil. Bağlantı gelince yeniden deneyin.</p>'
+        + '<button onclick="location.reload()">Yeniden Dene</button></body></html>';
+    return new Response(body, { status: 503, headers: { 'Content-Type': 'text/html; charset=utf-8' } });
+}
+
+async function staleWhileRevalidateJson(event, request) {
+    const cache = await caches.open(API_CACHE);
+    const cached = await cache.match(request);
+    const refresh = fetch(request).then(async response => {
+        if (response.ok) await putAndTrim(API_CACHE, cache, request, response.clone(), API_CACHE_ENTRIES);
+        return response;
+    });
+    if (cached) {
+        event.waitUntil(refresh.catch(() => null));
+        return cached;
+    }
+    return refresh;
+}
+
+async function networkFirstJson(request) {
+    const cache = await caches.open(API_CACHE);
+    try {
+        const response = await fetch(request);
+        if (response.ok) await putAndTrim(API_CACHE, cache, request, response.clone(), API_CACHE_ENTRIES);
+        return response;
+    } catch (e) {
+        const cached = await cache.match(request);
+        if (cached) return cached;
+        throw e;
+    }
+}
+
+// Sürüm parametreli (içeriği değişmeyen) adresler: önbellekte varsa ağa hiç gidilmez
+async function cacheFirst(event, request, cacheName, maxEntries, fallbackCacheName) {
+    const cache = await caches.open(cacheName);
+    let cached = await cache.match(request, { ignoreVary: true });
+    if (!cached && fallbackCacheName) {
+        cached = await (await caches.open(fallbackCacheName)).match(request, { ignoreVary: true });
+    }
+    if (cached) {
+        if (maxEntries) event.waitUntil(touchEntry(cache, request, cached));
+        return cached;
+    }
+    const response = await fetch(request);
+    if (response.ok || response.type === 'opaque') {
+        event.waitUntil(putAndTrim(cacheName, cache, request, response.clone(), maxEntries));
+    }
+    return response;
+}
+
+// Cache API girişleri ekleme sırasıyla listelenir. Kullanılan giriş yeniden yazılarak sona taşınır
+// (LRU); her giriş service worker çalıştığı sürece en fazla bir kez taşınır.
+const touchedEntries = new Set();
+async function touchEntry(cache, request, cached) {
+    if (touchedEntries.has(request.url)) return;
+    touchedEntries.add(request.url);
+    await cache.put(request, cached.clone());
+}
+
+const putCounts = {};
+async function putAndTrim(cacheName, cache, request, response, maxEntries) {
+    await cache.put(request, response);
+    if (!maxEntries) return;
+    putCounts[cacheName] = (putCounts[cacheName] || 0) + 1;
+    if (putCounts[cacheName] % TRIM_EVERY_PUTS !== 1) return;
+    const keys = await cache.keys();
+    // En eski (en uzun süredir kullanılmayan) girişler baştadır
+    for (const key of keys.slice(0, Math.max(0, keys.length - maxEntries))) {
+        touchedEntries.delete(key.url);
+        await cache.delete(key);
+    }
+}
+
+// --- Çıkış ---
+
+async function clearUserData() {
+    // Oturuma bağlı sayfalar ve veriler silinir; statik dosyalar, küçük görseller ve sipariş kuyruğu korunur
+    await caches.delete(API_CACHE);
+    const shell = await caches.open(SHELL_CACHE);
+    await Promise.all(SHELL_PAGES.map(path => shell.delete(path)));
+    await new Promise(resolve => {
+        const request = indexedDB.deleteDatabase(OFFLINE_DATA_DB_NAME);
+        request.onsuccess = request.onerror = request.onblocked = () => resolve();
+    });
+}
+
+// --- Çevrimdışı sipariş kuyruğu ---
+
+function openQueueDatabase() {
+    return new Promise((resolve, reject) => {
+        const request = indexedDB.open(QUEUE_DB_NAME, 1);
+        request.onupgradeneeded = () => request.result.createObjectStore(QUEUE_STORE, { keyPath: 'key' });
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+    });
+}
+
+async function queueRequest(mode, makeRequest) {
+    const db = await openQueueDatabase();
+    try {
+        return await new Promise((resolve, reject) => {
+            const transaction = db.transaction(QUEUE_STORE, mode);
+            const request = makeRequest(transaction.objectStore(QUEUE_STORE));
+            transaction.oncomplete = () => resolve(request.result);
+            transaction.onerror = () => reject(transaction.error);
+        });
+    } finally {
+        db.close();
+    }
+}
+
+function newIdempotencyKey() {
+    return self.crypto && self.crypto.randomUUID
+        ? self.crypto.randomUUID()
+        : `${Date.now()}-${Math.random().toString(16).slice(2)}`;
+}
+
+function jsonResponse(data, status) {
+    return new Response(JSON.stringify(data), { status, headers: { 'Content-Type': 'application/json' } });
+}
+
+async function submitOrder(request) {
+    const body = await request.clone().text();
+    const key = request.headers.get('Idempotency-Key') || newIdempotencyKey();
+    const headers = new Headers(request.headers);
+    headers.set('Idempotency-Key', key);
+    try {
+        return await fetch('/api/orders', { method: 'POST', headers, body, credentials: 'same-origin' });
+    } catch (e) {
+        // Ağ hatası: sipariş cihazda saklanır, bağlantı gelince aynı anahtarla gönderilir
+        await queueRequest('readwrite', store => store.put({ key, body, queuedAt: Date.now() }));
+        if (self.registration.sync) {
+            try {
+                await self.registration.sync.register(ORDER_SYNC_TAG);
+            } catch (syncError) {
+                // Background Sync desteklenmiyorsa sayfalar açıldığında/bağlantı gelince kuyruk gönderilir
+            }
+        }
+        return jsonResponse({ queued: true, idempotency_key: key, detail: 'Sipariş çevrimdışı kuyruğa alındı.' }, 202);
+    }
+}
+
+let flushingQueue = null;
+function flushOrderQueue() {
+    if (!flushingQueue) {
+        flushingQueue = sendQueuedOrders().finally(() => { flushingQueue = null; });
+    }
+    return flushingQueue;
+}
+
+async function sendQueuedOrders() {
+    const queued = await queueRequest('readonly', store => store.getAll());
+    queued.sort((a, b) => a.queuedAt - b.queuedAt);
+    const result = { sent: 0, failed: [], pending: queued.length };
+    for (const entry of queued) {
+        let response;
+        try {
+            response = await fetch('/api/orders', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', 'Idempotency-Key': entry.key },
+                body: entry.body,
+                credentials: 'same-origin'
+            });
+        } catch (e) {
+            break; // Hâlâ çevrimdışı
+        }
+        if (response.status === 401 || response.status === 403 || response.status === 409 || response.status >= 500) {
+            break; // Giriş yapılınca / sunucu düzelince yeniden denenir
+        }
+        await queueRequest('readwrite', store => store.delete(entry.key));
+        result.pending--;
+        if (response.ok) {
+            result.sent++;
+        } else {
+            // Sunucu siparişi reddetti (örn. geçersiz kalem); tekrar denemek sonucu değiştirmez
+            const error = await response.json().catch(() => ({}));
+            result.failed.push({ body: JSON.parse(entry.body), detail: error.detail || `HTTP ${response.status}` });
+        }
+    }
+    if (result.sent || result.failed.length) {
+        const clients = await self.clients.matchAll({ type: 'window' });
+        clients.forEach(client => client.postMessage({ type: 'order-queue', ...result }));
+    }
+    return result;
+}
+
+self.addEventListener('sync', event => {
+    if (event.tag === ORDER_SYNC_TAG) event.waitUntil(flushOrderQueue());
+});
+
+self.addEventListener('message', event => {
+    const message = event.data || {};
+    if (message.type === 'flush-order-queue') {
+        event.waitUntil(flushOrderQueue());
+    } else if (message.type === 'order-queue-status' && event.source) {
+        event.waitUntil(queueRequest('readonly', store => store.count())
+            .then(pending => event.source.postMessage({ type: 'order-queue', sent: 0, failed: [], pending })));
+    }
+});
@@ -0,0 +1,89 @@
+"""
+Çok worker'lı ortamda doğru çalışan, yazmaları geciktirip toplayan görüntülenme sayacı.
+
+Her worker artışları bellekte biriktirir ve `flush_interval` saniyede bir veritabanına
+"count = count + delta" şeklinde atomik olarak ekler; böylece istek başına disk veya
+veritabanı işlemi yapılmaz ve worker'lar birbirinin artışlarını ezmez. Gösterilen değer,
+veritabanından en son okunan toplam ile henüz yazılmamış yerel artışların toplamıdır.
+
+Sayaçlar anahtarla ayrılır (örn. galeri için tek bir anahtar, görsel başına "image:<ad>");
+yeni bir anahtar için ek bir yapılandırma gerekmez.
+"""
+import threading
+from typing import Callable, Dict, Iterable, Optional
+
+from sqlalchemy.orm import Session
+
+from . import crud
+
+
+class ViewCounter:
+    def __init__(self, session_factory: Callable[[], Session], flush_interval: float = 2.0):
+        self._session_factory = session_factory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._totals: Dict[str, int] = {}  # Veritabanından en son okunan değerler
+        self._pending: Dict[str, int] = {}  # Henüz yazılmamış artışlar
+        self._in_flight: Dict[str, int] = {}  # Şu anda yazılmakta olan artışlar
+        self._timer: Optional[threading.Timer] = None
+
+    def load(self, keys: Iterable[str]):
+        """Sayaçların güncel değerlerini veritabanından okur (uygulama başlarken çağrılır)."""
+        db = self._session_factory()
+        try:
+            totals = crud.get_view_counts(db, keys)
+        finally:
+            db.close()
+        with self._lock:
+            self._totals.update(totals)
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            return self._totals.get(key, 0) + self._in_flight.get(key, 0) + self._pending.get(key, 0)
+
+    def increment(self, key: str, amount: int = 1) -> int:
+        """Sayacı bellekte artırır ve güncel değeri döndürür; veritabanına yazma gecikmeli yapılır."""
+        with self._lock:
+            self._pending[key] = self._pending.get(key, 0) + amount
+            self._schedule_flush()
+            return self._totals.get(key, 0) + self._in_flight.get(key, 0) + self._pending[key]
+
+    def _schedule_flush(self):
+        # self._lock altında çağrılır
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def flush(self):
+        """Biriken artışları veritabanına yazar ve yazılan sayaçların güncel değerlerini okur."""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._pending:
+                    return
+                self._in_flight, self._pending = self._pending, {}
+                deltas = self._in_flight
+
+            db = self._session_factory()
+            try:
+                crud.add_view_counts(db, deltas)
+                # Diğer worker'ların artışları da bu okumayla yerel değere yansır
+                totals = crud.get_view_counts(db, deltas)
+            except Exception as e:
+                print(f"HATA: Görüntülenme sayaçları kaydedilemedi, bir sonraki denemede tekrar yazılacak: {e}")
+                with self._lock:
+                    for key, delta in deltas.items():
+                        self._pending[key] = self._pending.get(key, 0) + delta
+                    self._in_flight = {}
+                    self._schedule_flush()
+                return
+            finally:
+                db.close()
+
+            with self._lock:
+                self._totals.update(totals)
+                self._in_flight = {}
@@ -31,7 +31,8 @@ try:
         fetch_customer_summary, # Carileri çekmek için bu fonksiyonu kullanacağız
         SETTINGS_FILE, # settings.json dosya yolu
         LOG_DIR as APP_LOG_DIR,
-        decimal_serializer # Yeni eklenen serializer fonksiyonu
+        decimal_serializer, # Yeni eklenen serializer fonksiyonu
+        post_compressed_json # Gövdeyi gzip ile sıkıştırıp gönderir
     )
 except ImportError as e:
     # Eğer bu script .pyw olarak doğrudan çalıştırılıyorsa ve konsol yoksa,
@@ -213,8 +214,8 @@ def perform_customer_data_sync_task():
 
         per_run_logger.info(f"{len(customer_data)} adet filtrelenmiş cari verisi {RENDER_API_URL} adresine gönderiliyor...")
         try:
-            customer_data_json_string = json.dumps(customer_data, ensure_ascii=False, default=decimal_serializer)
-            response = requests.post(RENDER_API_URL, headers=headers, data=customer_data_json_string, timeout=30)
+            # Tekrarlı cari JSON'u gzip ile sıkıştırılarak gönderilir (sunucu Content-Encoding: gzip kabul eder)
+            response = post_compressed_json(RENDER_API_URL, customer_data, headers, timeout=30)
             response.raise_for_status()
             
             per_run_logger.info(f"Veriler başarıyla API'ye gönderildi. Sunucu yanıtı ({response.status_code}): {response.json()}")
@@ -2,6 +2,7 @@ import json
 import getpass
 from passlib.context import CryptContext
 import os # os modülünü import et
+from b2b_web_app.json_state import atomic_write_json # Çalışan sunucu yarım yazılmış dosya okumasın diye
 
 # Şifre hash'leme için context (bcrypt algoritmasını kullanacağız)
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -40,8 +41,7 @@ def create_admin_user():
     }
 
     try:
-        with open(CONFIG_FILE, "w", encoding="utf-8") as f:
-            json.dump(admin_data, f, ensure_ascii=False, indent=4)
+        atomic_write_json(CONFIG_FILE, admin_data, ensure_ascii=False, indent=4)
         print(f"Admin kullanıcısı başarıyla '{CONFIG_FILE}' dosyasına kaydedildi.")
         print("LÜTFEN BU DOSYAYI GÜVENLİ BİR YERDE SAKLAYIN VE .gitignore DOSYANIZA EKLEYİN!")
     except IOError:
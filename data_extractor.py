@@ -8,6 +8,7 @@ import json
 import keyring
 import os
 import requests
+import gzip
 from helpers import to_decimal, format_currency_tr
 from decimal import Decimal
 import logging
@@ -18,6 +19,20 @@ def decimal_serializer(obj):
         return str(obj)
     raise TypeError(f"Object of type {obj.__class__.__name__} is not JSON serializable")
 
+def compress_json_payload(payload) -> bytes:
+    """Veriyi JSON'a çevirip gzip ile sıkıştırır. Tekrarlı katalog/cari verisinde boyut genellikle 10 kattan fazla küçülür."""
+    json_bytes = json.dumps(payload, ensure_ascii=False, default=decimal_serializer).encode("utf-8")
+    return gzip.compress(json_bytes, compresslevel=6)
+
+def post_compressed_json(url: str, payload, headers: dict, timeout: int = 30) -> requests.Response:
+    """JSON gövdesini `Content-Encoding: gzip` ile POST eder."""
+    body = compress_json_payload(payload)
+    request_headers = dict(headers)
+    request_headers["Content-Type"] = "application/json"
+    request_headers["Content-Encoding"] = "gzip"
+    logging.info(f"'{url}' adresine {len(body)} bayt sıkıştırılmış gövde gönderiliyor.")
+    return requests.post(url, data=body, headers=request_headers, timeout=timeout)
+
 # Loglama yapılandırması
 LOG_DIR = "b2b_web_app/logs"  # Log klasörünün yolu
 LOG_FILE_NAME = "b2b_desktop_app.log" # Log dosyasının adı
@@ -145,6 +160,10 @@ def get_db_connection(caller_info: str = "Unknown"):
 
 DEFAULT_API_URL = "https://firatb2b.onrender.com/api/products"
 
+# Sunucunun son onayladığı katalog (versiyon + STOK_KODU bazında kayıtlar) burada saklanır.
+# Delta gönderiminde yalnızca bu dosyadaki kayıtlara göre değişenler gönderilir.
+PRODUCT_SYNC_STATE_FILE = os.path.join(os.path.dirname(__file__), 'product_sync_state.json')
+
 def fetch_product_data(connection, excluded_groups=None):
     '''
     Belirlenen ürün verilerini SQL Server'dan çeker, Türkçe karakter düzeltmesi yapar,
@@ -329,7 +348,46 @@ def save_data_to_json(data, filename="urun_verileri_onizleme.json"):
         logging.error(f"JSON dosyasına yazılırken hata: {e}")
         return False
 
-def send_data_to_web_api(product_data: list, api_url: str = DEFAULT_API_URL) -> tuple[bool, str]:
+def load_product_sync_state(api_url: str) -> dict:
+    """Son onaylanan katalog durumunu okur. Dosya yoksa, bozuksa veya farklı bir API'ye aitse boş durum döner."""
+    try:
+        if os.path.exists(PRODUCT_SYNC_STATE_FILE):
+            with open(PRODUCT_SYNC_STATE_FILE, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            if state.get("api_url") == api_url and state.get("version") and isinstance(state.get("products"), dict):
+                return state
+    except Exception as e:
+        logging.warning(f"Senkronizasyon durumu ({PRODUCT_SYNC_STATE_FILE}) okunamadı, tam yükleme yapılacak: {e}")
+    return {}
+
+def save_product_sync_state(api_url: str, version: str, data_for_json: list):
+    """Sunucunun onayladığı versiyonu ve gönderilen kayıtları STOK_KODU bazında kaydeder."""
+    state = {
+        "api_url": api_url,
+        "version": version,
+        "products": {str(item.get("STOK_KODU", "")).strip(): item for item in data_for_json}
+    }
+    try:
+        tmp_path = PRODUCT_SYNC_STATE_FILE + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, PRODUCT_SYNC_STATE_FILE)
+    except Exception as e:
+        logging.error(f"Senkronizasyon durumu kaydedilemedi ({PRODUCT_SYNC_STATE_FILE}): {e}")
+
+def compute_product_delta(previous_products: dict, data_for_json: list) -> tuple[list, list]:
+    """Önceki kayıtlarla karşılaştırarak eklenen/değişen ürünleri ve silinen stok kodlarını döndürür."""
+    current = {str(item.get("STOK_KODU", "")).strip(): item for item in data_for_json}
+    upserts = [item for code, item in current.items() if previous_products.get(code) != item]
+    deletes = [code for code in previous_products if code not in current]
+    return upserts, deletes
+
+def send_data_to_web_api(product_data: list, api_url: str = DEFAULT_API_URL, use_delta: bool = True) -> tuple[bool, str]:
+    """
+    Ürün verilerini web API'sine gönderir.
+    `use_delta` açıksa ve son onaylanan durum biliniyorsa yalnızca değişiklikler `/delta` adresine gönderilir;
+    sunucu versiyonu uyuşmazsa (409) otomatik olarak tam yüklemeye geçilir.
+    """
     settings = load_settings() # Ayarları yükle
     PRODUCTS_API_KEY_VALUE = settings.get("products_api_key") 
 
@@ -356,6 +414,56 @@ def send_data_to_web_api(product_data: list, api_url: str = DEFAULT_API_URL) ->
         "Content-Type": "application/json",
         "X-API-Key": PRODUCTS_API_KEY_VALUE
     }
+
+    if use_delta:
+        sync_state = load_product_sync_state(api_url)
+        if sync_state:
+            delta_result = _send_product_delta(data_for_json, sync_state, api_url, headers)
+            if delta_result is not None:
+                return delta_result
+            logging.info("Delta gönderimi kullanılamadı, tam yüklemeye geçiliyor...")
+
+    return _send_full_product_upload(data_for_json, api_url, headers)
+
+def _send_product_delta(data_for_json: list, sync_state: dict, api_url: str, headers: dict):
+    """
+    Son onaylanan duruma göre değişiklikleri gönderir.
+    Başarılı/başarısız sonuç için (bool, mesaj), tam yükleme gerekiyorsa None döndürür.
+    """
+    delta_url = f"{api_url.rstrip('/')}/delta"
+    upserts, deletes = compute_product_delta(sync_state["products"], data_for_json)
+    payload = {"base_version": sync_state["version"], "upserts": upserts, "deletes": deletes}
+    # Değişiklik olmasa da boş delta gönderilir; sunucu verisini kaybetmişse versiyon uyuşmazlığı böylece fark edilir
+    logging.info(f"'{delta_url}' adresine delta gönderiliyor: {len(upserts)} güncelleme, {len(deletes)} silme (temel versiyon {sync_state['version']}).")
+
+    try:
+        response = post_compressed_json(delta_url, payload, headers, timeout=30)
+        logging.info(f"Delta API Yanıt Durum Kodu: {response.status_code}")
+        if response.status_code in (404, 409):
+            # 409: sunucu versiyonu farklı; 404: sunucu delta desteklemiyor
+            logging.warning(f"Delta kabul edilmedi ({response.status_code}): {response.text[:500]}")
+            return None
+        response.raise_for_status()
+        response_json = response.json()
+    except requests.exceptions.RequestException as e:
+        error_message = f"Delta API isteğinde hata oluştu ({delta_url}): {e}"
+        logging.error(error_message)
+        return False, error_message
+    except json.JSONDecodeError:
+        logging.warning(f"Delta API yanıtı JSON olarak parse edilemedi. Yanıt metni: {response.text[:500]}...")
+        return None
+
+    new_version = response_json.get("version")
+    if not new_version:
+        logging.warning("Delta yanıtında versiyon bilgisi yok, tam yüklemeye geçiliyor.")
+        return None
+    save_product_sync_state(api_url, new_version, data_for_json)
+    success_message = response_json.get("message", f"{len(upserts)} ürün güncellendi, {len(deletes)} ürün silindi.")
+    logging.info(f"Delta başarıyla gönderildi. API Mesajı: {success_message} (yeni versiyon {new_version})")
+    return True, success_message
+
+def _send_full_product_upload(data_for_json: list, api_url: str, headers: dict) -> tuple[bool, str]:
+    """Tüm kataloğu gönderir ve sunucunun döndürdüğü versiyonu senkronizasyon durumu olarak saklar."""
     item_count = len(data_for_json)
     logging.info(f"'{api_url}' adresine {item_count} adet ürün gönderilmeye çalışılıyor (API Anahtarı ile)...")
     
@@ -366,9 +474,10 @@ def send_data_to_web_api(product_data: list, api_url: str = DEFAULT_API_URL) ->
         logging.info(f"Gönderilecek ikinci ürün örneği (varsa): {json.dumps(data_for_json[1], ensure_ascii=False, default=str)}")
 
     try:
-        response = requests.post(api_url, json=data_for_json, headers=headers, timeout=30)
+        response = post_compressed_json(api_url, data_for_json, headers, timeout=30)
         logging.info(f"API Yanıt Durum Kodu: {response.status_code}")
         logging.info(f"API Yanıt Başlıkları: {response.headers}")
+        response_json = {}
         try:
             response_json = response.json()
             logging.info(f"API Yanıt İçeriği (JSON): {json.dumps(response_json, ensure_ascii=False, indent=2)}")
@@ -379,6 +488,8 @@ def send_data_to_web_api(product_data: list, api_url: str = DEFAULT_API_URL) ->
 
         success_message = response_json.get("message", f"{item_count} ürün başarıyla gönderildi, API'den özel mesaj alınamadı.")
         logging.info(f"Veri başarıyla gönderildi. API Mesajı: {success_message}")
+        if response_json.get("version"):
+            save_product_sync_state(api_url, response_json["version"], data_for_json)
         return True, success_message
 
     except requests.exceptions.HTTPError as e:
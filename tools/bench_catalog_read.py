@@ -0,0 +1,91 @@
+"""
+GET /api/products ölçümü: eski yol (her istekte received_products.json okunup ayrıştırılır ve
+yeniden serileştirilir) ile bellekteki katalog snapshot'ının hazır baytlarının sunulması.
+
+Eski endpoint bu betikte birebir kopyalanmış küçük bir FastAPI uygulamasıyla çalıştırılır;
+yeni yol gerçek uygulamadır. Her iki tarafa aynı sentetik katalog ve aynı eşzamanlı istek
+yükü uygulanır.
+
+Kullanım:
+    python tools/bench_catalog_read.py --products 20000 --concurrency 8 --duration 5
+"""
+import argparse
+import asyncio
+import json
+import os
+
+import bench_common
+
+
+def build_legacy_app(products_file: str):
+    from fastapi import FastAPI
+
+    legacy_app = FastAPI()
+
+    @legacy_app.get("/api/products")
+    async def get_products_api():
+        if not os.path.exists(products_file):
+            return []
+        try:
+            with open(products_file, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data
+        except (json.JSONDecodeError, IOError) as e:
+            print(f"Error reading products file ({products_file}): {e}")
+            return []
+
+    return legacy_app
+
+
+async def measure(app, label: str, concurrency: int, duration: float, gzip_accepted: bool):
+    import httpx
+
+    headers = {"Accept-Encoding": "gzip" if gzip_accepted else "identity"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        response = await client.get("/api/products", headers=headers)
+        response.raise_for_status()
+        item_count = len(response.json())
+        wire_bytes = int(response.headers.get("content-length") or len(response.content))
+
+        async def call():
+            r = await client.get("/api/products", headers=headers)
+            r.raise_for_status()
+
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        latencies = await bench_common.run_workers(call, concurrency, duration)
+        elapsed = loop.time() - started
+    bench_common.print_latencies(f"{label} ({item_count} ürün, yanıt {wire_bytes / 1024:.0f} KB)", latencies, elapsed)
+
+
+async def run(args):
+    work_dir = bench_common.make_work_dir()
+    try:
+        bench_common.prepare_environment(work_dir)
+        products = bench_common.synthetic_products(args.products)
+        products_file = os.environ["PRODUCTS_FILE_PATH"]
+        with open(products_file, "w", encoding="utf-8") as f:
+            json.dump(products, f, ensure_ascii=False, indent=4)
+
+        await measure(build_legacy_app(products_file), "Önce  (dosyadan oku)", args.concurrency, args.duration, args.gzip)
+
+        main = bench_common.load_app()
+        async with main.app.router.lifespan_context(main.app):
+            # Başlangıçta eski JSON dosyası veritabanına aktarılır ve katalog belleğe alınır
+            await measure(main.app, "Sonra (snapshot)    ", args.concurrency, args.duration, args.gzip)
+    finally:
+        bench_common.remove_work_dir(work_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=20000, help="Sentetik katalogdaki ürün sayısı")
+    parser.add_argument("--concurrency", type=int, default=8, help="Aynı anda istek gönderen istemci sayısı")
+    parser.add_argument("--duration", type=float, default=5.0, help="Her ölçümün süresi (saniye)")
+    parser.add_argument("--gzip", action="store_true", help="İstemci gzip kabul eder (Accept-Encoding: gzip)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
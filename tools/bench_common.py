@@ -0,0 +1,107 @@
+"""
+Ölçüm betiklerinin ortak yardımcıları.
+
+Web uygulaması geçici bir dizindeki SQLite veritabanıyla, giriş kontrolü devre dışı bırakılarak
+yüklenir; ölçümler gerçek veritabanına, görsel önbelleğine veya admin ayarlarına dokunmaz.
+İstekler ASGI üzerinden (httpx.ASGITransport) gönderilir, ağ ve uvicorn ölçüme dahil değildir.
+"""
+import asyncio
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from typing import Awaitable, Callable, Dict, List
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+API_KEY = "bench-products-key"
+CUSTOMER_SYNC_KEY = "bench-customers-key"
+GROUP_CODES = ["CAY", "UN", "SEKER", "DETERJAN", "KAGIT", "ICECEK", "DIGER"]
+
+
+def make_work_dir() -> str:
+    return tempfile.mkdtemp(prefix="b2b_bench_")
+
+
+def remove_work_dir(work_dir: str):
+    shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def prepare_environment(work_dir: str, **extra_env: str):
+    """Uygulama import edilmeden önce çağrılmalıdır; tüm dosya yolları `work_dir` altına yönlendirilir."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(work_dir, 'bench.db')}"
+    os.environ["PRODUCTS_FILE_PATH"] = os.path.join(work_dir, "received_products.json")
+    os.environ["CUSTOMER_BALANCES_FILE_PATH"] = os.path.join(work_dir, "filtrelenen_cariler.json")
+    os.environ["ADMIN_CONFIG_PATH"] = os.path.join(work_dir, "admin_config.json")
+    os.environ["PRODUCT_IMAGE_CACHE_DIR"] = os.path.join(work_dir, "image_cache")
+    os.environ["PRODUCTS_API_KEY"] = API_KEY
+    os.environ["SERVER_API_KEY"] = CUSTOMER_SYNC_KEY
+    os.environ.setdefault("FASTAPI_SECRET_KEY", "bench-secret")
+    for name, value in extra_env.items():
+        os.environ[name] = str(value)
+
+
+def load_app(skip_auth: bool = True):
+    """`b2b_web_app.main` modülünü döndürür; `skip_auth` ile API'ler oturum açmadan çağrılabilir."""
+    from b2b_web_app import main
+    if skip_auth:
+        main.app.dependency_overrides[main.get_current_admin_user_for_api] = lambda: "bench"
+    return main
+
+
+def synthetic_products(count: int, seed: int = 42) -> List[Dict]:
+    """Masaüstünün gönderdiği biçimde, gerçekçi uzunlukta sentetik ürün kayıtları."""
+    rng = random.Random(seed)
+    words = ["Çay", "Şeker", "Un", "Deterjan", "Peçete", "Kola", "Ayran", "Makarna", "Pirinç", "Yağ", "Süt", "Tuz"]
+    products = []
+    for i in range(count):
+        name = " ".join(rng.choice(words) for _ in range(3))
+        products.append({
+            "STOK_KODU": f"STK{i:06d}",
+            "STOK_ADI": f"{name} {rng.randint(1, 5)} KG",
+            "BAKIYE": float(rng.randint(0, 500)),
+            "SATIS_FIAT1": round(rng.uniform(5, 900), 2),
+            "GRUP_KODU": GROUP_CODES[i % len(GROUP_CODES)],
+            "BARKOD1": f"869{i:010d}",
+            "IMAGE_PATH_WEB": f"images/STK{i:06d}.jpg",
+        })
+    return products
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def print_latencies(label: str, latencies: List[float], elapsed: float):
+    """Süreler saniye cinsindendir; ms olarak yazdırılır."""
+    if not latencies:
+        print(f"{label}: istek tamamlanmadı")
+        return
+    print(
+        f"{label}: {len(latencies)} istek, {len(latencies) / elapsed:.1f} istek/sn, "
+        f"p50 {percentile(latencies, 50) * 1000:.1f} ms, p99 {percentile(latencies, 99) * 1000:.1f} ms, "
+        f"max {max(latencies) * 1000:.1f} ms"
+    )
+
+
+async def run_workers(call: Callable[[], Awaitable[None]], concurrency: int, duration: float) -> List[float]:
+    """`concurrency` adet görev `duration` saniye boyunca `call`'u art arda çalıştırır; her çağrının süresi döner."""
+    latencies: List[float] = []
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await call()
+            latencies.append(time.perf_counter() - started)
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies
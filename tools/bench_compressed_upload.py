@@ -0,0 +1,94 @@
+"""
+Sıkıştırılmış senkronizasyon ölçümü: POST /api/products gövdesinin ham, gzip ve (zstandard
+kuruluysa) zstd ile gönderilmesi.
+
+Her katalog boyutu için hattaki bayt sayısı, istemcide sıkıştırma süresi, sunucuda isteğin
+işlenme süresi (açma + ayrıştırma + veritabanına yazma) ve verilen hat hızında aktarım süresi
+tahmini yazdırılır. Toplam = sıkıştırma + aktarım + sunucu.
+
+Gövde, masaüstü tarafındaki `data_extractor.compress_json_payload` ile aynı biçimde üretilir
+(json.dumps(ensure_ascii=False), gzip seviye 6); o modül pyodbc/keyring gerektirdiği için
+burada import edilmez.
+
+Kullanım:
+    python tools/bench_compressed_upload.py --sizes 1000,5000,20000 --uplink-mbit 10
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import time
+
+import bench_common
+
+try:
+    import zstandard
+except ImportError:  # zstd isteğe bağlıdır, kurulu değilse yalnızca ham ve gzip ölçülür
+    zstandard = None
+
+
+def encode_bodies(products):
+    raw = json.dumps(products, ensure_ascii=False).encode("utf-8")
+    bodies = [("ham", None, raw, 0.0)]
+    started = time.perf_counter()
+    gzipped = gzip.compress(raw, compresslevel=6)
+    bodies.append(("gzip", "gzip", gzipped, time.perf_counter() - started))
+    if zstandard is not None:
+        started = time.perf_counter()
+        zstd_body = zstandard.ZstdCompressor(level=3).compress(raw)
+        bodies.append(("zstd", "zstd", zstd_body, time.perf_counter() - started))
+    return bodies
+
+
+async def run(args):
+    import httpx
+
+    rows = []
+    work_dir = bench_common.make_work_dir()
+    try:
+        bench_common.prepare_environment(work_dir)
+        main = bench_common.load_app()
+        async with main.app.router.lifespan_context(main.app):
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                for size in args.sizes:
+                    products = bench_common.synthetic_products(size)
+                    raw_size = None
+                    for label, encoding, body, compress_seconds in encode_bodies(products):
+                        raw_size = raw_size or len(body)
+                        headers = {"X-API-Key": bench_common.API_KEY, "Content-Type": "application/json"}
+                        if encoding:
+                            headers["Content-Encoding"] = encoding
+                        server_times = []
+                        for _ in range(args.repeat):
+                            started = time.perf_counter()
+                            response = await client.post("/api/products", content=body, headers=headers)
+                            server_times.append(time.perf_counter() - started)
+                            response.raise_for_status()
+                        server_seconds = min(server_times)
+                        transfer_seconds = len(body) * 8 / (args.uplink_mbit * 1_000_000)
+                        total_seconds = compress_seconds + transfer_seconds + server_seconds
+                        rows.append(
+                            f"{size:>7} {label:>7} {len(body) / 1024:>11.1f} {raw_size / len(body):>5.1f}x "
+                            f"{compress_seconds * 1000:>9.1f}ms {transfer_seconds * 1000:>7.0f}ms "
+                            f"{server_seconds * 1000:>7.0f}ms {total_seconds * 1000:>7.0f}ms"
+                        )
+        # Uygulamanın kendi log satırları tabloyu bölmesin diye sonuçlar en sonda yazdırılır
+        print(f"{'ürün':>7} {'kodlama':>7} {'hattaki KB':>11} {'oran':>6} {'sıkıştırma':>11} {'aktarım*':>9} {'sunucu':>9} {'toplam':>9}")
+        print("\n".join(rows))
+        print(f"* Aktarım, {args.uplink_mbit} Mbit/sn hat hızında gövde boyutundan hesaplanan tahmindir.")
+    finally:
+        bench_common.remove_work_dir(work_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=lambda value: [int(part) for part in value.split(",")],
+                        default=[1000, 5000, 20000], help="Virgülle ayrılmış katalog boyutları")
+    parser.add_argument("--uplink-mbit", type=float, default=10.0, help="Aktarım tahmini için ofis hattının yükleme hızı")
+    parser.add_argument("--repeat", type=int, default=3, help="Her gövdenin kaç kez gönderileceği (en iyi süre yazdırılır)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,127 @@
+"""
+Giriş fırtınası ölçümü: çok sayıda hatalı şifreli giriş denemesi sürerken diğer isteklerin
+yanıt verebilirliği.
+
+`--clients` görev `--duration` saniye boyunca art arda hatalı şifreyle giriş dener. Aynı anda
+bir yoklayıcı her `--probe-interval` ms'de ilgisiz bir endpoint'i
+(`GET /api/products/categories`) çağırır.
+
+- Önce: eski giriş endpoint'i; her denemede admin_config.json okunur ve bcrypt doğrulaması
+  event loop üzerinde senkron çalışır. Bu betikte birebir kopyalanıp uygulamaya ayrı bir yolla
+  eklenir.
+- Sonra: gerçek `POST /login`; kimlik bilgileri önbellekten gelir, bcrypt küçük bir thread
+  havuzunda (`PASSWORD_HASH_MAX_THREADS`) çalışır.
+
+Kullanım:
+    python tools/bench_login_storm.py --clients 10 --duration 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import bench_common
+
+LEGACY_LOGIN_PATH = "/bench-legacy/login"
+
+
+def write_admin_config(main, password: str):
+    with open(main.ADMIN_CONFIG_FILE, "w", encoding="utf-8") as f:
+        json.dump({"admin_username": "admin", "admin_hashed_password": main.pwd_context.hash(password)}, f)
+
+
+def add_legacy_login_route(main):
+    from fastapi import Form, Request, status
+    from fastapi.responses import RedirectResponse
+
+    def legacy_get_admin_credentials():
+        if not os.path.exists(main.ADMIN_CONFIG_FILE):
+            return None
+        with open(main.ADMIN_CONFIG_FILE, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if "admin_username" in data and "admin_hashed_password" in data:
+            return data
+        return None
+
+    async def legacy_login_submit(request: Request, username: str = Form(...), password: str = Form(...)):
+        admin_creds_dict = legacy_get_admin_credentials()
+        error_message = "Kullanıcı adı veya şifre hatalı."
+        if admin_creds_dict:
+            stored_username = admin_creds_dict.get("admin_username")
+            hashed_password = admin_creds_dict.get("admin_hashed_password")
+            if stored_username == username and hashed_password and main.verify_password(password, hashed_password):
+                request.session["admin_user"] = username
+                return RedirectResponse(url="/", status_code=status.HTTP_303_SEE_OTHER)
+        return main.templates.TemplateResponse("login.html", {"request": request, "error_message": error_message}, status_code=status.HTTP_401_UNAUTHORIZED)
+
+    main.app.add_api_route(LEGACY_LOGIN_PATH, legacy_login_submit, methods=["POST"])
+
+
+async def measure(client, login_path: str, args) -> dict:
+    deadline = time.perf_counter() + args.duration
+    result = {"logins": 0, "probe": []}
+
+    async def login_client():
+        while time.perf_counter() < deadline:
+            response = await client.post(login_path, data={"username": "admin", "password": "yanlis-sifre"})
+            if response.status_code != 401:
+                raise RuntimeError(f"Beklenmeyen giriş yanıtı: {response.status_code}")
+            result["logins"] += 1
+
+    async def probe():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.get("/api/products/categories")
+            response.raise_for_status()
+            result["probe"].append(time.perf_counter() - started)
+            await asyncio.sleep(args.probe_interval / 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(probe(), *(login_client() for _ in range(args.clients)))
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+def print_result(label: str, result: dict):
+    probe = result["probe"]
+    print(
+        f"{label}: {result['logins'] / result['seconds']:.1f} giriş denemesi/sn; ilgisiz GET {len(probe)} istek, "
+        f"p50 {bench_common.percentile(probe, 50) * 1000:.1f} ms, p99 {bench_common.percentile(probe, 99) * 1000:.1f} ms, "
+        f"max {max(probe, default=0) * 1000:.0f} ms"
+    )
+
+
+async def run(args):
+    import httpx
+
+    work_dir = bench_common.make_work_dir()
+    try:
+        bench_common.prepare_environment(work_dir)
+        main = bench_common.load_app()
+        write_admin_config(main, "dogru-sifre")
+        add_legacy_login_route(main)
+        async with main.app.router.lifespan_context(main.app):
+            main.product_catalog.load(bench_common.synthetic_products(1000))
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                legacy = await measure(client, LEGACY_LOGIN_PATH, args)
+                current = await measure(client, "/login", args)
+        print(f"{args.clients} istemci, {args.duration:.0f} sn, yoklama aralığı {args.probe_interval} ms, "
+              f"bcrypt havuzu {main.password_executor.max_threads} thread")
+        print_result("Önce  (loop üzerinde bcrypt)", legacy)
+        print_result("Sonra (bcrypt havuzu)       ", current)
+    finally:
+        bench_common.remove_work_dir(work_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--clients", type=int, default=10, help="Eşzamanlı giriş deneyen istemci sayısı")
+    parser.add_argument("--duration", type=float, default=5.0, help="Her ölçümün süresi (saniye)")
+    parser.add_argument("--probe-interval", type=float, default=10.0, help="İlgisiz isteklerin aralığı (ms)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
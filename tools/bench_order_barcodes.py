@@ -0,0 +1,119 @@
+"""
+Sipariş oluşturmada barkod zenginleştirme ölçümü (varsayılan: 30k ürünlük katalog, 200 kalemli sipariş).
+
+1. Yalnızca barkod bulma adımı:
+   - Önce: her siparişte received_products.json okunup ayrıştırılır, her kalem için katalog
+     baştan sona taranır (`next(p for p in products if ...)`); eski koddan birebir kopyalanmıştır.
+   - Sonra: katalog snapshot'ının stok kodu indeksinden (`index.by_code`) O(1) arama.
+2. Uçtan uca: gerçek uygulamaya art arda 200 kalemli `POST /api/orders` gönderilir.
+
+Kullanım:
+    python tools/bench_order_barcodes.py --products 30000 --lines 200 --orders 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import time
+
+import bench_common
+
+
+def legacy_find_barcodes(products_file: str, codes):
+    products_data_for_barcode = []
+    if os.path.exists(products_file):
+        with open(products_file, "r", encoding="utf-8") as f_products:
+            products_data_for_barcode = json.load(f_products)
+    barcodes = []
+    for code in codes:
+        found_barcode = None
+        if products_data_for_barcode:
+            product_in_file = next((p for p in products_data_for_barcode if p.get("STOK_KODU") == code), None)
+            if product_in_file:
+                found_barcode = product_in_file.get("BARKOD1")
+        barcodes.append(found_barcode)
+    return barcodes
+
+
+def indexed_find_barcodes(catalog_index, codes):
+    barcodes = []
+    for code in codes:
+        product = catalog_index.by_code.get(code)
+        barcodes.append(product.get("BARKOD1") if product else None)
+    return barcodes
+
+
+def time_calls(func, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return timings, result
+
+
+def make_order(products, line_count: int, rng: random.Random):
+    return {
+        "customer_name": "Ölçüm Carisi",
+        "items": [
+            {"product_code": product["STOK_KODU"], "product_name": product["STOK_ADI"], "quantity": rng.randint(1, 20), "unit_price": product["SATIS_FIAT1"]}
+            for product in rng.sample(products, line_count)
+        ],
+    }
+
+
+async def run(args):
+    import httpx
+
+    rng = random.Random(7)
+    work_dir = bench_common.make_work_dir()
+    try:
+        bench_common.prepare_environment(work_dir)
+        products = bench_common.synthetic_products(args.products)
+        products_file = os.environ["PRODUCTS_FILE_PATH"]
+        with open(products_file, "w", encoding="utf-8") as f:
+            json.dump(products, f, ensure_ascii=False, indent=4)
+        codes = [product["STOK_KODU"] for product in rng.sample(products, args.lines)]
+
+        main = bench_common.load_app()
+        async with main.app.router.lifespan_context(main.app):
+            # Başlangıçta eski JSON dosyası içe aktarılır ve katalog indeksiyle birlikte belleğe alınır
+            catalog_index = main.product_catalog.snapshot.index
+            legacy_timings, legacy_result = time_calls(lambda: legacy_find_barcodes(products_file, codes), args.repeat)
+            indexed_timings, indexed_result = time_calls(lambda: indexed_find_barcodes(catalog_index, codes), args.repeat)
+            assert legacy_result == indexed_result, "İki yöntem farklı barkodlar buldu"
+
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                order_timings = []
+                for _ in range(args.orders):
+                    payload = make_order(products, args.lines, rng)
+                    started = time.perf_counter()
+                    response = await client.post("/api/orders", json=payload)
+                    order_timings.append(time.perf_counter() - started)
+                    response.raise_for_status()
+
+        print(f"{args.products} ürünlük katalog, {args.lines} kalemli sipariş")
+        print(f"Barkod bulma, önce  (dosya + doğrusal tarama): ortalama {statistics.mean(legacy_timings) * 1000:.1f} ms")
+        print(f"Barkod bulma, sonra (snapshot indeksi)       : ortalama {statistics.mean(indexed_timings) * 1000:.3f} ms")
+        print(
+            f"POST /api/orders uçtan uca ({args.orders} sipariş): ortalama {statistics.mean(order_timings) * 1000:.1f} ms, "
+            f"p50 {bench_common.percentile(order_timings, 50) * 1000:.1f} ms, max {max(order_timings) * 1000:.1f} ms"
+        )
+    finally:
+        bench_common.remove_work_dir(work_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=30000, help="Katalogdaki ürün sayısı")
+    parser.add_argument("--lines", type=int, default=200, help="Siparişteki kalem sayısı")
+    parser.add_argument("--orders", type=int, default=20, help="Uçtan uca ölçümde gönderilecek sipariş sayısı")
+    parser.add_argument("--repeat", type=int, default=5, help="Barkod bulma adımının tekrar sayısı")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,158 @@
+"""
+Sipariş işlemleri sürerken ilgisiz isteklerin gecikmesi (event loop'un bloklanması) ölçümü.
+
+`--creators` görev döngü içinde 20 kalemli sipariş oluşturur ve son 50 siparişi listeler. Aynı
+anda bir yoklayıcı her `--probe-interval` ms'de ilgisiz bir endpoint'i
+(`GET /api/products/categories`) çağırır, ayrı bir görev de event loop gecikmesini
+(`asyncio.sleep` gecikmesi) ölçer.
+
+- Önce: eski sipariş endpoint'leri; `async def` içinde senkron Session ile veritabanına event
+  loop üzerinde gidilir. Bu betikte birebir kopyalanıp uygulamaya ayrı yollarla eklenir.
+- Sonra: gerçek `/api/orders` endpoint'leri; veritabanı işi thread havuzunda yapılır.
+
+İki ölçüm de aynı uygulamaya ve aynı event loop'a yapılır. Eski yolda yüksek eşzamanlılıkta
+havuzdan bağlantı beklerken loop kilitlenebilir; bu durumda istekler `DB_POOL_TIMEOUT`
+(burada 10 sn) sonunda hata alır ve hata sayısı yazdırılır.
+
+Kullanım:
+    python tools/bench_order_event_loop.py --creators 8 --duration 6
+"""
+import argparse
+import asyncio
+import random
+import time
+
+import bench_common
+
+LEGACY_ORDERS_PATH = "/bench-legacy/orders"
+
+
+def add_legacy_order_routes(main):
+    from typing import List
+    from fastapi import Depends, HTTPException, status
+    from sqlalchemy.orm import Session
+    from b2b_web_app import models
+
+    async def legacy_create_order(order_data: main.OrderCreate, db: Session = Depends(main.get_db)):
+        db_order = models.Order(customer_name=order_data.customer_name, status=models.PyOrderStatusEnum.PENDING)
+        calculated_total_amount = 0.0
+        order_items_to_create = []
+        for item_data in order_data.items:
+            calculated_total_amount += item_data.quantity * item_data.unit_price
+            order_items_to_create.append(models.OrderItem(
+                product_code=item_data.product_code,
+                product_name=item_data.product_name,
+                barcode=item_data.barcode,
+                quantity=item_data.quantity,
+                unit_price=item_data.unit_price,
+            ))
+        db_order.total_amount = calculated_total_amount
+        db_order.items.extend(order_items_to_create)
+        try:
+            db.add(db_order)
+            db.commit()
+            db.refresh(db_order)
+            return db_order
+        except Exception as e:
+            db.rollback()
+            print(f"Sipariş oluşturulurken veritabanı hatası: {e}")
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Sipariş oluşturulamadı.")
+
+    async def legacy_list_orders(skip: int = 0, limit: int = 100, db: Session = Depends(main.get_db)):
+        return db.query(models.Order).order_by(models.Order.created_at.desc()).offset(skip).limit(limit).all()
+
+    main.app.add_api_route(LEGACY_ORDERS_PATH, legacy_create_order, methods=["POST"],
+                           response_model=main.OrderResponse, status_code=status.HTTP_201_CREATED)
+    main.app.add_api_route(LEGACY_ORDERS_PATH, legacy_list_orders, methods=["GET"],
+                           response_model=List[main.OrderResponse])
+
+
+def make_order(rng: random.Random):
+    return {
+        "customer_name": f"Cari {rng.randint(0, 40)}",
+        "items": [
+            {"product_code": f"STK{rng.randint(0, 999):06d}", "product_name": "Ölçüm ürünü",
+             "quantity": rng.randint(1, 20), "unit_price": round(rng.uniform(5, 900), 2)}
+            for _ in range(20)
+        ],
+    }
+
+
+async def measure(client, orders_path: str, args) -> dict:
+    rng = random.Random(3)
+    deadline = time.perf_counter() + args.duration
+    result = {"orders": 0, "errors": 0, "probe": [], "lag": []}
+
+    async def order_worker():
+        while time.perf_counter() < deadline:
+            try:
+                response = await client.post(orders_path, json=make_order(rng))
+                if response.status_code != 201:
+                    result["errors"] += 1
+                response = await client.get(orders_path, params={"limit": 50})
+                if response.status_code != 200:
+                    result["errors"] += 1
+                result["orders"] += 1
+            except Exception:
+                result["errors"] += 1
+
+    async def probe():
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            response = await client.get("/api/products/categories")
+            response.raise_for_status()
+            result["probe"].append(time.perf_counter() - started)
+            await asyncio.sleep(args.probe_interval / 1000)
+
+    async def lag_probe():
+        interval = args.probe_interval / 1000
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await asyncio.sleep(interval)
+            result["lag"].append(time.perf_counter() - started - interval)
+
+    await asyncio.gather(probe(), lag_probe(), *(order_worker() for _ in range(args.creators)))
+    return result
+
+
+def print_result(label: str, result: dict):
+    probe, lag = result["probe"], result["lag"]
+    print(
+        f"{label}: {result['orders']} sipariş+liste, hata {result['errors']}; "
+        f"ilgisiz GET {len(probe)} istek, p50 {bench_common.percentile(probe, 50) * 1000:.1f} ms, "
+        f"p99 {bench_common.percentile(probe, 99) * 1000:.1f} ms, max {max(probe, default=0) * 1000:.0f} ms; "
+        f"loop gecikmesi p99 {bench_common.percentile(lag, 99) * 1000:.1f} ms"
+    )
+
+
+async def run(args):
+    import httpx
+
+    work_dir = bench_common.make_work_dir()
+    try:
+        bench_common.prepare_environment(work_dir, DB_POOL_TIMEOUT=10)
+        main = bench_common.load_app()
+        add_legacy_order_routes(main)
+        async with main.app.router.lifespan_context(main.app):
+            main.product_catalog.load(bench_common.synthetic_products(1000))
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                legacy = await measure(client, LEGACY_ORDERS_PATH, args)
+                current = await measure(client, "/api/orders", args)
+        print(f"{args.creators} sipariş görevi, {args.duration:.0f} sn, yoklama aralığı {args.probe_interval} ms")
+        print_result("Önce  (loop üzerinde Session)", legacy)
+        print_result("Sonra (thread havuzu)        ", current)
+    finally:
+        bench_common.remove_work_dir(work_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--creators", type=int, default=8, help="Eşzamanlı sipariş oluşturan görev sayısı")
+    parser.add_argument("--duration", type=float, default=6.0, help="Her ölçümün süresi (saniye)")
+    parser.add_argument("--probe-interval", type=float, default=5.0, help="İlgisiz isteklerin aralığı (ms)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
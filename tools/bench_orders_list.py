@@ -0,0 +1,121 @@
+"""
+GET /api/orders?limit=500 ölçümü (varsayılan: 500 sipariş, sipariş başına 5 kalem).
+
+- Önce: eski endpoint; ORM nesneleri döner, `OrderResponse` her siparişin kalemlerini ayrı bir
+  sorguyla (lazy load) yükler ve her nesne Pydantic ile doğrulanır. Bu betikte birebir
+  kopyalanmıştır, aynı veritabanı ve aynı `OrderResponse` şeması kullanılır.
+- Sonra: gerçek uygulama; siparişler ve kalemleri toplu sorgularla okunur, doğrudan serileştirilir.
+
+İstek başına çalışan SQL sorgusu sayısı da yazdırılır.
+
+Kullanım:
+    python tools/bench_orders_list.py --orders 500 --items 5 --repeat 10
+"""
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+import bench_common
+
+
+def seed_orders(main, order_count: int, items_per_order: int):
+    from b2b_web_app import models
+
+    rng = random.Random(11)
+    db = main.SessionLocal()
+    try:
+        orders = []
+        for i in range(order_count):
+            items = [
+                models.OrderItem(product_code=f"STK{rng.randint(0, 29999):06d}", product_name=f"Ürün {i}-{n}",
+                                 barcode=f"869{rng.randint(0, 10**9):010d}", quantity=rng.randint(1, 20),
+                                 unit_price=round(rng.uniform(5, 900), 2))
+                for n in range(items_per_order)
+            ]
+            order = models.Order(customer_name=f"Cari {i % 40}", status=models.PyOrderStatusEnum.PENDING,
+                                 total_amount=sum(item.quantity * item.unit_price for item in items))
+            order.items.extend(items)
+            orders.append(order)
+        db.add_all(orders)
+        db.commit()
+    finally:
+        db.close()
+
+
+def build_legacy_app(main):
+    from typing import List
+    from fastapi import Depends, FastAPI
+    from sqlalchemy.orm import Session
+    from b2b_web_app import models
+
+    legacy_app = FastAPI()
+
+    @legacy_app.get("/api/orders", response_model=List[main.OrderResponse])
+    async def list_orders(skip: int = 0, limit: int = 100, db: Session = Depends(main.get_db)):
+        orders = db.query(models.Order).order_by(models.Order.created_at.desc()).offset(skip).limit(limit).all()
+        return orders
+
+    return legacy_app
+
+
+async def measure(app, label: str, args, query_counter: dict):
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        timings = []
+        queries = 0
+        body = None
+        for _ in range(args.repeat):
+            query_counter["count"] = 0
+            started = time.perf_counter()
+            response = await client.get("/api/orders", params={"limit": args.orders})
+            timings.append(time.perf_counter() - started)
+            response.raise_for_status()
+            queries = query_counter["count"]
+            body = response.json()
+    print(
+        f"{label}: {len(body)} sipariş, {queries} SQL sorgusu, ortalama {statistics.mean(timings) * 1000:.1f} ms, "
+        f"p50 {bench_common.percentile(timings, 50) * 1000:.1f} ms, max {max(timings) * 1000:.1f} ms"
+    )
+    return body
+
+
+async def run(args):
+    from sqlalchemy import event
+
+    work_dir = bench_common.make_work_dir()
+    try:
+        bench_common.prepare_environment(work_dir)
+        main = bench_common.load_app()
+        query_counter = {"count": 0}
+
+        def count_query(*_):
+            query_counter["count"] += 1
+
+        async with main.app.router.lifespan_context(main.app):
+            seed_orders(main, args.orders, args.items)
+            event.listen(main.engine, "before_cursor_execute", count_query)
+            legacy_body = await measure(build_legacy_app(main), "Önce  (ORM + lazy load)", args, query_counter)
+            new_body = await measure(main.app, "Sonra (toplu sorgu)    ", args, query_counter)
+            event.remove(main.engine, "before_cursor_execute", count_query)
+
+        # Aynı saniyede oluşturulan siparişlerin sırası farklı olabilir; içerik id'ye göre karşılaştırılır
+        same = sorted(legacy_body, key=lambda order: order["id"]) == sorted(new_body, key=lambda order: order["id"])
+        print(f"Yanıt içerikleri {'aynı' if same else 'FARKLI'}.")
+    finally:
+        bench_common.remove_work_dir(work_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--orders", type=int, default=500, help="Oluşturulacak ve listelenecek sipariş sayısı (en fazla 500)")
+    parser.add_argument("--items", type=int, default=5, help="Sipariş başına kalem sayısı")
+    parser.add_argument("--repeat", type=int, default=10, help="Her endpoint'in kaç kez çağrılacağı")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
@@ -0,0 +1,176 @@
+"""
+Ürün yükleme ölçümü: POST /api/products ile büyük bir kataloğun (varsayılan 100k satır)
+alınmasının süresi ve bellek tepe değeri.
+
+- Önce: eski endpoint (`products: List[Dict]`, gövdenin tamamı ayrıştırılıp doğrulanır,
+  ardından `json.dump(indent=4)` ile dosyaya yazılır) bu betikte birebir kopyalanmıştır.
+- Sonra, yalnızca ayrıştırma: gerçek endpoint'in ayrıştırma/doğrulama adımı
+  (`iter_json_array` + `validate_product_record`), kalıcı kayıt olmadan.
+- Sonra, tam: gerçek uygulama; ayrıştırmaya ek olarak veritabanı upsert'ü, katalog snapshot'ı
+  ve arama indeksi güncellemesi de süreye ve belleğe dahildir.
+
+Tepe bellek süreç geneli bir değer olduğu için (ru_maxrss) her ölçüm ayrı bir alt süreçte
+çalışır. Linux'ta tepe değer fork/exec ile üst süreçten devralındığı için sentetik gövde de ayrı
+bir alt süreçte üretilip dosyaya yazılır; ölçüm süreçleri yalnızca bu baytları okur. Gövde 64 KB'lık
+parçalar hâlinde gönderilir; isteğe bağlı `--tracemalloc` Python tahsislerinin tepe değerini de
+yazar (ölçümü belirgin şekilde yavaşlatır).
+
+Kullanım:
+    python tools/bench_product_ingest.py --rows 100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import bench_common
+
+CHUNK_SIZE = 64 * 1024
+MODES = (
+    ("legacy", "Önce              (List[Dict] + json.dump)"),
+    ("parse", "Sonra, ayrıştırma (iter_json_array)       "),
+    ("full", "Sonra, tam        (veritabanı + snapshot)  "),
+)
+
+
+def peak_rss_mb() -> float:
+    # Linux'ta ru_maxrss KB cinsindendir
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def build_legacy_app(products_file: str):
+    from typing import Dict, List
+    from fastapi import FastAPI, HTTPException
+
+    legacy_app = FastAPI()
+
+    @legacy_app.post("/api/products")
+    async def receive_products_api(products: List[Dict]):
+        if not products:
+            raise HTTPException(status_code=400, detail="Ürün listesi boş olamaz.")
+        with open(products_file, "w", encoding="utf-8") as f:
+            json.dump(products, f, ensure_ascii=False, indent=4)
+        return {"message": f"{len(products)} adet ürün başarıyla alındı ve kaydedildi."}
+
+    return legacy_app
+
+
+def build_parse_only_app():
+    from fastapi import FastAPI, Request
+    from b2b_web_app.product_ingest import iter_json_array, validate_product_record
+
+    parse_app = FastAPI()
+
+    @parse_app.post("/api/products")
+    async def receive_products_api(request: Request):
+        products = []
+        async for record in iter_json_array(request.stream()):
+            products.append(validate_product_record(record, len(products)))
+        return {"message": f"{len(products)} adet ürün ayrıştırıldı."}
+
+    return parse_app
+
+
+async def post_body(app, body: bytes, use_tracemalloc: bool):
+    import httpx
+
+    async def chunks():
+        for start in range(0, len(body), CHUNK_SIZE):
+            yield body[start:start + CHUNK_SIZE]
+
+    headers = {"X-API-Key": bench_common.API_KEY, "Content-Type": "application/json"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        rss_before = peak_rss_mb()
+        if use_tracemalloc:
+            tracemalloc.start()
+        started = time.perf_counter()
+        response = await client.post("/api/products", content=chunks(), headers=headers)
+        elapsed = time.perf_counter() - started
+        traced_peak = tracemalloc.get_traced_memory()[1] / (1024 * 1024) if use_tracemalloc else None
+        if use_tracemalloc:
+            tracemalloc.stop()
+        response.raise_for_status()
+    return {
+        "seconds": elapsed,
+        "rss_before_mb": rss_before,
+        "rss_peak_mb": peak_rss_mb(),
+        "traced_peak_mb": traced_peak,
+    }
+
+
+async def measure_mode(mode: str, body_file: str, use_tracemalloc: bool):
+    work_dir = bench_common.make_work_dir()
+    try:
+        bench_common.prepare_environment(work_dir)
+        with open(body_file, "rb") as f:
+            body = f.read()
+        if mode == "legacy":
+            result = await post_body(build_legacy_app(os.environ["PRODUCTS_FILE_PATH"]), body, use_tracemalloc)
+        elif mode == "parse":
+            result = await post_body(build_parse_only_app(), body, use_tracemalloc)
+        else:
+            main = bench_common.load_app()
+            async with main.app.router.lifespan_context(main.app):
+                result = await post_body(main.app, body, use_tracemalloc)
+        result["body_mb"] = len(body) / (1024 * 1024)
+        return result
+    finally:
+        bench_common.remove_work_dir(work_dir)
+
+
+def run_child(mode: str, body_file: str, args) -> dict:
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--body-file", body_file]
+    if args.tracemalloc:
+        command.append("--tracemalloc")
+    completed = subprocess.run(command, capture_output=True, text=True, check=True)
+    # Uygulamanın log satırları arasından yalnızca sonuç satırı alınır
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def main():
+    args = parse_args()
+    if args.write_body:
+        with open(args.write_body, "wb") as f:
+            f.write(json.dumps(bench_common.synthetic_products(args.rows), ensure_ascii=False).encode("utf-8"))
+        return
+    if args.child:
+        result = asyncio.run(measure_mode(args.child, args.body_file, args.tracemalloc))
+        print(json.dumps(result))
+        return
+
+    work_dir = bench_common.make_work_dir()
+    try:
+        body_file = os.path.join(work_dir, "body.json")
+        subprocess.run([sys.executable, os.path.abspath(__file__), "--rows", str(args.rows), "--write-body", body_file], check=True)
+        print(f"{args.rows} satırlık yükleme, gövde 64 KB parçalar hâlinde gönderiliyor.")
+        for mode, label in MODES:
+            result = run_child(mode, body_file, args)
+            line = (
+                f"{label}: {result['seconds'] * 1000:.0f} ms, gövde {result['body_mb']:.1f} MB, "
+                f"tepe RSS {result['rss_peak_mb']:.0f} MB (istek sırasında +{result['rss_peak_mb'] - result['rss_before_mb']:.0f} MB)"
+            )
+            if result["traced_peak_mb"] is not None:
+                line += f", tracemalloc tepe {result['traced_peak_mb']:.0f} MB"
+            print(line)
+    finally:
+        bench_common.remove_work_dir(work_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=100000, help="Yüklenecek ürün sayısı")
+    parser.add_argument("--tracemalloc", action="store_true", help="Python tahsislerinin tepe değerini de ölç")
+    parser.add_argument("--child", choices=[mode for mode, _ in MODES], help=argparse.SUPPRESS)
+    parser.add_argument("--body-file", help=argparse.SUPPRESS)
+    parser.add_argument("--write-body", help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
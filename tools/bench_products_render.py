@@ -0,0 +1,228 @@
+"""
+Ürün sayfası (/products) çizim ölçümü, headless Chromium ile (varsayılan: 20k ürünlük katalog).
+
+Uygulama geçici bir veritabanıyla uvicorn üzerinde başlatılır, sentetik katalog yüklenir,
+tarayıcı giriş yapıp sayfayı açar ve şunlar ölçülür:
+- ilk ürün satırının görünmesine kadar geçen süre,
+- sayfa aşağı kaydırılarak tüm katalog yüklendikten sonra DOM düğüm sayısı, tablo satırı sayısı
+  ve JS heap kullanımı (Chrome DevTools `Performance.getMetrics`),
+- arama kutusuna yazıldıktan sonra tablonun yeniden çizilmesinin süresi.
+
+`--before-ref` ile products.html şablonunun verilen git sürümündeki hâli de aynı verilerle
+ölçülür (örn. sanallaştırmadan önceki commit). Eski şablon `/bench-before/products` adresinden,
+aynı uygulama ve API'lerle sunulur.
+
+Gerekenler: `pip install playwright uvicorn` ve `python -m playwright install chromium`.
+Bu paketler uygulamanın bağımlılığı değildir; kurulu değilse betik ne eksik olduğunu yazıp çıkar.
+
+Kullanım:
+    python tools/bench_products_render.py --products 20000 --before-ref 8751058
+"""
+import argparse
+import json
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+import bench_common
+
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:  # Yalnızca bu ölçüm için gerekir
+    sync_playwright = None
+
+try:
+    import uvicorn
+except ImportError:  # Yalnızca bu ölçüm için gerekir
+    uvicorn = None
+
+ADMIN_USERNAME = "admin"
+ADMIN_PASSWORD = "olcum-sifresi"
+BEFORE_PAGE_PATH = "/bench-before/products"
+BEFORE_TEMPLATE_NAME = "bench_before_products.html"
+
+# Tablo kabındaki değişiklikler `quiet_ms` boyunca durunca çözülür; dönen değer son değişikliğe kadar geçen süredir
+WAIT_FOR_QUIET_JS = """
+([selector, quietMs]) => new Promise(resolve => {
+    const target = document.querySelector(selector) || document.body;
+    const started = performance.now();
+    let last = started;
+    let timer = null;
+    const done = () => { observer.disconnect(); resolve(last - started); };
+    const observer = new MutationObserver(() => {
+        last = performance.now();
+        clearTimeout(timer);
+        timer = setTimeout(done, quietMs);
+    });
+    observer.observe(target, { childList: true, subtree: true, attributes: true });
+    timer = setTimeout(done, quietMs);
+})
+"""
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def add_before_page(main, git_ref: str):
+    from fastapi import Depends, Request
+    from fastapi.responses import HTMLResponse
+    from jinja2 import ChoiceLoader, DictLoader
+
+    source = subprocess.run(
+        ["git", "show", f"{git_ref}:b2b_web_app/templates/products.html"],
+        cwd=bench_common.ROOT_DIR, capture_output=True, text=True, check=True, encoding="utf-8"
+    ).stdout
+    env = main.templates.env
+    env.loader = ChoiceLoader([DictLoader({BEFORE_TEMPLATE_NAME: source}), env.loader])
+
+    async def view_products_before(request: Request, current_user: str = Depends(main.get_current_admin_user_with_redirect)):
+        return main.templates.TemplateResponse(BEFORE_TEMPLATE_NAME, {
+            "request": request,
+            "title": "Ürün Kataloğu",
+            "admin_user": current_user,
+        })
+
+    main.app.add_api_route(BEFORE_PAGE_PATH, view_products_before, methods=["GET"], response_class=HTMLResponse)
+
+
+def start_server(main, port: int):
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    deadline = time.time() + 60
+    while not server.started:
+        if time.time() > deadline or not thread.is_alive():
+            raise RuntimeError("Uygulama başlatılamadı.")
+        time.sleep(0.1)
+    return server, thread
+
+
+def upload_catalog(base_url: str, product_count: int):
+    import httpx
+
+    body = json.dumps(bench_common.synthetic_products(product_count), ensure_ascii=False).encode("utf-8")
+    response = httpx.post(f"{base_url}/api/products", content=body, timeout=None,
+                          headers={"X-API-Key": bench_common.API_KEY, "Content-Type": "application/json"})
+    response.raise_for_status()
+
+
+def js_heap_mb(cdp) -> float:
+    metrics = {metric["name"]: metric["value"] for metric in cdp.send("Performance.getMetrics")["metrics"]}
+    return metrics.get("JSHeapUsedSize", 0) / (1024 * 1024)
+
+
+def measure_page(browser, base_url: str, page_path: str, args) -> dict:
+    context = browser.new_context(viewport={"width": 1366, "height": 900})
+    page = context.new_page()
+    page.goto(f"{base_url}/login")
+    page.fill("input[name=username]", ADMIN_USERNAME)
+    page.fill("input[name=password]", ADMIN_PASSWORD)
+    page.click("button[type=submit]")
+    page.wait_for_load_state("networkidle")
+
+    cdp = context.new_cdp_session(page)
+    cdp.send("Performance.enable")
+    started = time.perf_counter()
+    page.goto(f"{base_url}{page_path}")
+    page.wait_for_selector("#products-table-container tbody tr:not(.virtual-spacer) td", timeout=120000)
+    first_rows_ms = (time.perf_counter() - started) * 1000
+
+    # Sayfa sonuna kaydırarak tüm sayfalar yüklenir; yükseklik ve satır sayısı değişmeyince durulur
+    stable_rounds = 0
+    previous = None
+    deadline = time.perf_counter() + args.scroll_seconds
+    while stable_rounds < 5 and time.perf_counter() < deadline:
+        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        page.wait_for_timeout(200)
+        current = page.evaluate("[document.body.scrollHeight, document.querySelectorAll('#products-table-container tbody tr').length]")
+        stable_rounds = stable_rounds + 1 if current == previous else 0
+        previous = current
+    page.evaluate("window.scrollTo(0, 0)")
+    page.wait_for_timeout(500)
+
+    result = {
+        "first_rows_ms": first_rows_ms,
+        "dom_nodes": page.evaluate("document.getElementsByTagName('*').length"),
+        "table_rows": page.evaluate("document.querySelectorAll('#products-table-container tbody tr').length"),
+        "footer": page.evaluate("(document.getElementById('products-paging-footer') || {}).textContent || ''").strip(),
+    }
+    cdp.send("HeapProfiler.collectGarbage")
+    result["heap_mb"] = js_heap_mb(cdp)
+
+    # Filtre değişikliği: yazma anından tablonun son değişikliğine kadar geçen süre
+    quiet = page.evaluate_handle(WAIT_FOR_QUIET_JS, ["#products-table-container", 300])
+    page.fill("#product-search-input", args.search)
+    result["filter_ms"] = quiet.json_value()
+    result["filter_rows"] = page.evaluate("document.querySelectorAll('#products-table-container tbody tr').length")
+    context.close()
+    return result
+
+
+def print_result(label: str, result: dict):
+    print(
+        f"{label}: ilk satırlar {result['first_rows_ms']:.0f} ms; tümü yüklendikten sonra {result['dom_nodes']} DOM düğümü, "
+        f"{result['table_rows']} tablo satırı, JS heap {result['heap_mb']:.1f} MB; "
+        f"arama sonrası yeniden çizim {result['filter_ms']:.0f} ms ({result['filter_rows']} satır)"
+    )
+    if result["footer"]:
+        print(f"    alt bilgi: {result['footer']}")
+
+
+def main():
+    args = parse_args()
+    missing = [name for name, module in (("playwright", sync_playwright), ("uvicorn", uvicorn)) if module is None]
+    if missing:
+        print(f"Bu ölçüm için gerekli paket(ler) kurulu değil: {', '.join(missing)}.")
+        print("Kurulum: pip install playwright uvicorn && python -m playwright install chromium")
+        sys.exit(2)
+
+    work_dir = bench_common.make_work_dir()
+    try:
+        bench_common.prepare_environment(work_dir)
+        main_module = bench_common.load_app(skip_auth=False)
+        with open(main_module.ADMIN_CONFIG_FILE, "w", encoding="utf-8") as f:
+            json.dump({"admin_username": ADMIN_USERNAME, "admin_hashed_password": main_module.pwd_context.hash(ADMIN_PASSWORD)}, f)
+        pages = []
+        if args.before_ref:
+            add_before_page(main_module, args.before_ref)
+            pages.append((f"Önce  ({args.before_ref})", BEFORE_PAGE_PATH))
+        pages.append(("Sonra (güncel)", "/products"))
+
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        server, thread = start_server(main_module, port)
+        try:
+            upload_catalog(base_url, args.products)
+            with sync_playwright() as playwright:
+                browser = playwright.chromium.launch(headless=True)
+                try:
+                    results = [(label, measure_page(browser, base_url, path, args)) for label, path in pages]
+                finally:
+                    browser.close()
+        finally:
+            server.should_exit = True
+            thread.join(timeout=10)
+
+        print(f"{args.products} ürünlük katalog, pencere 1366x900, arama '{args.search}'")
+        for label, result in results:
+            print_result(label, result)
+    finally:
+        bench_common.remove_work_dir(work_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--products", type=int, default=20000, help="Katalogdaki ürün sayısı")
+    parser.add_argument("--before-ref", help="products.html şablonunun karşılaştırılacak eski git sürümü")
+    parser.add_argument("--scroll-seconds", type=float, default=120.0, help="Tüm sayfaların yüklenmesi için en fazla kaydırma süresi")
+    parser.add_argument("--search", default="seker", help="Filtre ölçümünde arama kutusuna yazılacak metin")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
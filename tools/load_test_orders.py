@@ -0,0 +1,117 @@
+"""
+Sipariş veritabanı yük testi: aynı SQLite dosyasını paylaşan süreçlerde eşzamanlı
+`crud.create_order` ve `crud.list_orders`.
+
+Her günlük kipi (varsayılan: DELETE = eski rollback journal, WAL = yeni varsayılan) için ayrı bir
+veritabanı dosyası oluşturulur. Ardından `--writers` süreç sürekli sipariş kaydeder, `--readers`
+süreç sürekli son siparişleri listeler. Engine her süreçte `database.create_db_engine` ile,
+`SQLITE_JOURNAL_MODE` ortam değişkeniyle kurulur; diğer pragma'lar (`SQLITE_*`) ortamdan gelir.
+Sonuçta işlem/sn, p50/p95 gecikme ve hata sayısı (örn. "database is locked") yazdırılır.
+
+Kullanım:
+    python tools/load_test_orders.py --writers 4 --readers 4 --duration 8 --modes DELETE,WAL
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import bench_common
+
+
+def run_worker(role: str, args):
+    from b2b_web_app import crud
+    from b2b_web_app.database import SessionLocal
+
+    rng = random.Random(os.getpid())
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + args.duration
+    while time.perf_counter() < deadline:
+        db = SessionLocal()
+        started = time.perf_counter()
+        try:
+            if role == "create":
+                items = [
+                    {"product_code": f"STK{rng.randint(0, 29999):06d}", "product_name": "Ölçüm ürünü", "barcode": None,
+                     "quantity": rng.randint(1, 20), "unit_price": round(rng.uniform(5, 900), 2)}
+                    for _ in range(args.items)
+                ]
+                crud.create_order(db, f"Cari {rng.randint(0, 40)}", items)
+            else:
+                crud.list_orders(db, args.list_limit)
+            latencies.append(time.perf_counter() - started)
+        except Exception as e:
+            errors += 1
+            if errors <= 3:
+                print(f"{role} hatası: {e}", file=sys.stderr)
+        finally:
+            db.close()
+    print(json.dumps({"role": role, "latencies": latencies, "errors": errors}))
+
+
+def prepare_database(database_path: str, journal_mode: str):
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database_path}", SQLITE_JOURNAL_MODE=journal_mode)
+    code = "from b2b_web_app import models; from b2b_web_app.database import engine; models.Base.metadata.create_all(bind=engine)"
+    subprocess.run([sys.executable, "-c", code], env=env, cwd=bench_common.ROOT_DIR, check=True, capture_output=True)
+
+
+def run_mode(journal_mode: str, work_dir: str, args) -> dict:
+    database_path = os.path.join(work_dir, f"orders_{journal_mode.lower()}.db")
+    prepare_database(database_path, journal_mode)
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{database_path}", SQLITE_JOURNAL_MODE=journal_mode)
+    base_command = [sys.executable, os.path.abspath(__file__), "--duration", str(args.duration),
+                    "--items", str(args.items), "--list-limit", str(args.list_limit), "--worker"]
+    processes = [subprocess.Popen(base_command + ["create"], env=env, stdout=subprocess.PIPE, text=True) for _ in range(args.writers)]
+    processes += [subprocess.Popen(base_command + ["list"], env=env, stdout=subprocess.PIPE, text=True) for _ in range(args.readers)]
+
+    results = {"create": {"latencies": [], "errors": 0}, "list": {"latencies": [], "errors": 0}}
+    for process in processes:
+        stdout, _ = process.communicate()
+        # database.py açılışta URL'yi yazdırır; sonuç son satırdadır
+        result = json.loads(stdout.strip().splitlines()[-1])
+        results[result["role"]]["latencies"].extend(result["latencies"])
+        results[result["role"]]["errors"] += result["errors"]
+    return results
+
+
+def main():
+    args = parse_args()
+    if args.worker:
+        run_worker(args.worker, args)
+        return
+
+    work_dir = bench_common.make_work_dir()
+    try:
+        print(f"{args.writers} yazıcı + {args.readers} okuyucu süreç, {args.duration:.0f} sn, sipariş başına {args.items} kalem, liste {args.list_limit} sipariş")
+        for journal_mode in args.modes:
+            results = run_mode(journal_mode, work_dir, args)
+            for role, label in (("create", "create_order"), ("list", "list_orders ")):
+                latencies = results[role]["latencies"]
+                print(
+                    f"{journal_mode:>6} {label}: {len(latencies) / args.duration:6.1f} işlem/sn, "
+                    f"p50 {bench_common.percentile(latencies, 50) * 1000:6.1f} ms, "
+                    f"p95 {bench_common.percentile(latencies, 95) * 1000:6.1f} ms, hata {results[role]['errors']}"
+                )
+    finally:
+        bench_common.remove_work_dir(work_dir)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=4, help="Sipariş kaydeden süreç sayısı")
+    parser.add_argument("--readers", type=int, default=4, help="Sipariş listeleyen süreç sayısı")
+    parser.add_argument("--duration", type=float, default=8.0, help="Her kipin ölçüm süresi (saniye)")
+    parser.add_argument("--items", type=int, default=5, help="Sipariş başına kalem sayısı")
+    parser.add_argument("--list-limit", type=int, default=50, help="Listelemede okunan sipariş sayısı")
+    parser.add_argument("--modes", type=lambda value: [mode.strip().upper() for mode in value.split(",")],
+                        default=["DELETE", "WAL"], help="Karşılaştırılacak SQLite günlük kipleri")
+    parser.add_argument("--worker", choices=("create", "list"), help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()
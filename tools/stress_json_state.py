@@ -0,0 +1,143 @@
+"""
+`json_state.atomic_write_json` için eşzamanlılık stres testi.
+
+Birden çok yazıcı thread aynı dosyaya `atomic_write_json` ile art arda yazarken okuyucu
+thread'ler dosyayı sürekli açıp ayrıştırır. Her yazılan belge kendi içinde tutarlılık bilgisi
+taşır (öğe sayısı ve tüm öğelerde aynı yazıcı/sıra numarası); okuyucu yarım, bozuk veya
+karışık bir belge ya da eksik bir dosya görürse hata sayılır. `--naive` ile aynı yük eski
+yöntemle ("w" kipinde yerinde yazma) de çalıştırılır; testin yarım okumaları gerçekten
+yakaladığını gösterir.
+
+Hata bulunursa betik 1 çıkış koduyla biter.
+
+Kullanım:
+    python tools/stress_json_state.py --writers 3 --readers 4 --writes 200 --naive
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import bench_common
+from b2b_web_app import json_state
+
+
+def make_document(writer_id: int, seq: int, item_count: int):
+    return {
+        "writer": writer_id,
+        "seq": seq,
+        "count": item_count,
+        "items": [{"writer": writer_id, "seq": seq, "index": i, "text": "x" * 40} for i in range(item_count)],
+    }
+
+
+def check_document(document) -> bool:
+    items = document.get("items")
+    if not isinstance(items, list) or len(items) != document.get("count"):
+        return False
+    return all(item["writer"] == document["writer"] and item["seq"] == document["seq"] for item in items)
+
+
+def naive_write_json(file_path: str, data):
+    # Eski yöntem: dosya yerinde yazılır, okuyucu yazma sırasında yarım içerik görebilir
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def run_atomic_stress(file_path: str, write, args) -> dict:
+    write(file_path, make_document(-1, 0, args.items))
+    stop = threading.Event()
+    stats = {"reads": 0, "bad_reads": 0, "missing": 0, "writes": 0, "examples": []}
+    stats_lock = threading.Lock()
+
+    def reader():
+        reads = bad_reads = missing = 0
+        examples = []
+        while not stop.is_set():
+            try:
+                with open(file_path, "r", encoding="utf-8") as f:
+                    text = f.read()
+            except FileNotFoundError:
+                missing += 1
+                continue
+            reads += 1
+            try:
+                ok = check_document(json.loads(text))
+            except (json.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+                ok = False
+                if len(examples) < 3:
+                    examples.append(f"{type(e).__name__}: {e} (dosya {len(text)} bayt)")
+            if not ok:
+                bad_reads += 1
+        with stats_lock:
+            stats["reads"] += reads
+            stats["bad_reads"] += bad_reads
+            stats["missing"] += missing
+            stats["examples"].extend(examples)
+
+    def writer(writer_id: int):
+        for seq in range(1, args.writes + 1):
+            write(file_path, make_document(writer_id, seq, args.items))
+            with stats_lock:
+                stats["writes"] += 1
+
+    readers = [threading.Thread(target=reader) for _ in range(args.readers)]
+    writers = [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    started = time.perf_counter()
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+    stats["seconds"] = time.perf_counter() - started
+    leftovers = [name for name in os.listdir(os.path.dirname(file_path)) if name.endswith(".tmp")]
+    stats["leftover_temp_files"] = len(leftovers)
+    return stats
+
+
+def print_atomic_result(label: str, stats: dict):
+    print(
+        f"{label}: {stats['writes']} yazma, {stats['reads']} okuma, {stats['seconds']:.1f} sn; "
+        f"bozuk okuma {stats['bad_reads']}, dosya bulunamadı {stats['missing']}, "
+        f"artık geçici dosya {stats['leftover_temp_files']}"
+    )
+    for example in stats["examples"][:3]:
+        print(f"    örnek: {example}")
+
+
+def main():
+    args = parse_args()
+    work_dir = bench_common.make_work_dir()
+    failed = False
+    try:
+        atomic_stats = run_atomic_stress(os.path.join(work_dir, "atomic.json"), json_state.atomic_write_json, args)
+        print_atomic_result("atomic_write_json", atomic_stats)
+        if atomic_stats["bad_reads"] or atomic_stats["missing"] or atomic_stats["leftover_temp_files"]:
+            failed = True
+
+        if args.naive:
+            naive_stats = run_atomic_stress(os.path.join(work_dir, "naive.json"), naive_write_json, args)
+            print_atomic_result("Karşılaştırma, yerinde yazma", naive_stats)
+    finally:
+        bench_common.remove_work_dir(work_dir)
+
+    print("SONUÇ: " + ("HATA" if failed else "başarılı"))
+    sys.exit(1 if failed else 0)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--writers", type=int, default=3, help="Aynı dosyaya yazan thread sayısı")
+    parser.add_argument("--readers", type=int, default=4, help="Dosyayı sürekli okuyan thread sayısı")
+    parser.add_argument("--writes", type=int, default=200, help="Her yazıcının yazma sayısı")
+    parser.add_argument("--items", type=int, default=500, help="Her belgedeki öğe sayısı (belge boyutu)")
+    parser.add_argument("--naive", action="store_true", help="Karşılaştırma için yerinde yazmayı da çalıştır")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    main()